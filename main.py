@@ -31,14 +31,11 @@ def main():
         from src.crawler.arxiv_fetcher import ArxivFetcher
         fetcher = ArxivFetcher(config)
         
-        # 尝试获取论文，如果没找到，逐步放宽条件
-        papers = fetcher.fetch_papers(days_back=2)
-        
-        if not papers:
-            logger.warning("⚠️  过去2天没有找到符合条件的论文，尝试扩大到7天...")
-            papers = fetcher.fetch_papers(days_back=7)
+        # 尝试获取论文，如果没找到，逐步放宽条件（2天 → 7天，只遍历一次结果流）
+        papers, days_back = fetcher.fetch_papers_progressive(windows=(2, 7))
         
         if papers:
+            logger.info(f"使用过去{days_back}天的论文")
             fetcher.print_paper_summary(papers)
         else:
             logger.warning("⚠️  没有找到符合条件的论文")
@@ -54,7 +51,9 @@ def main():
         
         try:
             summarizer = PaperSummarizer(config)
-            summarized_papers = summarizer.summarize_papers(papers)
+            # 之前运行中已经总结过的论文不再交给 LLM
+            summarized_papers = summarizer.summarize_papers(list(fetcher.filter_unprocessed(papers)))
+            fetcher.mark_processed(summarized_papers)
             
             # 生成每日报告
             logger.info("\n生成每日报告...")
@@ -83,9 +82,9 @@ def main():
             llm_client = LLMClientFactory.create_client(config)
             
             # 加载论文总结
-            from src.utils import load_json
-            summaries_data = load_json('data/summaries/latest.json')
-            summaries = summaries_data.get('summaries', []) if summaries_data else []
+            from src.storage import StorageFactory
+            summaries_data = StorageFactory.create_storage(config).load_latest_summaries()
+            summaries = summaries_data.get('papers', []) if summaries_data else []
             
             # 创建趋势分析器
             analyzer = TrendAnalyzer(config, llm_client)
@@ -17,7 +17,8 @@ import pytz
 import traceback
 import logging
 
-from src.utils import load_config, load_env, setup_logging, load_json
+from src.utils import load_config, load_env, setup_logging
+from src.storage import StorageFactory
 from src.notifier import EmailNotifier
 from test import main as run_daily_task
 
@@ -52,12 +53,13 @@ def scheduled_task(logger=None, notifier=None):
         # 发送成功通知
         if notifier:
             try:
-                # 读取统计信息
-                stats = load_json(Path('data/papers/latest.json'))
+                # 读取统计信息（按 storage.type 从 JSON 文件或 SQLite 数据库读取）
+                storage = StorageFactory.create_storage(load_config())
+                stats = storage.get_stats()
                 stats_info = {
-                    'papers_count': len(stats) if stats else 0,
-                    'summaries_count': len(load_json(Path('data/summaries/latest.json')) or {}),
-                    'categories_count': len(set(p.get('primary_category', '') for p in stats)) if stats else 0,
+                    'papers_count': stats['papers_count'],
+                    'summaries_count': stats['summaries_count'],
+                    'categories_count': len(storage.category_counts()),
                     'keywords_count': 50  # 从分析结果获取
                 }
                 notifier.send_notification(success=True, stats=stats_info, duration=duration)
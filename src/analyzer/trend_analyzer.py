@@ -11,10 +11,12 @@ import logging
 import json
 from typing import List, Dict, Any
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from collections import Counter
 import re
 
+import numpy as np
+
 # 词云和可视化
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
@@ -27,7 +29,10 @@ from sklearn.decomposition import LatentDirichletAllocation
 import nltk
 from nltk.corpus import stopwords
 
-from src.utils import save_json, get_date_string
+from src.utils import get_date_string
+from src.crawler.author_index import get_author_index
+from src.storage import StorageFactory
+from src.storage.corpus import get_corpus
 
 
 class TrendAnalyzer:
@@ -44,6 +49,15 @@ class TrendAnalyzer:
         self.llm_client = llm_client
         self.logger = logging.getLogger('daily_arxiv.analyzer')
         
+        # 分析结果存储（storage.type: json / sqlite）
+        self.storage = StorageFactory.create_storage(config)
+        
+        # 作者索引（可选）：与爬取器共用，作者统计按规范化后的作者合并
+        self.author_index = get_author_index(config)
+        
+        # 历史论文库（可选）：跨天统计直接在内存映射的列上计算
+        self.corpus = get_corpus(config)
+        
         # 下载必要的 NLTK 数据
         try:
             nltk.data.find('corpora/stopwords')
@@ -60,12 +74,15 @@ class TrendAnalyzer:
             'work', 'results', 'result', 'performance', 'model', 'models'
         ])
     
-    def analyze(self, papers: List[Dict[str, Any]], summaries: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def analyze(self, papers: List[Dict[str, Any]], summaries: List[Dict[str, Any]] = None,
+                save: bool = True, name: str = None) -> Dict[str, Any]:
         """执行完整的趋势分析
         
         Args:
             papers: 论文列表
             summaries: 论文总结列表（可选）
+            save: 是否保存为最新的分析结果（重新分析历史论文等调用方自行保存时设为 False）
+            name: 词云文件名中的标识（默认当天日期，避免覆盖当天的词云）
             
         Returns:
             分析结果字典
@@ -86,7 +103,7 @@ class TrendAnalyzer:
         
         # 2. 生成词云
         self.logger.info("\n步骤 2: 生成词云...")
-        wordcloud_path = self._generate_wordcloud(papers)
+        wordcloud_path = self._generate_wordcloud(papers, name)
         
         # 3. 统计分析
         self.logger.info("\n步骤 3: 统计分析...")
@@ -109,7 +126,8 @@ class TrendAnalyzer:
         }
         
         # 保存分析结果
-        self._save_analysis(analysis_result)
+        if save:
+            self._save_analysis(analysis_result)
         
         self.logger.info("\n" + "=" * 60)
         self.logger.info("✅ 趋势分析完成")
@@ -214,11 +232,12 @@ class TrendAnalyzer:
         
         return topics
     
-    def _generate_wordcloud(self, papers: List[Dict[str, Any]]) -> str:
+    def _generate_wordcloud(self, papers: List[Dict[str, Any]], name: str = None) -> str:
         """生成词云图
         
         Args:
             papers: 论文列表
+            name: 文件名中的标识（默认当天日期）
             
         Returns:
             词云图片路径
@@ -248,7 +267,7 @@ class TrendAnalyzer:
         output_dir = Path('data/analysis')
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        date_str = get_date_string()
+        date_str = name or get_date_string()
         wordcloud_path = f"data/analysis/wordcloud_{date_str}.png"
         
         # 创建图表
@@ -283,11 +302,17 @@ class TrendAnalyzer:
             for category in paper.get('categories', []):
                 category_counts[category] += 1
         
-        # 作者统计
-        author_counts = Counter()
-        for paper in papers:
-            for author in paper.get('authors', []):
-                author_counts[author] += 1
+        # 作者统计（启用作者索引时按作者 ID 计数，再换成显示名称）
+        affiliation_counts = Counter()
+        if self.author_index is not None:
+            # 只查询索引：论文在爬取器保存时才写入索引
+            author_counts = self.author_index.count_author_names(papers)
+            affiliation_counts = self.author_index.count_affiliation_names(papers)
+        else:
+            author_counts = Counter()
+            for paper in papers:
+                for author in paper.get('authors', []):
+                    author_counts[author] += 1
         
         # 高频词统计
         word_counts = Counter()
@@ -317,9 +342,61 @@ class TrendAnalyzer:
             'time_distribution': dict(sorted(time_distribution.items())),
             'prolific_authors': {k: v for k, v in author_counts.items() if v >= 2}
         }
+        if affiliation_counts:
+            statistics['top_affiliations'] = dict(affiliation_counts.most_common(10))
+        if self.corpus is not None and len(self.corpus):
+            statistics['history'] = self._generate_history_statistics()
         
         return statistics
     
+    def _generate_history_statistics(self, recent_days: int = 30, baseline_days: int = 180,
+                                     top_n: int = 20) -> Dict[str, Any]:
+        """基于历史论文库统计每月论文数和近期占比上升最快的词
+        
+        Args:
+            recent_days: 近期窗口的天数
+            baseline_days: 近期窗口之前用于对比的天数
+            top_n: 返回前 N 个上升的词
+        
+        Returns:
+            历史统计字典
+        """
+        corpus = self.corpus
+        corpus.refresh()
+        now = datetime.now()
+        recent = corpus.rows(start=get_date_string(now - timedelta(days=recent_days)))
+        baseline = corpus.rows(
+            start=get_date_string(now - timedelta(days=recent_days + baseline_days)),
+            end=get_date_string(now - timedelta(days=recent_days + 1))
+        )
+        
+        history = {
+            'total_papers': len(corpus),
+            'papers_per_month': dict(list(corpus.monthly_counts().items())[-12:]),
+            'rising_terms': [],
+        }
+        if len(recent) == 0 or len(baseline) == 0:
+            return history
+        
+        # 每个词在两个窗口中出现的论文占比（向量化计算，平滑后取比值）
+        recent_counts = corpus.document_frequencies(recent)
+        recent_share = recent_counts / len(recent)
+        baseline_share = (corpus.document_frequencies(baseline) + 1) / (len(baseline) + 1)
+        ratio = recent_share / baseline_share
+        
+        excluded = np.array([len(term) <= 3 or term in self.stop_words for term in corpus.vocab], dtype=bool)
+        ratio[excluded | (recent_counts < 3)] = 0
+        for term_id in np.argsort(ratio)[::-1][:top_n]:
+            if ratio[term_id] <= 1:
+                break
+            history['rising_terms'].append({
+                'term': corpus.vocab[term_id],
+                'recent_share': float(recent_share[term_id]),
+                'baseline_share': float(baseline_share[term_id]),
+            })
+        
+        return history
+    
     def _generate_llm_analysis(self, papers: List[Dict[str, Any]], 
                               summaries: List[Dict[str, Any]] = None,
                               keywords: List[Dict[str, Any]] = None,
@@ -531,15 +608,8 @@ class TrendAnalyzer:
         
         date_str = get_date_string()
         
-        # 保存 JSON 格式
-        json_path = f"data/analysis/analysis_{date_str}.json"
-        save_json(analysis, json_path)
-        self.logger.info(f"💾 分析结果已保存: {json_path}")
-        
-        # 保存最新分析（供 Web 服务使用）
-        latest_path = "data/analysis/latest.json"
-        save_json(analysis, latest_path)
-        self.logger.info(f"💾 最新分析已保存: {latest_path}")
+        # 按 storage.type 保存（JSON 文件或 SQLite 数据库，供 Web 服务使用）
+        self.storage.save_analysis(analysis)
         
         # 生成 Markdown 报告
         markdown_path = f"data/analysis/report_{date_str}.md"
@@ -584,6 +654,12 @@ class TrendAnalyzer:
         for kw in keywords[:20]:
             report += f"- **{kw['keyword']}** (权重: {kw['score']:.4f})\n"
         
+        rising_terms = statistics.get('history', {}).get('rising_terms', [])
+        if rising_terms:
+            report += "\n### 近期上升的词（对比历史论文库）\n\n"
+            for item in rising_terms[:10]:
+                report += f"- **{item['term']}** ({item['baseline_share']:.1%} → {item['recent_share']:.1%})\n"
+        
         report += "\n---\n\n## 🔥 研究热点分析\n\n"
         report += llm_analysis.get('hotspots', '未生成')
         
@@ -648,7 +724,7 @@ class TrendAnalyzer:
 
 def main():
     """测试函数"""
-    from src.utils import load_config, load_env, setup_logging, load_json
+    from src.utils import load_config, load_env, setup_logging
     from src.summarizer.llm_factory import LLMClientFactory
     
     load_env()
@@ -656,7 +732,8 @@ def main():
     logger = setup_logging(config)
     
     # 加载论文数据
-    papers_data = load_json('data/papers/latest.json')
+    storage = StorageFactory.create_storage(config)
+    papers_data = storage.load_latest_papers()
     if not papers_data:
         logger.error("未找到论文数据，请先运行论文爬取")
         return
@@ -664,8 +741,8 @@ def main():
     papers = papers_data.get('papers', [])
     
     # 加载总结数据
-    summaries_data = load_json('data/summaries/latest.json')
-    summaries = summaries_data.get('summaries', []) if summaries_data else None
+    summaries_data = storage.load_latest_summaries()
+    summaries = summaries_data.get('papers', []) if summaries_data else None
     
     # 创建 LLM 客户端
     llm_client = LLMClientFactory.create_client(config)
@@ -0,0 +1,334 @@
+"""
+arXiv API 客户端
+
+在 arxiv.Client 的分页逻辑之上接入共享限速器，并在 429/503 时自适应退避；
+可选地把原始 Atom 响应缓存到磁盘，或完全离线地从缓存回放；
+可选地把原始条目追加到压缩归档，供之后重新处理。
+
+同一进程中配置相同的爬取器共用一个客户端（get_client），复用保持连接的会话，
+并按每个查询观察到的每日论文数调整页大小，用更少、更大的请求取完一个时间窗口
+"""
+import itertools
+import json
+import logging
+import math
+import random
+import threading
+from typing import Dict, Any, Generator, Optional
+
+import arxiv
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+from .feed_archive import FeedArchive
+from .rate_limiter import TokenBucket, get_rate_limiter
+from .response_cache import ResponseCache, CacheMissError
+
+
+class ArxivClient(arxiv.Client):
+    """使用共享限速器的 arXiv 客户端"""
+    
+    # 表示服务端限流的 HTTP 状态码
+    THROTTLE_STATUSES = (429, 503)
+    
+    # arXiv API 单次请求允许的最大结果数
+    MAX_PAGE_SIZE = 2000
+    
+    # 按观察到的每日论文数估算页大小时预留的余量
+    PAGE_SIZE_MARGIN = 1.2
+    
+    def __init__(self, rate_limiter: TokenBucket, page_size: int = 100, num_retries: int = 5,
+                 backoff_base: float = 3.0, backoff_max: float = 120.0,
+                 cache: ResponseCache = None, offline: bool = False,
+                 archive: FeedArchive = None, max_page_size: int = MAX_PAGE_SIZE,
+                 timeout: float = 30, pool_size: int = 10):
+        """初始化
+        
+        Args:
+            rate_limiter: 共享限速器，负责所有请求的节奏
+            page_size: 默认页大小（没有结果数上限且没有历史观察时使用）
+            num_retries: 请求失败时的重试次数
+            backoff_base: 限流退避的基础秒数，每次重试翻倍
+            backoff_max: 限流退避的最大秒数
+            cache: 原始响应缓存（可选）
+            offline: 离线回放模式，只从缓存读取，不访问网络
+            archive: 原始条目归档（可选）
+            max_page_size: 自适应页大小的上限
+            timeout: 单个请求的超时（秒）
+            pool_size: 保持连接的连接池大小（不小于并发子查询数）
+        """
+        # 请求节奏完全交给限速器，关闭 arxiv.Client 自带的单实例延迟
+        super().__init__(page_size=page_size, delay_seconds=0, num_retries=num_retries)
+        self.rate_limiter = rate_limiter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.offline = offline
+        self.archive = archive
+        self.max_page_size = min(max_page_size, self.MAX_PAGE_SIZE)
+        self.timeout = timeout
+        self.logger = logging.getLogger('daily_arxiv.arxiv_client')
+        
+        # 所有查询共用一个保持连接的会话，并发子查询各自占用池中的一个连接
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        # 查询 -> 观察到的每日论文数，用于估算下一次同一查询的页大小
+        self._daily_counts: Dict[str, float] = {}
+        self._stats_lock = threading.Lock()
+        
+        if offline and cache is None:
+            raise ValueError("离线回放模式需要启用响应缓存")
+    
+    def results(self, search: arxiv.Search, offset: int = 0,
+                page_size: int = None) -> Generator[arxiv.Result, None, None]:
+        """逐页获取搜索结果
+        
+        与 arxiv.Client.results 相同，但页大小按每次调用指定，多个线程共用一个客户端时互不影响。
+        
+        Args:
+            search: 搜索对象
+            offset: 跳过的结果数
+            page_size: 本次搜索的页大小（默认使用 self.page_size）
+        
+        Returns:
+            arxiv.Result 生成器
+        """
+        limit = search.max_results - offset if search.max_results else None
+        if limit and limit < 0:
+            return iter(())
+        return itertools.islice(self._results(search, offset, page_size or self.page_size), limit)
+    
+    def _results(self, search: arxiv.Search, offset: int = 0,
+                 page_size: int = None) -> Generator[arxiv.Result, None, None]:
+        """逐页请求并产出结果（arxiv.Client._results 的按调用页大小版本）"""
+        page_size = page_size or self.page_size
+        feed = self._parse_feed(self._format_url(search, offset, page_size), first_page=True)
+        if not feed.entries:
+            return
+        total_results = int(feed.feed.opensearch_totalresults)
+        
+        while feed.entries:
+            for entry in feed.entries:
+                try:
+                    yield arxiv.Result._from_feed_entry(entry)
+                except arxiv.Result.MissingFieldError as e:
+                    self.logger.warning(f"跳过不完整的结果: {str(e)}")
+            offset += len(feed.entries)
+            if offset >= total_results:
+                break
+            feed = self._parse_feed(self._format_url(search, offset, page_size), first_page=False)
+    
+    def plan_page_size(self, query: str, limit: Optional[int] = None, days_back: float = None) -> int:
+        """估算一次搜索的页大小
+        
+        有结果数上限时不请求超过上限的结果；之前观察过同一查询的每日论文数时，
+        按时间窗口内的预期论文数（留出余量）一次取完，没有上限的搜索也尽量少翻页。
+        页大小取整到 50 的倍数，使相同窗口的重跑能命中响应缓存。
+        
+        Args:
+            query: 查询字符串
+            limit: 最多需要的结果数，None 表示不限
+            days_back: 时间窗口（天）
+        
+        Returns:
+            页大小
+        """
+        expected = None
+        with self._stats_lock:
+            daily_count = self._daily_counts.get(query)
+        if daily_count is not None and days_back:
+            expected = math.ceil(daily_count * days_back * self.PAGE_SIZE_MARGIN / 50) * 50
+        
+        if limit:
+            size = min(limit, expected) if expected else limit
+        else:
+            size = max(self.page_size, expected) if expected else self.page_size
+        
+        return max(1, min(size, self.max_page_size))
+    
+    def record_window(self, query: str, count: int, days_back: float):
+        """记录一次完整遍历时间窗口后观察到的论文数
+        
+        Args:
+            query: 查询字符串
+            count: 时间窗口内的论文数（本地过滤之前）
+            days_back: 时间窗口（天）
+        """
+        if days_back <= 0:
+            return
+        with self._stats_lock:
+            self._daily_counts[query] = max(count, 1) / days_back
+    
+    def _parse_feed(self, url: str, first_page: bool = True, _try_index: int = 0) -> feedparser.FeedParserDict:
+        """获取并解析一页结果
+
+        每次请求（包括重试）前都先经过限速器；遇到 429/503 时通过限速器让所有
+        调用方（包括其他进程）一起按指数退避暂停，而不是立即重试。
+        
+        Args:
+            url: 分页请求 URL
+            first_page: 是否为第一页（第一页允许为空）
+            _try_index: 起始重试序号
+        
+        Returns:
+            feedparser 解析结果
+        """
+        if self.cache is not None:
+            content = self.cache.get(url, allow_expired=self.offline)
+            if content is not None:
+                self.logger.debug(f"命中响应缓存: {url}")
+                return self._parse_content(url, content, first_page, _try_index)
+            if self.offline:
+                raise CacheMissError(url)
+        
+        error = None
+        for try_index in range(_try_index, self.num_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                return self._try_parse_feed(url, first_page, try_index)
+            except arxiv.HTTPError as e:
+                error = e
+                if e.status in self.THROTTLE_STATUSES:
+                    delay = self._backoff_delay(try_index, getattr(e, 'retry_after', None))
+                    self.logger.warning(f"arXiv 返回 {e.status}，退避 {delay:.1f} 秒后重试 (第 {try_index + 1} 次)")
+                    self.rate_limiter.backoff(delay)
+                else:
+                    self.logger.warning(f"arXiv 返回 {e.status} (第 {try_index + 1} 次)")
+            except (arxiv.UnexpectedEmptyPageError, requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout) as e:
+                error = e
+                self.logger.warning(f"请求失败 (第 {try_index + 1} 次): {str(e)}")
+        
+        raise error
+    
+    def _try_parse_feed(self, url: str, first_page: bool, try_index: int) -> feedparser.FeedParserDict:
+        """发出一次请求并解析结果
+        
+        Args:
+            url: 分页请求 URL
+            first_page: 是否为第一页
+            try_index: 当前重试序号
+        
+        Returns:
+            feedparser 解析结果
+        """
+        self.logger.debug(f"请求页面 (first: {first_page}, try: {try_index}): {url}")
+        resp = self._session.get(url, headers={"user-agent": "arxiv.py/2.1.0"}, timeout=self.timeout)
+        
+        if resp.status_code != requests.codes.OK:
+            error = arxiv.HTTPError(url, try_index, resp.status_code)
+            error.retry_after = resp.headers.get('Retry-After')
+            raise error
+        
+        feed = self._parse_content(url, resp.content, first_page, try_index)
+        
+        if self.cache is not None:
+            self.cache.put(url, resp.content)
+        
+        # 只归档从网络下载的页面（缓存中的页面在下载时已经归档过）
+        if self.archive is not None:
+            self.archive.append_page(resp.content)
+        
+        return feed
+    
+    def _parse_content(self, url: str, content: bytes, first_page: bool,
+                       try_index: int) -> feedparser.FeedParserDict:
+        """解析原始 Atom 响应
+        
+        Args:
+            url: 分页请求 URL
+            content: 原始响应内容
+            first_page: 是否为第一页
+            try_index: 当前重试序号
+        
+        Returns:
+            feedparser 解析结果
+        """
+        feed = feedparser.parse(content)
+        if len(feed.entries) == 0 and not first_page:
+            raise arxiv.UnexpectedEmptyPageError(url, try_index, feed)
+        
+        return feed
+    
+    def _backoff_delay(self, try_index: int, retry_after: str = None) -> float:
+        """计算限流后的退避时间
+        
+        Args:
+            try_index: 当前重试序号
+            retry_after: 服务端返回的 Retry-After 头（秒）
+        
+        Returns:
+            退避秒数
+        """
+        delay = min(self.backoff_max, self.backoff_base * (2 ** try_index))
+        # 加入随机抖动，避免多个进程同时恢复请求
+        delay *= random.uniform(0.5, 1.0)
+        
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        
+        return delay
+
+
+# 进程内共享的客户端，同一进程中配置相同的爬取器（包括调度器的多次运行）共用一个
+_shared_clients: Dict[str, ArxivClient] = {}
+_shared_lock = threading.Lock()
+
+
+def get_client(config: Dict[str, Any]) -> ArxivClient:
+    """获取（或创建）进程内共享的 arXiv 客户端
+    
+    Args:
+        config: 完整配置字典，读取 arxiv.client、rate_limit、cache、archive
+    
+    Returns:
+        arXiv 客户端（连同其限速器、响应缓存和原始条目归档）
+    """
+    arxiv_config = config.get('arxiv', {})
+    client_config = arxiv_config.get('client', {})
+    rate_config = arxiv_config.get('rate_limit', {})
+    cache_config = arxiv_config.get('cache', {})
+    archive_config = arxiv_config.get('archive', {})
+    
+    key = json.dumps([client_config, rate_config, cache_config, archive_config,
+                      arxiv_config.get('max_workers', 4)], sort_keys=True, default=str)
+    with _shared_lock:
+        if key in _shared_clients:
+            return _shared_clients[key]
+        
+        # 原始响应缓存：重跑（包括扩大时间窗口）时直接复用已下载的页面
+        cache = None
+        if cache_config.get('enabled', False) or cache_config.get('offline', False):
+            cache = ResponseCache(
+                cache_dir=cache_config.get('dir', 'data/cache/arxiv'),
+                ttl_seconds=cache_config.get('ttl_hours', 6) * 3600,
+                max_size_mb=cache_config.get('max_size_mb', 200),
+            )
+        
+        # 原始条目归档：修改提示词或分析器后可以从归档重新处理，无需重新请求 arXiv
+        archive = None
+        if archive_config.get('enabled', False):
+            archive = FeedArchive(
+                archive_dir=archive_config.get('dir', 'data/archive/arxiv'),
+                compression=archive_config.get('compression', 'gzip'),
+                level=archive_config.get('level'),
+            )
+        
+        client = ArxivClient(
+            get_rate_limiter(config),
+            page_size=client_config.get('page_size', 100),
+            num_retries=rate_config.get('max_retries', 5),
+            backoff_base=rate_config.get('backoff_base', 3.0),
+            backoff_max=rate_config.get('backoff_max', 120.0),
+            cache=cache,
+            offline=cache_config.get('offline', False),
+            archive=archive,
+            max_page_size=client_config.get('max_page_size', ArxivClient.MAX_PAGE_SIZE),
+            timeout=client_config.get('timeout', 30),
+            pool_size=max(client_config.get('pool_size', 10), arxiv_config.get('max_workers', 4)),
+        )
+        _shared_clients[key] = client
+        return client
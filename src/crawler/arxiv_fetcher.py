@@ -5,11 +5,23 @@ arXiv 论文爬取器
 """
 import arxiv
 import logging
+import queue
+import re
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
 
-from src.utils import save_json, get_date_string, get_data_path
+from src.utils import save_json, load_json, get_date_string, get_data_path
+from src.storage import StorageFactory
+from src.storage.corpus import get_corpus
+from .arxiv_client import get_client
+from .author_index import get_author_index
+from .enrichment import LinkEnricher
+from .fulltext import FullTextExtractor
+from .keyword_matcher import KeywordMatcher
+from .paper import Paper
+from .seen_index import SeenIndex
 
 
 class ArxivFetcher:
@@ -32,51 +44,94 @@ class ArxivFetcher:
         self.sort_by = self.arxiv_config.get('sort_by', 'submittedDate')
         self.sort_order = self.arxiv_config.get('sort_order', 'descending')
         
-    def build_query(self) -> str:
+        # 关键词过滤位置：remote 编译进 arXiv 查询；local 只按类别查询，在本地对标题和摘要求值
+        self.keyword_filter = self.arxiv_config.get('keyword_filter', 'remote')
+        if self.keyword_filter not in ('remote', 'local'):
+            raise ValueError(f"不支持的关键词过滤方式: {self.keyword_filter}（可选: remote, local）")
+        self.keyword_matcher = KeywordMatcher(self.keywords)
+        
+        # 增量模式：按查询记录水位线，只获取上次运行之后的新论文
+        self.incremental = self.arxiv_config.get('incremental', False)
+        
+        # 并发子查询：按类别或关键词组拆分查询，共享同一个限速器
+        self.fan_out = self.arxiv_config.get('fan_out')
+        self.max_workers = self.arxiv_config.get('max_workers', 4)
+        
+        # 所有查询共用一个客户端，由进程内（可跨进程）共享的令牌桶统一控制请求节奏；
+        # 配置相同的爬取器（如调度器的每次运行）共用同一个客户端、连接池、响应缓存和原始条目归档
+        self.client = get_client(config)
+        self.rate_limiter = self.client.rate_limiter
+        self.cache = self.client.cache
+        self.archive = self.client.archive
+        
+        # 全文提取（可选）：下载 PDF 并提取作者单位和代码链接
+        fulltext_config = self.arxiv_config.get('fulltext', {})
+        self.fulltext = None
+        if fulltext_config.get('enabled', False):
+            self.fulltext = FullTextExtractor(
+                cache_dir=fulltext_config.get('cache_dir', 'data/cache/fulltext'),
+                max_connections=fulltext_config.get('max_connections', 4),
+                max_processes=fulltext_config.get('max_processes', 2),
+                timeout=fulltext_config.get('timeout', 60),
+                max_pages=fulltext_config.get('max_pages', 0),
+            )
+        
+        # 链接补全（可选）：批量查询代码仓库和数据集链接，结果持久化缓存
+        enrichment_config = self.arxiv_config.get('enrichment', {})
+        self.enricher = None
+        if enrichment_config.get('enabled', False):
+            self.enricher = LinkEnricher(
+                service_url=enrichment_config.get('service_url'),
+                cache_path=enrichment_config.get('cache_path', 'data/cache/links.db'),
+                batch_size=enrichment_config.get('batch_size', 100),
+                ttl_days=enrichment_config.get('ttl_days', 30),
+                negative_ttl_hours=enrichment_config.get('negative_ttl_hours', 24),
+                timeout=enrichment_config.get('timeout', 30),
+            )
+        
+        # 已处理论文索引：标记每篇论文是新论文、已更新还是已处理，重叠窗口中已处理的论文不再总结
+        seen_config = self.arxiv_config.get('seen_index', {})
+        self.seen_index = None
+        if seen_config.get('enabled', False):
+            self.seen_index = SeenIndex(
+                seen_config.get('path', 'data/seen_papers.db'),
+                use_bloom=seen_config.get('bloom', True),
+            )
+        
+        # 论文存储（storage.type: json / sqlite）
+        self.storage = StorageFactory.create_storage(config)
+        
+        # 作者索引（可选）：作者姓名规范化后驻留为整数 ID，保存论文时增量更新
+        self.author_index = get_author_index(config)
+        
+        # 列式历史论文库（可选）：保存论文时追加新论文，供跨天分析使用
+        self.corpus = get_corpus(config)
+    
+    def build_query(self, categories: List[str] = None, keywords: List[str] = None) -> str:
         """构建搜索查询
         
+        Args:
+            categories: 类别列表（默认使用配置中的全部类别）
+            keywords: 关键词列表（默认使用配置中的全部关键词）
+        
         Returns:
             查询字符串
         """
+        if categories is None:
+            categories = self.categories
+        if keywords is None:
+            keywords = self.keywords
+        
         # 构建类别查询
-        if len(self.categories) == 1:
-            category_query = f"cat:{self.categories[0]}"
+        if len(categories) == 1:
+            category_query = f"cat:{categories[0]}"
         else:
-            category_parts = [f"cat:{cat}" for cat in self.categories]
+            category_parts = [f"cat:{cat}" for cat in categories]
             category_query = "(" + " OR ".join(category_parts) + ")"
         
-        # 如果有关键词，添加关键词过滤
-        if self.keywords:
-            # 构建关键词查询（在标题或摘要中搜索）
-            keyword_parts = []
-            for keyword in self.keywords:
-                # 检查关键词是否包含逻辑运算符
-                if " AND " in keyword or " OR " in keyword:
-                    # 解析包含逻辑关系的关键词
-                    import re
-                    
-                    # 分割关键词并保留逻辑运算符
-                    parts = re.split(r" (AND|OR) ", keyword)
-                    processed_parts = []
-                    
-                    for i, part in enumerate(parts):
-                        if part in ["AND", "OR"]:
-                            processed_parts.append(part)  # 保留逻辑运算符
-                        else:
-                            # 去除可能的引号
-                            part = part.strip('"')
-                            part = part.strip("'")
-                            # 为每个基础关键词添加标题和摘要搜索
-                            processed_parts.append(f'(ti:"{part}" OR abs:"{part}")')
-                    
-                    # 重新组合成查询
-                    keyword_parts.append("(" + " ".join(processed_parts) + ")")
-                else:
-                    # 普通关键词，在标题和摘要中搜索
-                    keyword_parts.append(f'(ti:"{keyword}" OR abs:"{keyword}")')
-            
-            # 组合所有关键词部分（使用OR连接不同的关键词组合）
-            keyword_query = "(" + " OR ".join(keyword_parts) + ")"
+        # 如果有关键词，添加关键词过滤（本地过滤模式下关键词不进入 arXiv 查询）
+        if keywords and self.keyword_filter != 'local':
+            keyword_query = KeywordMatcher(keywords).to_arxiv()
             
             # 组合类别和关键词
             query = f"{category_query} AND {keyword_query}"
@@ -86,26 +141,432 @@ class ArxivFetcher:
         self.logger.info(f"构建的查询: {query}")
         return query
     
-    def fetch_papers(self, days_back: int = 1) -> List[Dict[str, Any]]:
+    def build_sub_queries(self, fan_out: str) -> List[str]:
+        """把完整查询拆分为互相独立的子查询
+        
+        Args:
+            fan_out: 拆分方式，category（每个类别一个子查询）或 keyword（每个关键词组一个子查询）
+        
+        Returns:
+            子查询字符串列表
+        """
+        if fan_out == 'category':
+            return [self.build_query(categories=[category]) for category in self.categories]
+        
+        if fan_out == 'keyword':
+            if not self.keywords or self.keyword_filter == 'local':
+                return [self.build_query()]
+            return [self.build_query(keywords=[keyword]) for keyword in self.keywords]
+        
+        raise ValueError(f"不支持的拆分方式: {fan_out}（可选: category, keyword）")
+    
+    def fetch_papers(self, days_back: int = 1, incremental: bool = None,
+                     fan_out: str = None) -> List[Paper]:
         """获取论文
         
         Args:
             days_back: 获取过去几天的论文，默认1天
+            incremental: 是否使用增量模式（默认读取配置 arxiv.incremental）
+            fan_out: 子查询拆分方式 category / keyword（默认读取配置 arxiv.fan_out，为空则使用单个查询）
+            
+        Returns:
+            论文列表
+        """
+        if incremental is None:
+            incremental = self.incremental
+        if fan_out is None:
+            fan_out = self.fan_out
+        
+        self._log_fetch_start(fan_out)
+        queries = self.build_sub_queries(fan_out) if fan_out else [self.build_query()]
+        
+        try:
+            self.logger.info("正在获取论文...")
+            results_by_query = {query: [] for query in queries}
+            failed_queries = set()
+            completed_queries = set()
+            for query, paper in self._iter_queries(queries, days_back, incremental,
+                                                   failed_queries, completed_queries):
+                results_by_query[query].append(paper)
             
+            for query in failed_queries:
+                results_by_query.pop(query)
+            
+            if fan_out:
+                papers = self._merge_papers(results_by_query.values())
+            else:
+                papers = results_by_query[queries[0]]
+            
+            if self.fulltext is not None:
+                self.fulltext.process(papers)
+            if self.enricher is not None:
+                self.enricher.process(papers)
+            
+            watermarks = self._compute_watermarks(papers, results_by_query, completed_queries, incremental)
+            self.finish_fetch(papers, watermarks)
+            
+            return papers
+        
+        except Exception as e:
+            self.logger.error(f"❌ 获取论文失败: {str(e)}", exc_info=True)
+            raise
+    
+    def fetch_papers_progressive(self, windows: Tuple[int, ...] = (2, 7), min_papers: int = 1,
+                                 incremental: bool = None,
+                                 fan_out: str = None) -> Tuple[List[Paper], int]:
+        """逐步放宽时间窗口获取论文，只遍历一次结果流
+        
+        按最大窗口执行一次查询，把论文按发布时间归入各个窗口，返回满足
+        “至少 min_papers 篇”的最小窗口中的论文；所有窗口都不满足时返回最大窗口的结果。
+        结果流按提交日期降序时，一旦较小窗口已满足条件并越过其截止日期即停止翻页，
+        因此最常见的情况只需要与单个小窗口查询相同的请求数。
+        
+        Args:
+            windows: 候选时间窗口（天）
+            min_papers: 窗口内至少需要的论文数
+            incremental: 是否使用增量模式（默认读取配置 arxiv.incremental）
+            fan_out: 子查询拆分方式 category / keyword（默认读取配置 arxiv.fan_out）
+            
+        Returns:
+            (论文列表, 实际使用的时间窗口天数)
+        """
+        if incremental is None:
+            incremental = self.incremental
+        if fan_out is None:
+            fan_out = self.fan_out
+        
+        windows = sorted(windows)
+        self._log_fetch_start(fan_out)
+        queries = self.build_sub_queries(fan_out) if fan_out else [self.build_query()]
+        
+        try:
+            self.logger.info(f"正在获取论文（时间窗口: {', '.join(f'{d}天' for d in windows)}）...")
+            now = datetime.now()
+            cutoffs = [now - timedelta(days=days) for days in windows]
+            
+            # 只有单个按时间降序的结果流，越过截止日期后才不会再出现更新的论文
+            early_stop = len(queries) == 1 and self._is_time_ordered()
+            
+            # 每篇论文记录其所属的最小窗口序号
+            results_by_query = {query: [] for query in queries}
+            window_counts = [0] * len(windows)
+            failed_queries = set()
+            completed_queries = set()
+            stream = self._iter_queries(queries, windows[-1], incremental, failed_queries, completed_queries)
+            try:
+                for query, paper in stream:
+                    published = datetime.fromisoformat(paper['published']).replace(tzinfo=None)
+                    index = next((i for i, cutoff in enumerate(cutoffs) if published >= cutoff), len(windows) - 1)
+                
+                    if early_stop and index > 0 and sum(window_counts[:index]) >= min_papers:
+                        self.logger.info(f"过去{windows[index - 1]}天的论文已足够，停止翻页")
+                        # 已越过所选窗口的截止日期，该窗口内的论文是完整的
+                        completed_queries.add(query)
+                        break
+                
+                    window_counts[index] += 1
+                    results_by_query[query].append((index, paper))
+            finally:
+                stream.close()
+            
+            for query in failed_queries:
+                results_by_query.pop(query)
+            
+            for index, days in enumerate(windows):
+                selected = {
+                    query: [paper for paper_index, paper in results if paper_index <= index]
+                    for query, results in results_by_query.items()
+                }
+                if fan_out:
+                    papers = self._merge_papers(selected.values())
+                else:
+                    papers = selected.get(queries[0], [])
+                
+                if len(papers) >= min_papers or index == len(windows) - 1:
+                    break
+                self.logger.warning(f"⚠️  过去{days}天只找到 {len(papers)} 篇论文，扩大到{windows[index + 1]}天")
+            
+            if self.fulltext is not None:
+                self.fulltext.process(papers)
+            if self.enricher is not None:
+                self.enricher.process(papers)
+            
+            watermarks = self._compute_watermarks(papers, selected, completed_queries, incremental)
+            self.finish_fetch(papers, watermarks)
+            
+            return papers, days
+        
+        except Exception as e:
+            self.logger.error(f"❌ 获取论文失败: {str(e)}", exc_info=True)
+            raise
+    
+    def iter_papers(self, days_back: int = 1, incremental: bool = None,
+                    fan_out: str = None, save: bool = True,
+                    watermarks: Dict[str, Dict[str, Any]] = None,
+                    fetched: List[Paper] = None) -> Iterator[Paper]:
+        """流式获取论文
+        
+        每解析出一篇论文就立即产出，下游（如总结器）可以在爬取尚未结束时开始处理。
+        结果流完整消费后才会保存论文数据并推进水位线；提前停止消费则不保存。
+        用 with_fulltext / with_links 包装结果流时，结果流结束时下游可能还在补充论文，
+        应设置 save=False，等下游处理完成后再调用 finish_fetch(fetched, watermarks)。
+        
+        与 fetch_papers 的区别：并发子查询的结果按到达顺序产出（不再按发布时间重新排序），
+        达到 max_results 篇后停止，此时未完整遍历的查询不推进水位线。
+        
+        Args:
+            days_back: 获取过去几天的论文，默认1天
+            incremental: 是否使用增量模式（默认读取配置 arxiv.incremental）
+            fan_out: 子查询拆分方式 category / keyword（默认读取配置 arxiv.fan_out）
+            save: 结果流结束后是否保存论文数据并推进水位线
+            watermarks: save=False 时用于收集新水位线的字典，由调用方传给 finish_fetch
+                （或保存论文后传给 save_watermarks）
+            fetched: save=False 时用于收集去重后论文的列表，由调用方传给 finish_fetch
+        
+        Yields:
+            论文信息字典
+        """
+        if incremental is None:
+            incremental = self.incremental
+        if fan_out is None:
+            fan_out = self.fan_out
+        
+        self._log_fetch_start(fan_out)
+        queries = self.build_sub_queries(fan_out) if fan_out else [self.build_query()]
+        
+        try:
+            self.logger.info("正在流式获取论文...")
+            results_by_query = {query: [] for query in queries}
+            failed_queries = set()
+            completed_queries = set()
+            papers = []
+            seen_ids = set()
+            
+            stream = self._iter_queries(queries, days_back, incremental, failed_queries, completed_queries)
+            try:
+                for query, paper in stream:
+                    results_by_query[query].append(paper)
+                
+                    base_id = self._base_id(paper['id'])
+                    if base_id in seen_ids:
+                        continue
+                    seen_ids.add(base_id)
+                
+                    papers.append(paper)
+                    yield paper
+                
+                    if self.max_results and len(papers) >= self.max_results:
+                        break
+            finally:
+                # 立即结束子查询线程，不必等待垃圾回收
+                stream.close()
+            
+            for query in failed_queries:
+                results_by_query.pop(query)
+            
+            computed = self._compute_watermarks(papers, results_by_query, completed_queries, incremental)
+            if save:
+                self.finish_fetch(papers, computed)
+            else:
+                if watermarks is not None:
+                    watermarks.update(computed)
+                if fetched is not None:
+                    fetched.extend(papers)
+        
+        except Exception as e:
+            self.logger.error(f"❌ 获取论文失败: {str(e)}", exc_info=True)
+            raise
+    
+    def with_fulltext(self, papers: Iterable[Paper]) -> Iterable[Paper]:
+        """为论文流补充全文信息（未启用全文提取时原样返回）
+        
+        用于包装 iter_papers(save=False) 的结果流，下游处理完成后再调用 finish_fetch 保存；
+        fetch_papers 会自动补充。
+        
+        Args:
+            papers: 论文列表或迭代器
+        
+        Returns:
+            论文迭代器
+        """
+        if self.fulltext is None:
+            return papers
+        return self.fulltext.iter_process(papers)
+    
+    def with_links(self, papers: Iterable[Paper]) -> Iterable[Paper]:
+        """为论文流补充代码和数据集链接（未启用链接补全时原样返回）
+        
+        用于包装 iter_papers 的结果流（放在 with_fulltext 之后，合并两者的代码链接）；
+        fetch_papers 会自动补充。
+        
+        Args:
+            papers: 论文列表或迭代器
+        
+        Returns:
+            论文迭代器
+        """
+        if self.enricher is None:
+            return papers
+        return self.enricher.iter_process(papers)
+    
+    def filter_unprocessed(self, papers: Iterable[Dict[str, Any]],
+                           skipped: List[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """跳过已处理的论文，只保留新论文和已更新的论文
+        
+        可以直接包装 iter_papers 的结果流；未启用已处理论文索引时原样产出。
+        论文在这里按索引分类，分类结果不写入论文（不会随论文保存）。
+        
+        Args:
+            papers: 论文列表或迭代器
+            skipped: 传入时收集被跳过的论文（区分“没有论文”和“论文都已处理过”）
+        
+        Yields:
+            需要处理的论文
+        """
+        if self.seen_index is None:
+            yield from papers
+            return
+        
+        count = 0
+        for paper in papers:
+            if self.seen_index.classify(paper) == SeenIndex.PROCESSED:
+                count += 1
+                if skipped is not None:
+                    skipped.append(paper)
+                self.logger.debug(f"跳过已处理的论文: {paper['id']}")
+                continue
+            yield paper
+        
+        if count:
+            self.logger.info(f"已跳过 {count} 篇之前处理过的论文")
+    
+    def mark_processed(self, papers: List[Dict[str, Any]]):
+        """把论文记录到已处理论文索引（总结失败或 LLM 调用失败回退为手动格式化的论文不记录，下次运行会重试）
+        
+        Args:
+            papers: 论文列表（可以是总结结果）
+        """
+        if self.seen_index is None:
+            return
+        
+        self.seen_index.mark_processed([
+            p for p in papers if not p.get('summary_error') and not p.get('summary_fallback')
+        ])
+    
+    def build_date_range_query(self, start: datetime, end: datetime) -> str:
+        """构建限定提交日期范围的查询
+        
+        Args:
+            start: 起始时间（包含）
+            end: 结束时间（包含）
+        
+        Returns:
+            查询字符串
+        """
+        return f"{self.build_query()} AND submittedDate:[{start:%Y%m%d%H%M} TO {end:%Y%m%d%H%M}]"
+    
+    def fetch_date_range(self, start: datetime, end: datetime) -> List[Paper]:
+        """获取指定提交日期范围内的全部论文（不受 max_results 和 days_back 限制，不保存）
+        
+        Args:
+            start: 起始时间（包含）
+            end: 结束时间（包含）
+        
         Returns:
             论文列表
         """
+        search = self._build_search(self.build_date_range_query(start, end))
+        search.max_results = None
+        
+        # 与每日查询共用每日论文数的观察结果，尽量一次取完整个时间片
+        query = self.build_query()
+        days = max((end - start).total_seconds() / 86400, 1)
+        page_size = self.client.plan_page_size(query, None, days)
+        
+        papers = [self._extract_paper_info(result) for result in self.client.results(search, page_size=page_size)]
+        self.client.record_window(query, len(papers), days)
+        
+        if self.keyword_filter == 'local':
+            papers = list(self.keyword_matcher.filter(papers))
+        return papers
+    
+    def iter_archived(self, start: datetime = None, end: datetime = None) -> Iterator[Paper]:
+        """从原始条目归档重新解析论文（不访问 arXiv，不保存）
+        
+        归档中可能包含其他查询（如订阅匹配的共享爬取）获取的条目，因此按当前配置的
+        类别和关键词在本地重新筛选。
+        
+        Args:
+            start: 起始发布日期（包含），默认不限
+            end: 结束发布日期（包含），默认不限
+        
+        Yields:
+            论文记录
+        
+        Raises:
+            ValueError: 未启用原始条目归档
+        """
+        if self.archive is None:
+            raise ValueError("未启用原始条目归档（arxiv.archive.enabled）")
+        
+        categories = set(self.categories)
+        count = 0
+        for result in self.archive.iter_results(start, end):
+            paper = self._extract_paper_info(result)
+            if not categories.intersection(paper['categories']):
+                continue
+            if self.keyword_matcher and not self.keyword_matcher.match_paper(paper):
+                continue
+            count += 1
+            yield paper
+        
+        self.logger.info(f"✅ 从归档重新解析了 {count} 篇论文")
+    
+    def _log_fetch_start(self, fan_out: str = None):
+        """打印爬取配置
+        
+        Args:
+            fan_out: 子查询拆分方式
+        """
         self.logger.info("=" * 60)
         self.logger.info("开始爬取 arXiv 论文")
         self.logger.info(f"类别: {', '.join(self.categories)}")
         if self.keywords:
             self.logger.info(f"关键词: {', '.join(self.keywords)}")
         self.logger.info(f"最大结果数: {self.max_results}")
+        if fan_out:
+            self.logger.info(f"并发子查询: 按 {fan_out} 拆分，最多 {self.max_workers} 个并发")
         self.logger.info("=" * 60)
         
-        # 构建查询
-        query = self.build_query()
+    def finish_fetch(self, papers: List[Dict[str, Any]], watermarks: Dict[str, Dict[str, Any]]):
+        """结果流处理完成后保存论文数据并推进水位线
+        
+        iter_papers(save=False) 的调用方在下游（全文提取、链接补全）处理完成后调用，
+        保存的论文带有下游补充的字段。
+        
+        Args:
+            papers: 最终的论文列表
+            watermarks: _compute_watermarks 计算出的新水位线
+        """
+        self.logger.info("=" * 60)
+        self.logger.info(f"✅ 成功获取 {len(papers)} 篇论文")
+        self.logger.info("=" * 60)
+            
+        # 保存论文数据
+        self._save_papers(papers)
+            
+        # 论文保存成功后再推进水位线
+        self.save_watermarks(watermarks)
+    
+    def _build_search(self, query: str) -> arxiv.Search:
+        """根据查询字符串创建搜索对象
+        
+        Args:
+            query: 查询字符串
         
+        Returns:
+            arxiv.Search 对象
+        """
         # 设置排序方式
         sort_by_map = {
             'submittedDate': arxiv.SortCriterion.SubmittedDate,
@@ -120,70 +581,350 @@ class ArxivFetcher:
         }
         sort_order = sort_order_map.get(self.sort_order, arxiv.SortOrder.Descending)
         
-        # 创建搜索对象
-        search = arxiv.Search(
+        return arxiv.Search(
             query=query,
             max_results=self.max_results,
             sort_by=sort_criterion,
             sort_order=sort_order
         )
         
-        # 获取论文
-        papers = []
-        cutoff_date = datetime.now() - timedelta(days=days_back)
+    def _iter_query(self, query: str, days_back: int, incremental: bool,
+                    completed_queries: set = None) -> Iterator[Paper]:
+        """执行单个查询，逐页获取并产出论文
         
-        try:
-            self.logger.info("正在获取论文...")
-            for result in search.results():
-                # 检查提交日期
-                if result.published.replace(tzinfo=None) < cutoff_date:
-                    self.logger.debug(f"论文 {result.title} 发布于 {result.published}，早于截止日期")
+        Args:
+            query: 查询字符串
+            days_back: 获取过去几天的论文
+            incremental: 是否使用增量模式
+            completed_queries: 用于收集完整遍历的查询的集合（越过截止日期或水位线，
+                或结果流在 max_results 之前结束；被截断的查询不加入）
+        
+        Yields:
+            论文信息字典
+        """
+        search = self._build_search(query)
+        
+        count = 0
+        now = datetime.now()
+        cutoff_date = now - timedelta(days=days_back)
+        
+        # 按提交日期降序时，结果流一旦越过截止日期或水位线即可停止翻页
+        early_stop = self._is_time_ordered()
+        
+        # 本地关键词过滤时 arXiv 返回的结果不一定匹配，改为匹配到 max_results 篇后停止；
+        # 结果流不按时间排序时无法靠截止日期停止，仍只检查前 max_results 个结果
+        local_filter = self.keyword_filter == 'local' and bool(self.keyword_matcher)
+        if local_filter and early_stop:
+            search.max_results = None
+        watermark = self._load_watermark(query) if incremental else None
+        if incremental:
+            if not early_stop:
+                self.logger.warning("增量模式需要 sort_by=submittedDate 且 sort_order=descending，已忽略水位线")
+                watermark = None
+            elif watermark:
+                ids = watermark.get('ids') or [watermark['id']]
+                self.logger.info(f"增量模式: 上次水位线 {watermark['published']} ({', '.join(ids)})")
+        
+        # 按预期的论文数选择页大小：有水位线时只需要取水位线之后的论文
+        window_days = days_back
+        if watermark:
+            since_watermark = now - datetime.fromisoformat(watermark['published']).replace(tzinfo=None)
+            window_days = min(days_back, max(since_watermark.total_seconds() / 86400, 1 / 24))
+        page_size = self.client.plan_page_size(query, search.max_results, window_days if early_stop else None)
+        self.logger.debug(f"页大小: {page_size}")
+        
+        scanned = 0
+        received = 0
+        covered = False
+        for result in self.client.results(search, page_size=page_size):
+            received += 1
+            # 检查提交日期
+            if result.published.replace(tzinfo=None) < cutoff_date:
+                self.logger.debug(f"论文 {result.title} 发布于 {result.published}，早于截止日期")
+                if early_stop:
+                    # 完整遍历了时间窗口，记录每日论文数供下次估算页大小
+                    self.client.record_window(query, scanned, days_back)
+                    self.logger.info("已越过截止日期，停止翻页")
+                    covered = True
+                    break
+                continue
+            scanned += 1
+            
+            # 检查水位线
+            if watermark:
+                position = self._compare_watermark(result, watermark)
+                if position < 0:
+                    self.logger.info("已越过上次水位线，停止翻页")
+                    covered = True
+                    break
+                if position == 0:
+                    self.logger.debug(f"论文 {result.title} 已在上次运行中获取")
                     continue
                 
-                # 提取论文信息
-                paper = self._extract_paper_info(result)
-                papers.append(paper)
+            # 提取论文信息
+            paper = self._extract_paper_info(result)
+            if local_filter and not self.keyword_matcher.match_paper(paper):
+                continue
+            count += 1
+                
+            self.logger.info(f"✓ [{count}] {paper['title'][:60]}...")
+            yield paper
+            
+            if local_filter and self.max_results and count >= self.max_results:
+                break
+        else:
+            # 结果流自然结束：只有不是因 max_results 截断时才是完整的
+            covered = search.max_results is None or received < search.max_results
+        
+        if covered and completed_queries is not None:
+            completed_queries.add(query)
                 
-                self.logger.info(f"✓ [{len(papers)}] {paper['title'][:60]}...")
+    def _iter_queries(self, queries: List[str], days_back: int, incremental: bool,
+                      failed_queries: set, completed_queries: set = None) -> Iterator[Tuple[str, Paper]]:
+        """执行一个或多个查询，按到达顺序产出 (查询, 论文)
             
-            self.logger.info("=" * 60)
-            self.logger.info(f"✅ 成功获取 {len(papers)} 篇论文")
-            self.logger.info("=" * 60)
+        多个查询时在线程池中并发执行，所有子查询共享同一个客户端和限速器；
+        单个子查询失败只记录错误并加入 failed_queries，不影响其他子查询。
             
-            # 保存论文数据
-            self._save_papers(papers)
+        Args:
+            queries: 查询列表
+            days_back: 获取过去几天的论文
+            incremental: 是否使用增量模式
+            failed_queries: 用于收集失败子查询的集合
+            completed_queries: 用于收集完整遍历且论文已全部产出的查询的集合
             
-            return papers
+        Yields:
+            (查询字符串, 论文信息字典)
             
-        except Exception as e:
-            self.logger.error(f"❌ 获取论文失败: {str(e)}", exc_info=True)
-            raise
+        Raises:
+            Exception: 所有子查询都失败时抛出最后一个错误
+        """
+        if len(queries) == 1:
+            for paper in self._iter_query(queries[0], days_back, incremental, completed_queries):
+                yield queries[0], paper
+            return
+        
+        output = queue.Queue()
+        stop = threading.Event()
+        done = object()
+        # 子查询完整遍历后加入 covered，其论文全部产出（收到 done）后才算完成
+        covered = set()
+        
+        def worker(query):
+            try:
+                for paper in self._iter_query(query, days_back, incremental, covered):
+                    if stop.is_set():
+                        return
+                    output.put((query, paper))
+                self.logger.info(f"✓ 子查询完成: {query}")
+            except Exception as e:
+                output.put((query, e))
+            finally:
+                output.put((query, done))
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        last_error = None
+        try:
+            for query in queries:
+                executor.submit(worker, query)
+        
+            remaining = len(queries)
+            while remaining:
+                query, item = output.get()
+                if item is done:
+                    remaining -= 1
+                    if query in covered and completed_queries is not None:
+                        completed_queries.add(query)
+                elif isinstance(item, Exception):
+                    last_error = item
+                    failed_queries.add(query)
+                    self.logger.error(f"❌ 子查询失败: {query}: {str(item)}")
+                else:
+                    yield query, item
+        finally:
+            # 下游提前停止消费时，通知仍在运行的子查询尽快退出
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if len(failed_queries) == len(queries) and last_error is not None:
+            raise last_error
+    
+    def _merge_papers(self, paper_lists) -> List[Dict[str, Any]]:
+        """合并多个子查询的结果并按 arXiv ID 去重
+        
+        Args:
+            paper_lists: 多个论文列表
+        
+        Returns:
+            去重后的论文列表（不超过 max_results 篇）
+        """
+        merged = {}
+        for papers in paper_lists:
+            for paper in papers:
+                merged.setdefault(self._base_id(paper['id']), paper)
+        
+        papers = list(merged.values())
+        if self._is_time_ordered():
+            papers.sort(key=lambda p: p['published'], reverse=True)
+        
+        if self.max_results:
+            papers = papers[:self.max_results]
+        
+        return papers
+    
+    def _is_time_ordered(self) -> bool:
+        """结果流是否按提交日期从新到旧排列
+        
+        Returns:
+            是否可以在越过截止日期后提前终止
+        """
+        return self.sort_by == 'submittedDate' and self.sort_order == 'descending'
+    
+    def _get_watermark_path(self) -> str:
+        """获取水位线文件路径
+        
+        Returns:
+            水位线文件路径
+        """
+        return f"{get_data_path(self.config, 'papers')}/watermarks.json"
+    
+    def _load_watermark(self, query: str) -> Optional[Dict[str, Any]]:
+        """加载指定查询的水位线
+        
+        Args:
+            query: 查询字符串
+            
+        Returns:
+            水位线字典（published, ids），不存在时返回 None
+        """
+        watermarks = load_json(self._get_watermark_path()) or {}
+        return watermarks.get(query)
     
-    def _extract_paper_info(self, result: arxiv.Result) -> Dict[str, Any]:
+    def _compute_watermarks(self, papers: List[Dict[str, Any]],
+                            results_by_query: Dict[str, List[Dict[str, Any]]],
+                            completed_queries: set, incremental: bool) -> Dict[str, Dict[str, Any]]:
+        """根据本次获取的论文计算各查询的新水位线
+        
+        水位线表示“此前的论文都已获取”，因此只推进完整遍历到截止日期或上次水位线的查询：
+        因 max_results 截断的查询，以及有论文在合并截断时被丢弃的查询都保持原水位线，
+        下次运行会重新获取缺失的部分。
+        
+        Args:
+            papers: 最终保存的论文列表
+            results_by_query: 查询到其论文列表的映射
+            completed_queries: 完整遍历的查询集合
+            incremental: 是否使用增量模式
+        
+        Returns:
+            查询到新水位线的映射（可直接传给 save_watermarks）
+        """
+        if not incremental or not self._is_time_ordered():
+            return {}
+        
+        kept_ids = {self._base_id(paper['id']) for paper in papers}
+        stored = load_json(self._get_watermark_path()) or {}
+        watermarks = {}
+        for query, query_papers in results_by_query.items():
+            if not query_papers:
+                continue
+            if query not in completed_queries:
+                self.logger.warning(f"⚠️  查询结果被 max_results 截断，不推进水位线: {query}")
+                continue
+            if any(self._base_id(paper['id']) not in kept_ids for paper in query_papers):
+                self.logger.warning(f"⚠️  部分论文在合并时被丢弃，不推进水位线: {query}")
+                continue
+            
+            # 同一发布时间的论文在结果流中顺序不固定，记录该时间点的全部 ID
+            newest = max(paper['published'] for paper in query_papers)
+            ids = {self._base_id(paper['id']) for paper in query_papers if paper['published'] == newest}
+            previous = stored.get(query)
+            if previous and previous['published'] == newest:
+                ids.update(previous.get('ids') or [previous['id']])
+            
+            watermarks[query] = {
+                'published': newest,
+                'ids': sorted(ids),
+                'updated_at': datetime.now().isoformat(),
+            }
+        return watermarks
+    
+    def save_watermarks(self, watermarks: Dict[str, Dict[str, Any]]):
+        """保存新水位线
+        
+        调用方应在论文数据成功保存后再调用，避免中途失败时跳过未保存的论文。
+        
+        Args:
+            watermarks: _compute_watermarks 计算出的新水位线
+        """
+        if not watermarks:
+            return
+        
+        stored = load_json(self._get_watermark_path()) or {}
+        stored.update(watermarks)
+        save_json(stored, self._get_watermark_path())
+        for watermark in watermarks.values():
+            self.logger.info(f"💾 水位线已更新: {watermark['published']} ({', '.join(watermark['ids'])})")
+    
+    def _compare_watermark(self, result: arxiv.Result, watermark: Dict[str, Any]) -> int:
+        """比较论文与水位线的先后
+        
+        同一发布时间的论文在结果流中顺序不固定、arXiv ID 也不按该顺序排列，
+        因此水位线记录该发布时间的全部 ID，只有发布时间严格早于水位线时才认为越过了水位线。
+        
+        Args:
+            result: arxiv.Result 对象
+            watermark: 水位线字典
+            
+        Returns:
+            -1 表示已越过水位线，0 表示已获取过，1 表示新论文
+        """
+        watermark_published = datetime.fromisoformat(watermark['published'])
+        if result.published < watermark_published:
+            return -1
+        if result.published == watermark_published:
+            # 兼容旧格式（只记录一个 id）
+            ids = watermark.get('ids') or [watermark['id']]
+            if self._base_id(result.entry_id.split('/')[-1]) in ids:
+                return 0
+        return 1
+    
+    @staticmethod
+    def _base_id(arxiv_id: str) -> str:
+        """去除 arXiv ID 的版本号
+        
+        Args:
+            arxiv_id: 带版本号的 arXiv ID，如 2506.08052v2
+            
+        Returns:
+            不带版本号的 arXiv ID
+        """
+        return re.sub(r'v\d+$', '', arxiv_id)
+    
+    def _extract_paper_info(self, result: arxiv.Result) -> Paper:
         """提取论文信息
         
         Args:
             result: arxiv.Result 对象
             
         Returns:
-            论文信息字典
+            论文记录（兼容字典访问）
         """
-        return {
-            'id': result.entry_id.split('/')[-1],  # arXiv ID
-            'title': result.title,
-            'authors': [author.name for author in result.authors],
-            'abstract': result.summary.replace('\n', ' ').strip(),
-            'categories': result.categories,
-            'primary_category': result.primary_category,
-            'published': result.published.isoformat(),
-            'updated': result.updated.isoformat(),
-            'pdf_url': result.pdf_url,
-            'entry_url': result.entry_id,
-            'comment': result.comment if hasattr(result, 'comment') else None,
-            'journal_ref': result.journal_ref if hasattr(result, 'journal_ref') else None,
-            'doi': result.doi if hasattr(result, 'doi') else None,
-            'fetched_at': datetime.now().isoformat(),
-        }
+        return Paper(
+            id=result.entry_id.split('/')[-1],  # arXiv ID
+            title=result.title,
+            authors=[author.name for author in result.authors],
+            abstract=result.summary.replace('\n', ' ').strip(),
+            categories=result.categories,
+            primary_category=result.primary_category,
+            published=result.published.isoformat(),
+            updated=result.updated.isoformat(),
+            pdf_url=result.pdf_url,
+            entry_url=result.entry_id,
+            comment=result.comment if hasattr(result, 'comment') else None,
+            journal_ref=result.journal_ref if hasattr(result, 'journal_ref') else None,
+            doi=result.doi if hasattr(result, 'doi') else None,
+            fetched_at=datetime.now().isoformat(),
+        )
     
     def _save_papers(self, papers: List[Dict[str, Any]]):
         """保存论文数据
@@ -195,26 +936,15 @@ class ArxivFetcher:
             self.logger.warning("没有论文需要保存")
             return
         
-        # 获取存储路径
-        data_path = get_data_path(self.config, 'papers')
-        Path(data_path).mkdir(parents=True, exist_ok=True)
-        
-        # 按日期保存
-        date_str = get_date_string()
-        filepath = f"{data_path}/papers_{date_str}.json"
-        
-        # 保存数据
-        save_json(papers, filepath)
-        self.logger.info(f"💾 论文数据已保存到: {filepath}")
-        
-        # 同时保存一份到 latest.json，方便 Web 服务读取
-        latest_filepath = f"{data_path}/latest.json"
-        save_json({
-            'date': date_str,
-            'count': len(papers),
-            'papers': papers
-        }, latest_filepath)
-        self.logger.info(f"💾 最新数据已保存到: {latest_filepath}")
+        # 更新作者索引（同时为每篇论文写入 author_ids）
+        if self.author_index is not None:
+            self.author_index.add_papers(papers)
+        
+        # 按 storage.type 保存（JSON 文件或 SQLite 数据库）
+        self.storage.save_papers(papers)
+    
+        if self.corpus is not None:
+            self.corpus.add_papers(papers)
     
     def get_paper_stats(self, papers: List[Dict[str, Any]]) -> Dict[str, Any]:
         """获取论文统计信息
@@ -234,11 +964,15 @@ class ArxivFetcher:
             for category in paper['categories']:
                 category_counts[category] = category_counts.get(category, 0) + 1
         
-        # 统计作者数量
-        author_counts = {}
-        for paper in papers:
-            for author in paper['authors']:
-                author_counts[author] = author_counts.get(author, 0) + 1
+        # 统计作者数量（启用作者索引时按规范化后的作者合并不同写法）
+        if self.author_index is not None:
+            # 只查询索引：论文在保存时才写入索引
+            author_counts = dict(self.author_index.count_author_names(papers))
+        else:
+            author_counts = {}
+            for paper in papers:
+                for author in paper['authors']:
+                    author_counts[author] = author_counts.get(author, 0) + 1
         
         # 找出高产作者（发表2篇以上）
         prolific_authors = {k: v for k, v in author_counts.items() if v >= 2}
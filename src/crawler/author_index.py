@@ -0,0 +1,503 @@
+"""
+作者与单位规范化索引
+
+把作者姓名规范化后驻留为整数 ID（“Xinggang Wang”、“X. Wang”、“Wang, Xinggang” 归为同一作者），
+作者单位同样按规范化后的名称驻留。索引随着论文的到达增量更新并持久化在 SQLite 中，
+启动时整体加载到内存，统计和查询都是对整数 ID 的字典操作，不需要每次重新扫描姓名字符串。
+
+多个进程可以共用同一个索引：写入在 BEGIN IMMEDIATE 事务中进行，作者和单位 ID 由数据库分配；
+其他进程写入后（版本号变化）先重新加载再分配，保证同一个 ID 不会指向两位作者。
+
+缩写名只在没有歧义时合并：同一姓氏下出现两个首字母相同的全名作者后（如 Xinggang Wang 和
+Xiaoming Wang），之后的“X. Wang”单独记为一个缩写作者，已经归入的论文不再改变。
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+from contextlib import closing
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+from .seen_index import SeenIndex
+
+
+# 姓名后缀（不参与匹配）
+_NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+
+def _fold(text: str) -> str:
+    """去掉重音符号并转为小写"""
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+
+
+def split_name(name: str) -> Tuple[List[str], str]:
+    """把作者姓名拆分为名和姓（规范化为小写、无重音、无标点）
+    
+    支持“名 姓”和“姓, 名”两种写法；连字符连接的名合并为一个（Xing-Gang -> xinggang，
+    X.-G. -> x g）。
+    
+    Args:
+        name: 作者姓名
+    
+    Returns:
+        (名的列表, 姓)，只有一个词的姓名返回 ([], 该词)
+    """
+    name = _fold(name)
+    if ',' in name:
+        surname, _, given = name.partition(',')
+        name = f"{given} {surname}"
+    
+    tokens = [re.sub(r"[-'’`]", '', token) for token in re.split(r'[\s.,]+', name)]
+    tokens = [re.sub(r'[^\w]', '', token) for token in tokens]
+    tokens = [token for token in tokens if token]
+    while len(tokens) > 1 and tokens[-1] in _NAME_SUFFIXES:
+        tokens.pop()
+    
+    if not tokens:
+        return [], ''
+    return tokens[:-1], tokens[-1]
+
+
+def normalize_affiliation(affiliation: str) -> str:
+    """规范化作者单位名称（用于判断两个写法是否为同一单位）
+    
+    Args:
+        affiliation: 单位名称
+    
+    Returns:
+        规范化后的键
+    """
+    key = re.sub(r'[^\w\s]', ' ', _fold(affiliation).replace('&', ' and '))
+    key = re.sub(r'\s+', ' ', key).strip()
+    return re.sub(r'^the ', '', key)
+
+
+class AuthorIndex:
+    """持久化的作者与单位驻留索引"""
+    
+    def __init__(self, path: str):
+        """初始化（从数据库加载整个索引到内存）
+        
+        Args:
+            path: SQLite 数据库路径
+        """
+        self.path = path
+        self.logger = logging.getLogger('daily_arxiv.author_index')
+        self._lock = threading.Lock()
+        
+        # 作者 ID -> 显示名称 / 论文数
+        self._names: Dict[int, str] = {}
+        self._paper_counts: Dict[int, int] = {}
+        # 规范化全名（首个名 + 姓）-> 作者 ID
+        self._aliases: Dict[str, int] = {}
+        # 首字母 + 姓 -> 唯一的全名作者 ID（0 表示有歧义）
+        self._initials: Dict[str, int] = {}
+        # 单位 ID -> 显示名称 / 论文数，规范化名称 -> 单位 ID
+        self._affiliation_names: Dict[int, str] = {}
+        self._affiliation_counts: Dict[int, int] = {}
+        self._affiliation_keys: Dict[str, int] = {}
+        # 已索引的论文（不带版本号的 ID）-> (作者 ID, 单位 ID)
+        self._papers: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        
+        # 已加载的数据库版本（每次写入加一），None 表示需要重新加载
+        self._version = None
+        
+        # 本批次待写入数据库的变更
+        self._dirty_authors = set()
+        self._dirty_aliases = set()
+        self._dirty_initials = set()
+        self._dirty_affiliations = set()
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS authors ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, paper_count INTEGER)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, author_id INTEGER)")
+            conn.execute("CREATE TABLE IF NOT EXISTS initials (key TEXT PRIMARY KEY, author_id INTEGER)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS affiliations ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, key TEXT UNIQUE, paper_count INTEGER)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                "base_id TEXT PRIMARY KEY, author_ids TEXT, affiliation_ids TEXT)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            
+            conn.execute("BEGIN")
+            self._refresh(conn)
+            conn.execute("COMMIT")
+    
+    def add_papers(self, papers: Iterable[Dict[str, Any]]) -> int:
+        """把一批论文加入索引，并为每篇论文写入 author_ids
+        
+        已索引的论文直接使用保存的作者 ID；之前没有单位信息、现在有了（如全文提取之后）的论文
+        补充单位。整批变更在一个事务中写入。
+        
+        Args:
+            papers: 论文列表或迭代器
+        
+        Returns:
+            新索引的论文数
+        """
+        new_papers = {}
+        with self._lock, closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 持有写锁后再加载其他进程的写入，之后分配的 ID 不会与其他进程冲突
+                self._refresh(conn)
+                for paper in papers:
+                    base_id = SeenIndex.split_id(paper['id'])[0]
+                    indexed = self._papers.get(base_id)
+                
+                    if indexed is None:
+                        author_ids = tuple(dict.fromkeys(
+                            self._resolve(name, conn) for name in paper.get('authors') or []
+                        ))
+                        for author_id in author_ids:
+                            self._paper_counts[author_id] += 1
+                            self._dirty_authors.add(author_id)
+                        affiliation_ids = self._intern_affiliations(conn, paper.get('affiliations'))
+                    elif not indexed[1] and paper.get('affiliations'):
+                        author_ids = indexed[0]
+                        affiliation_ids = self._intern_affiliations(conn, paper.get('affiliations'))
+                    else:
+                        paper['author_ids'] = list(indexed[0])
+                        continue
+                
+                    self._papers[base_id] = (author_ids, affiliation_ids)
+                    new_papers[base_id] = (author_ids, affiliation_ids)
+                    paper['author_ids'] = list(author_ids)
+            
+                if new_papers:
+                    self._flush(conn, new_papers)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                # 内存中的变更没有写入数据库，下次使用前重新加载
+                self._version = None
+                self._clear_dirty()
+                raise
+        
+        return len(new_papers)
+    
+    def resolve(self, name: str) -> Optional[int]:
+        """查询作者姓名对应的 ID（不创建新作者）
+        
+        Args:
+            name: 作者姓名（任意写法）
+        
+        Returns:
+            作者 ID，未索引的作者返回 None
+        """
+        with self._lock:
+            return self._resolve(name)
+    
+    def name(self, author_id: int) -> str:
+        """获取作者的显示名称（合并过的作者使用全名）"""
+        return self._names[author_id]
+    
+    def paper_count(self, author_id: int) -> int:
+        """获取作者在整个索引中的论文数"""
+        return self._paper_counts.get(author_id, 0)
+    
+    def affiliation_name(self, affiliation_id: int) -> str:
+        """获取单位的显示名称"""
+        return self._affiliation_names[affiliation_id]
+    
+    def count_authors(self, papers: Iterable[Dict[str, Any]]) -> Counter:
+        """统计一批论文中每位作者的论文数（论文需先经过 add_papers）
+        
+        Args:
+            papers: 论文列表
+        
+        Returns:
+            作者 ID -> 论文数
+        """
+        counts = Counter()
+        for paper in papers:
+            counts.update(self._paper_entry(paper)[0])
+        return counts
+    
+    def count_affiliations(self, papers: Iterable[Dict[str, Any]]) -> Counter:
+        """统计一批论文中每个单位的论文数（论文需先经过 add_papers）
+        
+        Args:
+            papers: 论文列表
+        
+        Returns:
+            单位 ID -> 论文数
+        """
+        counts = Counter()
+        for paper in papers:
+            counts.update(self._paper_entry(paper)[1])
+        return counts
+    
+    def count_author_names(self, papers: Iterable[Dict[str, Any]]) -> Counter:
+        """按显示名称统计一批论文中每位作者的论文数（只查询索引，不写入）
+        
+        已索引的论文使用保存的作者 ID；其他论文按姓名查询，索引中没有的作者使用原始姓名。
+        
+        Args:
+            papers: 论文列表
+        
+        Returns:
+            作者显示名称 -> 论文数
+        """
+        counts = Counter()
+        with self._lock:
+            self._reload_if_changed()
+            for paper in papers:
+                indexed = self._papers.get(SeenIndex.split_id(paper['id'])[0])
+                if indexed is not None:
+                    names = [self._names[author_id] for author_id in indexed[0]]
+                else:
+                    names = []
+                    for name in paper.get('authors') or []:
+                        author_id = self._resolve(name)
+                        names.append(name if author_id is None else self._names[author_id])
+                counts.update(set(names))
+        return counts
+    
+    def count_affiliation_names(self, papers: Iterable[Dict[str, Any]]) -> Counter:
+        """按显示名称统计一批论文中每个单位的论文数（只查询索引，不写入）
+        
+        Args:
+            papers: 论文列表
+        
+        Returns:
+            单位显示名称 -> 论文数
+        """
+        counts = Counter()
+        with self._lock:
+            self._reload_if_changed()
+            for paper in papers:
+                indexed = self._papers.get(SeenIndex.split_id(paper['id'])[0])
+                if indexed is not None and indexed[1]:
+                    names = [self._affiliation_names[affiliation_id] for affiliation_id in indexed[1]]
+                else:
+                    names = []
+                    for affiliation in paper.get('affiliations') or []:
+                        key = normalize_affiliation(affiliation)
+                        if key:
+                            affiliation_id = self._affiliation_keys.get(key)
+                            names.append(affiliation.strip() if affiliation_id is None
+                                         else self._affiliation_names[affiliation_id])
+                counts.update(set(names))
+        return counts
+    
+    def __len__(self) -> int:
+        return len(self._names)
+    
+    def _paper_entry(self, paper: Dict[str, Any]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """获取已索引论文的作者 ID 和单位 ID"""
+        return self._papers.get(SeenIndex.split_id(paper['id'])[0], ((), ()))
+    
+    def _resolve(self, name: str, conn: sqlite3.Connection = None) -> Optional[int]:
+        """把作者姓名解析为作者 ID（调用方持有锁）
+        
+        Args:
+            name: 作者姓名
+            conn: 写事务中的数据库连接，未索引的作者在其中创建新 ID；为 None 时只查询
+        
+        Returns:
+            作者 ID，只查询且未索引时返回 None
+        """
+        create = conn is not None
+        given, surname = split_name(name)
+        if not surname:
+            surname = name.strip().lower()
+        if not given:
+            # 只有一个词的姓名只能精确匹配
+            author_id = self._aliases.get(surname)
+            if author_id is None and create:
+                author_id = self._new_author(conn, name, surname)
+            return author_id
+        
+        first = given[0]
+        full_key = f"{first} {surname}"
+        initial_key = f"{first[0]} {surname}"
+        
+        author_id = self._aliases.get(full_key)
+        if author_id is not None:
+            return author_id
+        
+        owner = self._initials.get(initial_key)
+        if len(first) == 1:
+            # 缩写名：归入唯一的同首字母全名作者，否则作为单独的缩写作者
+            if owner:
+                return owner
+            return self._new_author(conn, name, full_key) if create else None
+        
+        if not create:
+            return None
+        
+        if owner is None:
+            # 第一个该首字母的全名作者：之前出现的缩写作者升级为全名
+            author_id = self._aliases.pop(initial_key, None)
+            if author_id is not None:
+                self._dirty_aliases.add(initial_key)
+                self._names[author_id] = name
+                self._dirty_authors.add(author_id)
+            else:
+                author_id = self._new_author(conn, name)
+            self._initials[initial_key] = author_id
+        else:
+            # 同首字母出现第二个全名作者，此后缩写名不再合并
+            author_id = self._new_author(conn, name)
+            self._initials[initial_key] = 0
+        self._dirty_initials.add(initial_key)
+        
+        self._aliases[full_key] = author_id
+        self._dirty_aliases.add(full_key)
+        return author_id
+    
+    def _new_author(self, conn: sqlite3.Connection, name: str, alias: str = None) -> int:
+        """创建新作者，ID 由数据库分配（调用方持有锁和写事务）"""
+        author_id = conn.execute(
+            "INSERT INTO authors (name, paper_count) VALUES (?, 0) RETURNING id", (name,)
+        ).fetchall()[0][0]
+        self._names[author_id] = name
+        self._paper_counts[author_id] = 0
+        self._dirty_authors.add(author_id)
+        if alias is not None:
+            self._aliases[alias] = author_id
+            self._dirty_aliases.add(alias)
+        return author_id
+    
+    def _intern_affiliations(self, conn: sqlite3.Connection, affiliations: Optional[List[str]]) -> Tuple[int, ...]:
+        """把论文的单位列表驻留为单位 ID 并累加论文数（调用方持有锁和写事务）"""
+        affiliation_ids = []
+        for affiliation in affiliations or []:
+            key = normalize_affiliation(affiliation)
+            if not key:
+                continue
+            affiliation_id = self._affiliation_keys.get(key)
+            if affiliation_id is None:
+                affiliation_id = conn.execute(
+                    "INSERT INTO affiliations (name, key, paper_count) VALUES (?, ?, 0) RETURNING id",
+                    (affiliation.strip(), key)
+                ).fetchall()[0][0]
+                self._affiliation_names[affiliation_id] = affiliation.strip()
+                self._affiliation_counts[affiliation_id] = 0
+                self._affiliation_keys[key] = affiliation_id
+            if affiliation_id not in affiliation_ids:
+                affiliation_ids.append(affiliation_id)
+                self._affiliation_counts[affiliation_id] += 1
+                self._dirty_affiliations.add(affiliation_id)
+        return tuple(affiliation_ids)
+    
+    def _flush(self, conn: sqlite3.Connection, new_papers: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]]):
+        """把本批次的变更写入数据库并推进版本号（调用方持有锁和写事务）"""
+        conn.executemany(
+            "UPDATE authors SET name = ?, paper_count = ? WHERE id = ?",
+            [(self._names[i], self._paper_counts[i], i) for i in self._dirty_authors]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO aliases VALUES (?, ?)",
+            [(alias, self._aliases[alias]) for alias in self._dirty_aliases if alias in self._aliases]
+        )
+        conn.executemany(
+            "DELETE FROM aliases WHERE alias = ?",
+            [(alias,) for alias in self._dirty_aliases if alias not in self._aliases]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO initials VALUES (?, ?)",
+            [(key, self._initials[key]) for key in self._dirty_initials]
+        )
+        conn.executemany(
+            "UPDATE affiliations SET paper_count = ? WHERE id = ?",
+            [(self._affiliation_counts[i], i) for i in self._dirty_affiliations]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO papers VALUES (?, ?, ?)",
+            [(base_id, json.dumps(author_ids), json.dumps(affiliation_ids))
+             for base_id, (author_ids, affiliation_ids) in new_papers.items()]
+        )
+        self._version = conn.execute(
+            "INSERT INTO meta VALUES ('version', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1 RETURNING value"
+        ).fetchall()[0][0]
+        self._clear_dirty()
+        
+        self.logger.debug(f"作者索引: 新增 {len(new_papers)} 篇论文，共 {len(self._names)} 位作者")
+        
+    def _clear_dirty(self):
+        """清空待写入的变更记录"""
+        self._dirty_authors.clear()
+        self._dirty_aliases.clear()
+        self._dirty_initials.clear()
+        self._dirty_affiliations.clear()
+        
+    def _reload_if_changed(self):
+        """在读事务中检查版本号，其他进程写入过时重新加载（调用方持有锁）"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN")
+            self._refresh(conn)
+            conn.execute("COMMIT")
+    
+    def _refresh(self, conn: sqlite3.Connection):
+        """数据库版本号与内存中的不同时重新加载整个索引（调用方持有锁，且在事务中调用）"""
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        version = row[0] if row else 0
+        if version == self._version:
+            return
+        
+        self._names.clear()
+        self._paper_counts.clear()
+        for author_id, name, paper_count in conn.execute("SELECT id, name, paper_count FROM authors"):
+            self._names[author_id] = name
+            self._paper_counts[author_id] = paper_count
+        self._aliases = dict(conn.execute("SELECT alias, author_id FROM aliases"))
+        self._initials = dict(conn.execute("SELECT key, author_id FROM initials"))
+        self._affiliation_names.clear()
+        self._affiliation_counts.clear()
+        self._affiliation_keys.clear()
+        for affiliation_id, name, key, paper_count in conn.execute(
+                "SELECT id, name, key, paper_count FROM affiliations"):
+            self._affiliation_names[affiliation_id] = name
+            self._affiliation_counts[affiliation_id] = paper_count
+            self._affiliation_keys[key] = affiliation_id
+        self._papers = {
+            base_id: (tuple(json.loads(author_ids)), tuple(json.loads(affiliation_ids)))
+            for base_id, author_ids, affiliation_ids in conn.execute("SELECT * FROM papers")
+        }
+        self._version = version
+        
+        self.logger.debug(f"已加载 {len(self._names)} 位作者, {len(self._papers)} 篇论文")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接（手动管理事务）"""
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+
+# 进程内共享的作者索引，同一数据库只加载一次，保证作者 ID 在爬取器和分析器之间一致
+_shared_indexes: Dict[str, AuthorIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_author_index(config: Dict[str, Any]) -> Optional[AuthorIndex]:
+    """获取（或创建）进程内共享的作者索引
+    
+    Args:
+        config: 完整配置字典，读取 arxiv.author_index
+    
+    Returns:
+        作者索引，未启用时返回 None
+    """
+    index_config = config.get('arxiv', {}).get('author_index', {})
+    if not index_config.get('enabled', False):
+        return None
+    
+    path = index_config.get('path', 'data/authors.db')
+    with _shared_lock:
+        if path not in _shared_indexes:
+            _shared_indexes[path] = AuthorIndex(path)
+        return _shared_indexes[path]
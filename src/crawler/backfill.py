@@ -0,0 +1,215 @@
+"""
+历史论文回填
+
+把一个较长的日期范围切分为若干 submittedDate:[X TO Y] 时间片，在共享限速器下并发获取，
+每完成一个时间片就写入检查点，中断后重新运行会跳过已完成的时间片
+
+submittedDate 按 UTC 计算，时间片也按 UTC 日期切分；结束时间还没到的时间片（包含今天）
+不写入检查点，下次运行重新获取
+"""
+import argparse
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+from src.utils import save_json, load_json, get_data_path
+from .arxiv_fetcher import ArxivFetcher
+from .paper import Paper
+from .seen_index import SeenIndex
+
+
+class Backfiller:
+    """按时间片并发回填历史论文"""
+    
+    def __init__(self, config: Dict[str, Any], fetcher: ArxivFetcher = None):
+        """初始化
+        
+        Args:
+            config: 配置字典
+            fetcher: 论文爬取器（默认根据配置创建）
+        """
+        self.config = config
+        self.fetcher = fetcher or ArxivFetcher(config)
+        self.logger = logging.getLogger('daily_arxiv.backfill')
+        self.max_workers = config.get('arxiv', {}).get('max_workers', 4)
+    
+    @staticmethod
+    def plan_slices(start: datetime, end: datetime, slice_days: int = 7) -> List[Tuple[datetime, datetime]]:
+        """把日期范围按 UTC 日期切分为时间片
+        
+        Args:
+            start: 起始日期（包含，只使用日期部分）
+            end: 结束日期（包含，只使用日期部分）
+            slice_days: 每个时间片的天数
+        
+        Returns:
+            (起始时间, 结束时间) 列表（UTC），时间片首尾相接且互不重叠
+        """
+        slices = []
+        slice_start = datetime(start.year, start.month, start.day, tzinfo=timezone.utc)
+        last_day = datetime(end.year, end.month, end.day, tzinfo=timezone.utc)
+        
+        while slice_start <= last_day:
+            slice_end = min(slice_start + timedelta(days=slice_days - 1), last_day)
+            slices.append((slice_start, slice_end.replace(hour=23, minute=59)))
+            slice_start = slice_end + timedelta(days=1)
+        
+        return slices
+    
+    def get_checkpoint_dir(self, start: datetime, end: datetime) -> Path:
+        """获取检查点目录（查询条件变化时使用新的目录）
+        
+        Args:
+            start: 起始日期
+            end: 结束日期
+        
+        Returns:
+            检查点目录
+        """
+        query_hash = hashlib.sha1(self.fetcher.build_query().encode('utf-8')).hexdigest()[:8]
+        name = f"{start:%Y-%m-%d}_{end:%Y-%m-%d}_{query_hash}"
+        return Path(get_data_path(self.config, 'papers')) / 'backfill' / name
+    
+    def run(self, start: datetime, end: datetime, slice_days: int = 7) -> List[Paper]:
+        """执行回填
+        
+        Args:
+            start: 起始日期（包含）
+            end: 结束日期（包含）
+            slice_days: 每个时间片的天数
+        
+        Returns:
+            去重后按发布时间降序排列的论文列表
+        
+        Raises:
+            RuntimeError: 有时间片失败时抛出（已完成的时间片保留在检查点中，重新运行即可续传）
+        """
+        slices = self.plan_slices(start, end, slice_days)
+        checkpoint_dir = self.get_checkpoint_dir(start, end)
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        
+        pending = [s for s in slices if not self._checkpoint_path(checkpoint_dir, s).exists()]
+        
+        self.logger.info("=" * 60)
+        self.logger.info(f"开始回填: {start:%Y-%m-%d} ~ {end:%Y-%m-%d}")
+        self.logger.info(f"时间片: {len(slices)} 个（每片 {slice_days} 天），已完成 {len(slices) - len(pending)} 个")
+        self.logger.info(f"检查点目录: {checkpoint_dir}")
+        self.logger.info("=" * 60)
+        
+        failed = []
+        # 时间片 -> 论文（未写入检查点的时间片从这里合并）
+        fetched = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch_slice, checkpoint_dir, s): s for s in pending}
+            for future in as_completed(futures):
+                slice_start, slice_end = futures[future]
+                try:
+                    fetched[futures[future]] = future.result()
+                    self.logger.info(f"✓ 时间片 {slice_start:%Y-%m-%d} ~ {slice_end:%Y-%m-%d}: "
+                                     f"{len(fetched[futures[future]])} 篇")
+                except Exception as e:
+                    failed.append(futures[future])
+                    self.logger.error(f"❌ 时间片 {slice_start:%Y-%m-%d} ~ {slice_end:%Y-%m-%d} 失败: {str(e)}")
+        
+        if failed:
+            raise RuntimeError(f"{len(failed)} 个时间片获取失败，重新运行即可从检查点继续")
+        
+        papers = self._merge_checkpoints(checkpoint_dir, slices, fetched)
+        
+        output_path = f"{get_data_path(self.config, 'papers')}/backfill_{start:%Y-%m-%d}_{end:%Y-%m-%d}.json"
+        save_json(papers, output_path)
+        
+        self.logger.info("=" * 60)
+        self.logger.info(f"✅ 回填完成: {len(papers)} 篇论文")
+        self.logger.info(f"💾 已保存到: {output_path}")
+        self.logger.info("=" * 60)
+        
+        return papers
+    
+    def _fetch_slice(self, checkpoint_dir: Path, time_slice: Tuple[datetime, datetime]) -> List[Paper]:
+        """获取一个时间片，时间片已经结束时写入检查点
+        
+        Args:
+            checkpoint_dir: 检查点目录
+            time_slice: (起始时间, 结束时间)
+        
+        Returns:
+            该时间片的论文列表
+        """
+        papers = self.fetcher.fetch_date_range(*time_slice)
+        
+        # 结束时间还没到的时间片之后还会有新论文，不写入检查点
+        if time_slice[1] + timedelta(minutes=1) > datetime.now(timezone.utc):
+            self.logger.info(f"时间片 {time_slice[0]:%Y-%m-%d} ~ {time_slice[1]:%Y-%m-%d} 尚未结束，不写入检查点")
+            return papers
+        
+        # 先写临时文件再原子替换，避免中断时留下不完整的检查点
+        path = self._checkpoint_path(checkpoint_dir, time_slice)
+        tmp_path = path.with_suffix('.tmp')
+        save_json(papers, str(tmp_path))
+        os.replace(tmp_path, path)
+        
+        return papers
+    
+    def _merge_checkpoints(self, checkpoint_dir: Path, slices: List[Tuple[datetime, datetime]],
+                           fetched: Dict[Tuple[datetime, datetime], List[Paper]]) -> List[Paper]:
+        """合并所有时间片的论文并按 arXiv ID 去重
+        
+        Args:
+            checkpoint_dir: 检查点目录
+            slices: 时间片列表
+            fetched: 本次运行获取的时间片 -> 论文（其余时间片从检查点读取）
+        
+        Returns:
+            论文列表
+        """
+        merged = {}
+        for time_slice in slices:
+            papers = fetched.get(time_slice)
+            if papers is None:
+                papers = load_json(str(self._checkpoint_path(checkpoint_dir, time_slice)), Paper) or []
+            for paper in papers:
+                if not isinstance(paper, Paper):
+                    paper = Paper.from_dict(paper)
+                merged.setdefault(SeenIndex.split_id(paper.id)[0], paper)
+        
+        return sorted(merged.values(), key=lambda p: p['published'], reverse=True)
+    
+    @staticmethod
+    def _checkpoint_path(checkpoint_dir: Path, time_slice: Tuple[datetime, datetime]) -> Path:
+        """获取时间片的检查点文件路径"""
+        slice_start, slice_end = time_slice
+        return checkpoint_dir / f"slice_{slice_start:%Y%m%d}_{slice_end:%Y%m%d}.json"
+
+
+def main():
+    """命令行入口"""
+    from src.utils import load_config, load_env, setup_logging
+    
+    parser = argparse.ArgumentParser(description="按时间片并发回填历史 arXiv 论文")
+    parser.add_argument('--start', required=True, help="起始日期 YYYY-MM-DD（UTC）")
+    parser.add_argument('--end', default=None, help="结束日期 YYYY-MM-DD（UTC，默认今天）")
+    parser.add_argument('--slice-days', type=int, default=7, help="每个时间片的天数")
+    parser.add_argument('--workers', type=int, default=None, help="并发时间片数量（默认 arxiv.max_workers）")
+    args = parser.parse_args()
+    
+    load_env()
+    config = load_config()
+    setup_logging(config)
+    
+    # 日期按 UTC 解释（与 arXiv 的 submittedDate 一致）
+    start = datetime.strptime(args.start, '%Y-%m-%d')
+    end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.now(timezone.utc)
+    
+    backfiller = Backfiller(config)
+    if args.workers:
+        backfiller.max_workers = args.workers
+    backfiller.run(start, end, slice_days=args.slice_days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+代码与数据集链接补全
+
+把一批论文的 arXiv ID 合并为一次批量查询，向可配置的元数据服务查询代码仓库和数据集链接，
+结果（包括“没有找到”）持久化缓存在 SQLite 中：找到的结果长期有效，没有找到的结果
+按较短的有效期重新查询（代码经常在论文发布几天后才公开）。
+
+元数据服务可以是：
+    - HTTP 地址：POST {"ids": [...]}，返回 {"results": {arXiv ID: {"code_urls": [...], "datasets": [...]}}}
+    - 本地 JSON 文件：{arXiv ID: {"code_urls": [...], "datasets": [...]}}（用于测试或离线使用）
+"""
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator
+
+import requests
+
+from .seen_index import SeenIndex
+
+
+class LinkEnricher:
+    """批量查询并缓存论文的代码和数据集链接"""
+    
+    def __init__(self, service_url: str, cache_path: str = 'data/cache/links.db', batch_size: int = 100,
+                 ttl_days: float = 30, negative_ttl_hours: float = 24, timeout: float = 30):
+        """初始化
+        
+        Args:
+            service_url: 元数据服务地址（HTTP 地址、file:// 或本地 JSON 文件路径）
+            cache_path: SQLite 缓存路径
+            batch_size: 每次批量查询的最大论文数
+            ttl_days: 找到链接的结果的有效期（天）
+            negative_ttl_hours: 没有找到链接的结果的有效期（小时）
+            timeout: 单次查询的超时（秒）
+        """
+        if not service_url:
+            raise ValueError("链接补全需要配置元数据服务地址 service_url")
+        
+        self.service_url = service_url
+        self.cache_path = cache_path
+        self.batch_size = batch_size
+        self.ttl_seconds = ttl_days * 86400
+        self.negative_ttl_seconds = negative_ttl_hours * 3600
+        self.timeout = timeout
+        self.logger = logging.getLogger('daily_arxiv.enrichment')
+        
+        self.session = requests.Session()
+        self._local_data = None
+        
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS links ("
+                "base_id TEXT PRIMARY KEY, data TEXT, found INTEGER, checked_at REAL)"
+            )
+    
+    def process(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """为一批论文补充代码和数据集链接（原地修改）
+        
+        缓存一次读取整批论文；缓存未命中或已过期的论文按 batch_size 合并为批量查询。
+        
+        Args:
+            papers: 论文列表
+        
+        Returns:
+            同一个论文列表
+        """
+        targets = {}
+        for paper in papers:
+            # 只有 arXiv 论文有 arXiv ID
+            if paper.get('source', 'arxiv') == 'arxiv':
+                targets.setdefault(SeenIndex.split_id(paper['id'])[0], []).append(paper)
+        if not targets:
+            return papers
+        
+        links = self._load_cached(list(targets))
+        missing = [base_id for base_id in targets if base_id not in links]
+        self.logger.info(f"链接补全: {len(targets) - len(missing)} 篇命中缓存, {len(missing)} 篇需要查询")
+        
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            try:
+                results = self._lookup(batch)
+            except Exception as e:
+                # 查询失败不写入缓存，下次运行重试
+                self.logger.warning(f"链接查询失败 ({len(batch)} 篇): {str(e)}")
+                continue
+            
+            found = {base_id: self._normalize(results.get(base_id)) for base_id in batch}
+            self._save(found)
+            links.update(found)
+        
+        for base_id, matched in targets.items():
+            if base_id in links:
+                for paper in matched:
+                    self._apply(paper, links[base_id])
+        
+        return papers
+    
+    def iter_process(self, papers: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """流式补充链接：上游在后台线程中迭代，每次把已经到达的论文（至多 batch_size 篇）合并查询一次
+        
+        上游暂时没有新论文时立即处理已到达的论文，不等待凑满一批
+        
+        Args:
+            papers: 论文列表或迭代器
+        
+        Yields:
+            补充了 code_urls、datasets 的论文
+        
+        Raises:
+            Exception: 上游迭代器抛出的错误（已到达的论文会先产出）
+        """
+        incoming = queue.Queue()
+        done = object()
+        upstream_error = []
+        
+        def produce():
+            try:
+                for paper in papers:
+                    incoming.put(paper)
+            except Exception as e:
+                upstream_error.append(e)
+            finally:
+                incoming.put(done)
+        
+        producer = threading.Thread(target=produce, name="link-enricher-producer", daemon=True)
+        producer.start()
+        
+        finished = False
+        while not finished:
+            # 等待下一篇论文，再把已经到达的论文合并进同一批（不等待后续论文）
+            paper = incoming.get()
+            if paper is done:
+                break
+            batch = [paper]
+            while len(batch) < self.batch_size:
+                try:
+                    paper = incoming.get_nowait()
+                except queue.Empty:
+                    break
+                if paper is done:
+                    finished = True
+                    break
+                batch.append(paper)
+            yield from self.process(batch)
+        
+        producer.join()
+        if upstream_error:
+            raise upstream_error[0]
+    
+    def _lookup(self, base_ids: List[str]) -> Dict[str, Any]:
+        """向元数据服务批量查询
+        
+        Args:
+            base_ids: 不带版本号的 arXiv ID 列表
+        
+        Returns:
+            arXiv ID -> 链接信息（没有找到的论文不在结果中）
+        """
+        url = self.service_url
+        if not re.match(r'^https?://', url):
+            if self._local_data is None:
+                path = url[len('file://'):] if url.startswith('file://') else url
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._local_data = json.load(f)
+            return {base_id: self._local_data[base_id] for base_id in base_ids if base_id in self._local_data}
+        
+        resp = self.session.post(url, json={'ids': base_ids}, timeout=self.timeout)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get('results', data)
+    
+    @staticmethod
+    def _normalize(result: Any) -> Dict[str, Any]:
+        """把服务返回的结果规范为 code_urls、datasets 两个列表"""
+        result = result or {}
+        code_urls = result.get('code_urls') or ([result['code_url']] if result.get('code_url') else [])
+        datasets = []
+        for dataset in result.get('datasets') or []:
+            if isinstance(dataset, str):
+                dataset = {'name': dataset, 'url': ''}
+            if dataset.get('name'):
+                datasets.append({'name': dataset['name'], 'url': dataset.get('url', '')})
+        return {'code_urls': list(dict.fromkeys(code_urls)), 'datasets': datasets}
+    
+    @staticmethod
+    def _apply(paper: Dict[str, Any], links: Dict[str, Any]):
+        """把链接写入论文，与全文提取得到的代码链接合并"""
+        if links['code_urls'] or paper.get('code_urls'):
+            paper['code_urls'] = list(dict.fromkeys(links['code_urls'] + list(paper.get('code_urls') or [])))
+        if links['datasets']:
+            paper['datasets'] = links['datasets']
+    
+    def _load_cached(self, base_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """一次读取一批论文的有效缓存
+        
+        Args:
+            base_ids: arXiv ID 列表
+        
+        Returns:
+            arXiv ID -> 链接信息（只包含未过期的条目）
+        """
+        now = time.time()
+        cached = {}
+        with closing(self._connect()) as conn:
+            # SQLite 单条语句的参数个数有限，分块查询
+            for start in range(0, len(base_ids), 500):
+                chunk = base_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT base_id, data, found, checked_at FROM links "
+                    f"WHERE base_id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for base_id, data, found, checked_at in rows:
+                    ttl = self.ttl_seconds if found else self.negative_ttl_seconds
+                    if now - checked_at < ttl:
+                        cached[base_id] = json.loads(data)
+        return cached
+    
+    def _save(self, links: Dict[str, Dict[str, Any]]):
+        """写入一批查询结果（包括没有找到的结果）"""
+        now = time.time()
+        rows = [
+            (base_id, json.dumps(data, ensure_ascii=False), int(bool(data['code_urls'] or data['datasets'])), now)
+            for base_id, data in links.items()
+        ]
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO links VALUES (?, ?, ?, ?)", rows)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接"""
+        return sqlite3.connect(self.cache_path, timeout=30)
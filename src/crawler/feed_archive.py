@@ -0,0 +1,332 @@
+"""
+原始 Atom 条目归档
+
+把 arXiv 返回的原始 <entry> 按发布日期分区追加到压缩归档中（gzip 或 zstd），
+每个分区配有一个偏移量索引。修改提示词或分析器后，可以直接从归档重新解析和处理论文，
+无需重新请求 arXiv：
+    
+    python -m src.crawler.feed_archive --start 2025-06-01 --end 2025-06-07
+"""
+import argparse
+import gzip
+import json
+import logging
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
+
+import arxiv
+import feedparser
+
+from src.utils import file_lock
+
+
+# 归档条目重新解析时使用的 feed 外壳（与 arXiv API 响应的命名空间一致）
+_FEED_HEADER = (
+    b'<?xml version="1.0" encoding="UTF-8"?>\n'
+    b'<feed xmlns="http://www.w3.org/2005/Atom" '
+    b'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+    b'xmlns:arxiv="http://arxiv.org/schemas/atom">\n'
+)
+_FEED_FOOTER = b'\n</feed>\n'
+
+_ENTRY_RE = re.compile(rb'<entry\b.*?</entry>', re.DOTALL)
+_ID_RE = re.compile(rb'<id>\s*(.*?)\s*</id>', re.DOTALL)
+_PUBLISHED_RE = re.compile(rb'<published>\s*(\d{4}-\d{2}-\d{2})')
+
+# 重新解析时每次交给 feedparser 的条目数
+_PARSE_BATCH = 200
+
+
+class FeedArchive:
+    """按发布日期分区的原始 Atom 条目归档"""
+    
+    # 压缩方式 -> 数据文件后缀
+    SUFFIXES = {'gzip': '.atom.gz', 'zstd': '.atom.zst'}
+    
+    def __init__(self, archive_dir: str = 'data/archive/arxiv', compression: str = 'gzip',
+                 level: Optional[int] = None):
+        """初始化
+        
+        Args:
+            archive_dir: 归档目录
+            compression: 压缩方式 gzip / zstd（zstd 需要 pip install zstandard）
+            level: 压缩级别（默认 gzip 6，zstd 3）
+        
+        Raises:
+            ValueError: 不支持的压缩方式
+            ImportError: 选择 zstd 但未安装 zstandard
+        """
+        if compression not in self.SUFFIXES:
+            raise ValueError(f"不支持的压缩方式: {compression}（可选: gzip, zstd）")
+        if compression == 'zstd':
+            _require_zstandard()
+        
+        self.archive_dir = Path(archive_dir)
+        self.compression = compression
+        self.level = level
+        self.logger = logging.getLogger('daily_arxiv.feed_archive')
+        
+        # 分区 -> 已归档的条目 ID（带版本号），写入前从索引增量加载（包括其他进程追加的）
+        self._archived: Dict[str, Set[str]] = {}
+        # 分区 -> 索引文件中已加载的字节数
+        self._index_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+    
+    def append_page(self, content: bytes) -> int:
+        """把一页 Atom 响应中尚未归档的条目追加到归档
+        
+        同一分区的条目压缩为一个数据块，索引记录每个条目所在数据块的偏移量和长度；
+        已归档的条目（同一 ID 和版本号）不会重复写入。多个进程同时归档时，
+        查重、数据块追加和索引追加都在归档目录 .lock 文件的独占锁内进行。
+        
+        Args:
+            content: 原始 Atom 响应内容
+        
+        Returns:
+            新归档的条目数
+        """
+        by_partition: Dict[str, List[tuple]] = {}
+        for match in _ENTRY_RE.finditer(content):
+            entry = match.group(0)
+            id_match = _ID_RE.search(entry)
+            if not id_match:
+                continue
+            published = _PUBLISHED_RE.search(entry)
+            partition = published.group(1).decode() if published else datetime.now().strftime('%Y-%m-%d')
+            by_partition.setdefault(partition, []).append((id_match.group(1).decode(), entry))
+        
+        count = 0
+        with self._lock, file_lock(self.archive_dir / '.lock'):
+            for partition, entries in by_partition.items():
+                archived = self._archived_ids(partition)
+                entries = [(entry_id, entry) for entry_id, entry in entries if entry_id not in archived]
+                if not entries:
+                    continue
+                
+                block = self._compress(b'\n'.join(entry for _, entry in entries))
+                data_path = self._data_path(partition)
+                with open(data_path, 'ab') as f:
+                    offset = f.tell()
+                    f.write(block)
+                
+                archived_at = datetime.now().isoformat()
+                with open(self._index_path(partition), 'a', encoding='utf-8') as f:
+                    for entry_id, _ in entries:
+                        f.write(json.dumps({
+                            'id': entry_id,
+                            'file': data_path.name,
+                            'offset': offset,
+                            'length': len(block),
+                            'archived_at': archived_at,
+                        }) + '\n')
+                        archived.add(entry_id)
+                count += len(entries)
+        
+        if count:
+            self.logger.debug(f"已归档 {count} 个条目")
+        return count
+    
+    def partitions(self, start: datetime = None, end: datetime = None) -> List[str]:
+        """列出日期范围内的分区
+        
+        Args:
+            start: 起始日期（包含），默认不限
+            end: 结束日期（包含），默认不限
+        
+        Returns:
+            按日期升序排列的分区名称（YYYY-MM-DD）
+        """
+        partitions = sorted(path.name[:-len('.index.jsonl')] for path in self.archive_dir.glob('*.index.jsonl'))
+        if start is not None:
+            partitions = [p for p in partitions if p >= f"{start:%Y-%m-%d}"]
+        if end is not None:
+            partitions = [p for p in partitions if p <= f"{end:%Y-%m-%d}"]
+        return partitions
+    
+    def iter_entries(self, start: datetime = None, end: datetime = None) -> Iterator[bytes]:
+        """按分区顺序读取原始条目
+        
+        每个分区内同一论文只产出最后归档的版本；数据块按文件顺序读取，不做随机访问。
+        
+        Args:
+            start: 起始发布日期（包含），默认不限
+            end: 结束发布日期（包含），默认不限
+        
+        Yields:
+            原始 <entry> 内容
+        """
+        for partition in self.partitions(start, end):
+            records = self._load_index(partition)
+            
+            # 同一论文的多个版本只保留最后归档的一条
+            latest = {}
+            for record in records:
+                latest[re.sub(r'v\d+$', '', record['id'])] = record['id']
+            wanted = set(latest.values())
+            
+            blocks = sorted({(record['file'], record['offset'], record['length']) for record in records})
+            for file_name, offset, length in blocks:
+                with open(self.archive_dir / file_name, 'rb') as f:
+                    f.seek(offset)
+                    block = self._decompress(f.read(length), file_name)
+                
+                for entry in _ENTRY_RE.findall(block):
+                    entry_id = _ID_RE.search(entry).group(1).decode()
+                    if entry_id in wanted:
+                        wanted.discard(entry_id)
+                        yield entry
+    
+    def iter_results(self, start: datetime = None, end: datetime = None) -> Iterator[arxiv.Result]:
+        """把归档条目重新解析为 arxiv.Result
+        
+        Args:
+            start: 起始发布日期（包含），默认不限
+            end: 结束发布日期（包含），默认不限
+        
+        Yields:
+            arxiv.Result 对象
+        """
+        batch = []
+        for entry in self.iter_entries(start, end):
+            batch.append(entry)
+            if len(batch) >= _PARSE_BATCH:
+                yield from self._parse_entries(batch)
+                batch = []
+        if batch:
+            yield from self._parse_entries(batch)
+    
+    def __len__(self) -> int:
+        return sum(len(self._archived_ids(partition)) for partition in self.partitions())
+    
+    def _parse_entries(self, entries: List[bytes]) -> Iterator[arxiv.Result]:
+        """把一批条目包装为一个 feed 后一次解析"""
+        feed = feedparser.parse(_FEED_HEADER + b'\n'.join(entries) + _FEED_FOOTER)
+        for entry in feed.entries:
+            try:
+                yield arxiv.Result._from_feed_entry(entry)
+            except arxiv.Result.MissingFieldError as e:
+                self.logger.warning(f"跳过不完整的归档条目: {str(e)}")
+    
+    def _archived_ids(self, partition: str) -> Set[str]:
+        """获取分区中已归档的条目 ID（只读取上次之后追加的索引行）"""
+        archived = self._archived.setdefault(partition, set())
+        records, self._index_sizes[partition] = self._read_index(partition, self._index_sizes.get(partition, 0))
+        archived.update(record['id'] for record in records)
+        return archived
+    
+    def _load_index(self, partition: str) -> List[Dict[str, Any]]:
+        """读取分区的全部索引记录"""
+        return self._read_index(partition)[0]
+    
+    def _read_index(self, partition: str, start: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """从索引文件的 start 字节处读取到末尾（忽略写入中断留下的不完整行）
+        
+        Args:
+            partition: 分区名称
+            start: 起始字节位置
+        
+        Returns:
+            (索引记录列表, 读取结束时的字节位置)
+        """
+        path = self._index_path(partition)
+        if not path.exists():
+            return [], 0
+        
+        records = []
+        with open(path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    self.logger.warning(f"忽略损坏的索引行: {path}")
+            return records, f.tell()
+    
+    def _compress(self, data: bytes) -> bytes:
+        """压缩一个数据块（每个数据块是独立的 gzip 成员 / zstd 帧）"""
+        if self.compression == 'zstd':
+            import zstandard
+            return zstandard.ZstdCompressor(level=self.level or 3).compress(data)
+        return gzip.compress(data, compresslevel=self.level or 6)
+    
+    @staticmethod
+    def _decompress(block: bytes, file_name: str) -> bytes:
+        """按数据文件的后缀解压一个数据块"""
+        if file_name.endswith(FeedArchive.SUFFIXES['zstd']):
+            _require_zstandard()
+            import zstandard
+            return zstandard.ZstdDecompressor().decompress(block)
+        return gzip.decompress(block)
+    
+    def _data_path(self, partition: str) -> Path:
+        """获取分区在当前压缩方式下的数据文件路径"""
+        return self.archive_dir / f"{partition}{self.SUFFIXES[self.compression]}"
+    
+    def _index_path(self, partition: str) -> Path:
+        """获取分区的索引文件路径"""
+        return self.archive_dir / f"{partition}.index.jsonl"
+
+
+def _require_zstandard():
+    """检查 zstandard 是否可用"""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        raise ImportError("zstd 压缩需要安装 zstandard: pip install zstandard")
+
+
+def main():
+    """命令行入口：从归档重新处理论文（不访问 arXiv）"""
+    from src.utils import load_config, load_env, setup_logging, save_json, get_data_path
+    from .arxiv_fetcher import ArxivFetcher
+    
+    parser = argparse.ArgumentParser(description="从原始 Atom 归档重新解析、总结和分析论文")
+    parser.add_argument('--start', required=True, help="起始发布日期 YYYY-MM-DD")
+    parser.add_argument('--end', default=None, help="结束发布日期 YYYY-MM-DD（默认今天）")
+    parser.add_argument('--no-summary', action='store_true', help="只重新解析论文，不调用 LLM 总结")
+    parser.add_argument('--analyze', action='store_true', help="总结后重新运行趋势分析")
+    args = parser.parse_args()
+    
+    load_env()
+    config = load_config()
+    logger = setup_logging(config)
+    
+    start = datetime.strptime(args.start, '%Y-%m-%d')
+    end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.now()
+    
+    fetcher = ArxivFetcher(config)
+    papers = fetcher.with_fulltext(fetcher.iter_archived(start, end))
+    
+    if args.no_summary:
+        papers = list(papers)
+    else:
+        from src.summarizer.paper_summarizer import PaperSummarizer
+        # 历史论文不能替换最新的总结结果，只保存到下面的 reprocess 文件
+        papers = PaperSummarizer(config).summarize_stream(papers, save=False)
+    
+    output_path = f"{get_data_path(config, 'papers')}/reprocess_{start:%Y-%m-%d}_{end:%Y-%m-%d}.json"
+    save_json(papers, output_path)
+    logger.info(f"💾 重新处理了 {len(papers)} 篇论文，已保存到: {output_path}")
+    
+    if args.analyze and papers:
+        from src.analyzer.trend_analyzer import TrendAnalyzer
+        from src.summarizer.llm_factory import LLMClientFactory
+        
+        # 历史论文的分析不替换当天的分析结果和词云，单独保存
+        name = f"reprocess_{start:%Y-%m-%d}_{end:%Y-%m-%d}"
+        analyzer = TrendAnalyzer(config, LLMClientFactory.create_client(config))
+        analysis = analyzer.analyze(papers, [p for p in papers if p.get('summary')], save=False, name=name)
+        if analysis:
+            analysis_path = f"data/analysis/{name}.json"
+            save_json(analysis, analysis_path, pretty=True)
+            logger.info(f"💾 分析结果已保存到: {analysis_path}")
+            analyzer.print_analysis_summary(analysis)
+
+
+if __name__ == "__main__":
+    main()
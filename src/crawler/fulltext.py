@@ -0,0 +1,227 @@
+"""
+论文全文提取
+
+下载论文 PDF（有上限的连接池并发下载），在进程池中提取首页作者单位和正文中的代码链接，
+结果按 arXiv ID + 版本号缓存在磁盘上，每个 PDF 只下载和解析一次。
+
+PDF 解析依赖可选的 pypdf（pip install pypdf）。
+"""
+import importlib.util
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 作者单位行的常见特征
+_AFFILIATION_RE = re.compile(
+    r'\b(University|Universit[àäé]|Institute|Institut|Laborator(y|ies)|Lab|College|School|Academy|'
+    r'Cent(er|re)|Research|Inc\.?|Corporation|Corp\.?|Ltd\.?|Technologies|Foundation|Hospital)\b'
+)
+# 正文中的代码仓库链接
+_CODE_URL_RE = re.compile(r'https?://(?:www\.)?(?:github\.com|gitlab\.com|huggingface\.co)/[\w.-]+/[\w.-]+')
+
+
+def extract_pdf(content: bytes, max_pages: int = 0) -> Dict[str, Any]:
+    """解析 PDF，提取首页作者单位、代码链接和正文
+    
+    在进程池中运行，因此是模块级函数。
+    
+    Args:
+        content: PDF 文件内容
+        max_pages: 最多提取的页数，0 表示全部
+    
+    Returns:
+        包含 affiliations、code_urls、first_page、text 的字典
+    """
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ImportError("全文提取需要安装 pypdf: pip install pypdf")
+    
+    reader = PdfReader(io.BytesIO(content))
+    pages = reader.pages if not max_pages else reader.pages[:max_pages]
+    texts = [page.extract_text() or '' for page in pages]
+    first_page = texts[0] if texts else ''
+    text = "\n".join(texts)
+    
+    return {
+        'affiliations': _find_affiliations(first_page),
+        'code_urls': list(dict.fromkeys(url.rstrip('.') for url in _CODE_URL_RE.findall(text))),
+        'first_page': first_page,
+        'text': text,
+    }
+
+
+def _find_affiliations(first_page: str) -> List[str]:
+    """从首页“摘要”之前的部分找出作者单位行
+    
+    Args:
+        first_page: 首页文本
+    
+    Returns:
+        去重后的作者单位列表
+    """
+    header = re.split(r'\bAbstract\b', first_page, maxsplit=1, flags=re.IGNORECASE)[0]
+    
+    affiliations = []
+    for line in header.splitlines():
+        # 去掉行首的上标编号和符号
+        line = re.sub(r'^[\d\s*†‡§¶,]+', '', line).strip(' ,;')
+        if 5 < len(line) < 150 and _AFFILIATION_RE.search(line) and '@' not in line:
+            affiliations.append(line)
+    
+    return list(dict.fromkeys(affiliations))
+
+
+class FullTextExtractor:
+    """并发下载并解析论文 PDF，结果按版本缓存"""
+    
+    def __init__(self, cache_dir: str = 'data/cache/fulltext', max_connections: int = 4,
+                 max_processes: int = 2, timeout: float = 60, max_pages: int = 0):
+        """初始化
+        
+        Args:
+            cache_dir: 解析结果缓存目录
+            max_connections: 最大并发下载数（同时也是连接池大小）
+            max_processes: 解析 PDF 的进程数
+            timeout: 单个 PDF 的下载超时（秒）
+            max_pages: 最多解析的页数，0 表示全部
+        """
+        if importlib.util.find_spec('pypdf') is None:
+            raise ImportError("全文提取需要安装 pypdf: pip install pypdf")
+        
+        self.cache_dir = Path(cache_dir)
+        self.max_connections = max_connections
+        self.max_processes = max_processes
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.logger = logging.getLogger('daily_arxiv.fulltext')
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    def process(self, papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """为一批论文补充全文信息（原地修改，保持顺序）
+        
+        Args:
+            papers: 论文列表
+        
+        Returns:
+            同一个论文列表
+        """
+        for _ in self.iter_process(papers):
+            pass
+        return papers
+    
+    def iter_process(self, papers: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """流式补充全文信息，可以直接包装 iter_papers 的结果流
+        
+        缓存命中的论文立即产出；其他论文在后台下载和解析，完成后按完成顺序产出。
+        下载或解析失败的论文不补充全文信息，照常产出。
+        
+        Args:
+            papers: 论文列表或迭代器
+        
+        Yields:
+            补充了 affiliations、code_urls 的论文
+        """
+        with ThreadPoolExecutor(max_workers=self.max_connections) as downloads, \
+                ProcessPoolExecutor(max_workers=self.max_processes) as extractors:
+            pending = {}
+            
+            for paper in papers:
+                cached = self.load(paper)
+                if cached is not None:
+                    self._apply(paper, cached)
+                    yield paper
+                else:
+                    pending[downloads.submit(self._fetch, paper, extractors)] = paper
+                
+                # 顺便产出已经完成的论文，不等待整个输入结束
+                for future in [f for f in pending if f.done()]:
+                    yield self._finish(pending.pop(future), future)
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._finish(pending.pop(future), future)
+    
+    def load(self, paper: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """读取论文的全文缓存
+        
+        Args:
+            paper: 论文（需要带版本号的 id）
+        
+        Returns:
+            解析结果（包含正文 text），未缓存返回 None
+        """
+        path = self._path(paper['id'])
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _fetch(self, paper: Dict[str, Any], extractors: ProcessPoolExecutor) -> Dict[str, Any]:
+        """下载、解析并缓存一篇论文的 PDF（在下载线程中运行）"""
+        content = self._download(paper['pdf_url'])
+        result = extractors.submit(extract_pdf, content, self.max_pages).result()
+        result['id'] = paper['id']
+        
+        # 先写临时文件再原子替换
+        path = self._path(paper['id'])
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        
+        return result
+    
+    def _download(self, url: str) -> bytes:
+        """下载 PDF；本地路径和 file:// 直接读取（用于测试）
+        
+        Args:
+            url: PDF 地址
+        
+        Returns:
+            PDF 内容
+        """
+        if url.startswith('file://'):
+            url = url[len('file://'):]
+        if not re.match(r'^https?://', url):
+            return Path(url).read_bytes()
+        
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.content
+    
+    def _finish(self, paper: Dict[str, Any], future) -> Dict[str, Any]:
+        """把后台任务的结果写入论文"""
+        try:
+            self._apply(paper, future.result())
+            self.logger.info(f"✓ 已提取全文: {paper['id']}")
+        except Exception as e:
+            self.logger.warning(f"全文提取失败 [{paper['id']}]: {str(e)}")
+        return paper
+    
+    @staticmethod
+    def _apply(paper: Dict[str, Any], result: Dict[str, Any]):
+        """把解析结果中的结构化字段写入论文（正文只保存在缓存中）"""
+        paper['affiliations'] = result.get('affiliations', [])
+        paper['code_urls'] = result.get('code_urls', [])
+    
+    def _path(self, arxiv_id: str) -> Path:
+        """获取 arXiv ID（带版本号）对应的缓存文件路径"""
+        return self.cache_dir / f"{arxiv_id.replace('/', '_')}.json"
@@ -0,0 +1,452 @@
+"""
+关键词表达式引擎
+
+把 arxiv.keywords 中的表达式（如 '"autonomous driving" AND VLA'）解析为语法树：
+既可以编译为 arXiv 查询字符串，也可以在本地对标题和摘要求值。本地匹配使用按单词构建的
+Aho-Corasick 自动机，一次扫描即可找出文本中出现的全部短语。
+
+语法：
+    expr    := and ('OR' and)*
+    and     := unary ('AND' unary)*
+    unary   := 'NOT' unary | primary
+    primary := '(' expr ')' | phrase
+    phrase  := (单词 | "带引号的短语")+      相邻的单词组成一个短语
+
+运算符必须大写；NOT 在 arXiv 查询中编译为 ANDNOT。
+"""
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class KeywordSyntaxError(ValueError):
+    """关键词表达式语法错误"""
+
+
+# 表达式词法：带引号的短语、括号、普通单词（允许包含撇号，如 driver's）
+_TOKEN_RE = re.compile(r'''\s*(?:"([^"]*)"|'([^']*)'|(\()|(\))|([^\s()"']+(?:'[^\s()"']*)*))''')
+# 文本分词：与 arXiv 相同，按非字母数字字符切分并忽略大小写
+_WORD_RE = re.compile(r'\w+')
+
+_OPERATORS = ('AND', 'OR', 'NOT')
+
+# 词表不超过该大小时使用子串预检查 + 正则定位，否则逐个单词查表
+_SMALL_VOCABULARY = 64
+
+
+def tokenize_text(text: str) -> List[str]:
+    """把文本切分为小写单词
+    
+    Args:
+        text: 文本
+    
+    Returns:
+        单词列表
+    """
+    return _WORD_RE.findall(text.lower())
+
+
+class Node:
+    """语法树节点"""
+    
+    __slots__ = ()
+    
+    def evaluate(self, matched: Set[int]) -> bool:
+        """根据文本中出现的短语求值
+        
+        Args:
+            matched: 文本中出现的短语编号集合
+        
+        Returns:
+            是否匹配
+        """
+        raise NotImplementedError
+    
+    def to_arxiv(self) -> str:
+        """编译为 arXiv 查询字符串"""
+        raise NotImplementedError
+    
+    def terms(self) -> Iterator['Term']:
+        """遍历所有短语节点"""
+        raise NotImplementedError
+
+
+class Term(Node):
+    """短语"""
+    
+    __slots__ = ('phrase', 'words', 'index')
+    
+    def __init__(self, phrase: str):
+        self.phrase = phrase
+        self.words = tuple(tokenize_text(phrase))
+        self.index = -1  # 由 KeywordMatcher 分配
+        
+        if not self.words:
+            raise KeywordSyntaxError(f"空的关键词短语: {phrase!r}")
+    
+    def evaluate(self, matched: Set[int]) -> bool:
+        return self.index in matched
+    
+    def to_arxiv(self) -> str:
+        return f'(ti:"{self.phrase}" OR abs:"{self.phrase}")'
+    
+    def terms(self) -> Iterator['Term']:
+        yield self
+    
+    def __repr__(self) -> str:
+        return f"Term({self.phrase!r})"
+
+
+class Not(Node):
+    """取反"""
+    
+    __slots__ = ('child',)
+    
+    def __init__(self, child: Node):
+        self.child = child
+    
+    def evaluate(self, matched: Set[int]) -> bool:
+        return not self.child.evaluate(matched)
+    
+    def to_arxiv(self) -> str:
+        raise KeywordSyntaxError("arXiv 查询中 NOT 只能跟在 AND 之后（A AND NOT B）")
+    
+    def terms(self) -> Iterator[Term]:
+        return self.child.terms()
+    
+    def __repr__(self) -> str:
+        return f"Not({self.child!r})"
+
+
+class And(Node):
+    """与"""
+    
+    __slots__ = ('children',)
+    
+    def __init__(self, children: List[Node]):
+        self.children = children
+    
+    def evaluate(self, matched: Set[int]) -> bool:
+        return all(child.evaluate(matched) for child in self.children)
+    
+    def to_arxiv(self) -> str:
+        positive = [child for child in self.children if not isinstance(child, Not)]
+        negative = [child.child for child in self.children if isinstance(child, Not)]
+        if not positive:
+            raise KeywordSyntaxError("arXiv 查询不支持只有 NOT 的条件")
+        
+        query = " AND ".join(child.to_arxiv() for child in positive)
+        for child in negative:
+            query += f" ANDNOT {child.to_arxiv()}"
+        return f"({query})"
+    
+    def terms(self) -> Iterator[Term]:
+        for child in self.children:
+            yield from child.terms()
+    
+    def __repr__(self) -> str:
+        return f"And({self.children!r})"
+
+
+class Or(Node):
+    """或"""
+    
+    __slots__ = ('children',)
+    
+    def __init__(self, children: List[Node]):
+        self.children = children
+    
+    def evaluate(self, matched: Set[int]) -> bool:
+        return any(child.evaluate(matched) for child in self.children)
+    
+    def to_arxiv(self) -> str:
+        return "(" + " OR ".join(child.to_arxiv() for child in self.children) + ")"
+    
+    def terms(self) -> Iterator[Term]:
+        for child in self.children:
+            yield from child.terms()
+    
+    def __repr__(self) -> str:
+        return f"Or({self.children!r})"
+
+
+def parse_expression(expression: str) -> Node:
+    """把关键词表达式解析为语法树
+    
+    Args:
+        expression: 关键词表达式，如 '"autonomous driving" AND (VLA OR VLM)'
+    
+    Returns:
+        语法树根节点
+    
+    Raises:
+        KeywordSyntaxError: 表达式语法错误
+    """
+    tokens = _lex(expression)
+    position = 0
+    
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+    
+    def take():
+        nonlocal position
+        token = peek()
+        position += 1
+        return token
+    
+    def parse_or():
+        children = [parse_and()]
+        while peek() == ('op', 'OR'):
+            take()
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+    
+    def parse_and():
+        children = [parse_unary()]
+        while peek() == ('op', 'AND'):
+            take()
+            children.append(parse_unary())
+        return children[0] if len(children) == 1 else And(children)
+    
+    def parse_unary():
+        if peek() == ('op', 'NOT'):
+            take()
+            return Not(parse_unary())
+        return parse_primary()
+    
+    def parse_primary():
+        kind, value = peek()
+        if kind == '(':
+            take()
+            node = parse_or()
+            if take()[0] != ')':
+                raise KeywordSyntaxError(f"缺少右括号: {expression!r}")
+            return node
+        
+        words = []
+        while peek()[0] == 'word':
+            words.append(take()[1])
+        if not words:
+            raise KeywordSyntaxError(f"缺少关键词（位置 {position}）: {expression!r}")
+        return Term(" ".join(words))
+    
+    node = parse_or()
+    if position != len(tokens):
+        raise KeywordSyntaxError(f"无法解析的内容 {peek()[1]!r}: {expression!r}")
+    return node
+
+
+def _lex(expression: str) -> List[Tuple[str, str]]:
+    """把表达式切分为 (类型, 值) 记号"""
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if not match or match.end() == position:
+            raise KeywordSyntaxError(f"引号不匹配: {expression!r}")
+        position = match.end()
+        
+        double_quoted, single_quoted, left, right, word = match.groups()
+        if left:
+            tokens.append(('(', left))
+        elif right:
+            tokens.append((')', right))
+        elif word in _OPERATORS:
+            tokens.append(('op', word))
+        elif word is not None:
+            tokens.append(('word', word))
+        else:
+            tokens.append(('word', double_quoted if double_quoted is not None else single_quoted))
+    return tokens
+
+
+class KeywordMatcher:
+    """编译后的关键词匹配器
+    
+    多个关键词表达式之间为“或”的关系（与 arXiv 查询一致）。所有短语共用一个按单词构建的
+    Aho-Corasick 自动机，每段文本只扫描一遍。
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        """初始化
+        
+        Args:
+            keywords: 关键词表达式列表
+        
+        Raises:
+            KeywordSyntaxError: 表达式语法错误
+        """
+        self.keywords = list(keywords)
+        self.expressions = [parse_expression(keyword) for keyword in self.keywords]
+        
+        # 相同的短语共用一个编号
+        phrase_ids: Dict[Tuple[str, ...], int] = {}
+        for expression in self.expressions:
+            for term in expression.terms():
+                term.index = phrase_ids.setdefault(term.words, len(phrase_ids))
+        
+        self._build_automaton(list(phrase_ids))
+    
+    def __bool__(self) -> bool:
+        return bool(self.expressions)
+    
+    def to_arxiv(self) -> str:
+        """编译为 arXiv 查询字符串（没有关键词时返回空字符串）"""
+        if not self.expressions:
+            return ""
+        return "(" + " OR ".join(expression.to_arxiv() for expression in self.expressions) + ")"
+    
+    def find_phrases(self, text: str) -> Set[int]:
+        """找出文本中出现的全部短语
+        
+        Args:
+            text: 文本
+        
+        Returns:
+            短语编号集合
+        """
+        matched = set()
+        if not self._vocabulary:
+            return matched
+        
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for word, adjacent in self._scan(text.lower()):
+            # 与上一个命中之间还有其他单词时，短语不可能跨越它们，回到初始状态
+            if not adjacent:
+                state = 0
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if output[state]:
+                matched.update(output[state])
+        return matched
+    
+    def _scan(self, text: str) -> Iterator[Tuple[str, bool]]:
+        """依次产出文本中属于短语词表的单词，以及它是否紧跟在上一个产出的单词之后
+        
+        词表较小时先用子串检查快速排除，再用正则（C 实现）只定位词表中的单词；
+        词表较大时（如订阅匹配中成千上万个短语）逐个单词查表，开销只与文本长度有关。
+        
+        Args:
+            text: 小写文本
+        
+        Yields:
+            (单词, 是否相邻)
+        """
+        if self._vocabulary_re is not None:
+            present = {word for word in self._vocabulary if word in text}
+            if not any(words <= present for words in self._phrase_words):
+                return
+            
+            previous_end = None
+            for match in self._vocabulary_re.finditer(text):
+                adjacent = previous_end is not None and not _WORD_RE.search(text, previous_end, match.start())
+                previous_end = match.end()
+                yield match.group(), adjacent
+            return
+        
+        vocabulary = self._vocabulary
+        previous = -2
+        for position, match in enumerate(_WORD_RE.finditer(text)):
+            word = match.group()
+            if word in vocabulary:
+                yield word, position == previous + 1
+                previous = position
+    
+    def matches(self, text: str) -> bool:
+        """文本是否满足任一关键词表达式（没有关键词时总是满足）
+        
+        Args:
+            text: 文本
+        
+        Returns:
+            是否匹配
+        """
+        if not self.expressions:
+            return True
+        
+        matched = self.find_phrases(text)
+        return any(expression.evaluate(matched) for expression in self.expressions)
+    
+    def match_paper(self, paper: Dict[str, Any]) -> bool:
+        """论文的标题或摘要是否满足关键词条件
+        
+        Args:
+            paper: 论文（需要 title 和 abstract）
+        
+        Returns:
+            是否匹配
+        """
+        if not self.expressions:
+            return True
+        
+        matched = self.find_paper_phrases(paper)
+        return any(expression.evaluate(matched) for expression in self.expressions)
+    
+    def find_paper_phrases(self, paper: Dict[str, Any]) -> Set[int]:
+        """找出论文标题和摘要中出现的全部短语
+        
+        Args:
+            paper: 论文（需要 title 和 abstract）
+        
+        Returns:
+            短语编号集合
+        """
+        # 标题和摘要分别扫描，避免短语跨越两者的边界
+        return self.find_phrases(paper.get('title') or '') | self.find_phrases(paper.get('abstract') or '')
+    
+    def filter(self, papers: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """过滤出满足关键词条件的论文
+        
+        Args:
+            papers: 论文列表或迭代器
+        
+        Yields:
+            匹配的论文
+        """
+        for paper in papers:
+            if self.match_paper(paper):
+                yield paper
+    
+    def _build_automaton(self, phrases: List[Tuple[str, ...]]):
+        """构建按单词转移的 Aho-Corasick 自动机
+        
+        Args:
+            phrases: 短语（单词元组）列表，下标即短语编号
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Tuple[int, ...]] = [()]
+        vocabulary = set()
+        self._phrase_words = [frozenset(words) for words in phrases]
+        
+        for index, words in enumerate(phrases):
+            state = 0
+            for word in words:
+                vocabulary.add(word)
+                if word not in self._goto[state]:
+                    self._goto.append({})
+                    self._output.append(())
+                    self._goto[state][word] = len(self._goto) - 1
+                state = self._goto[state][word]
+            self._output[state] += (index,)
+        
+        # 广度优先计算失败指针，并把失败状态的输出合并进来
+        self._fail = [0] * len(self._goto)
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for word, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(word, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+        
+        self._vocabulary = frozenset(vocabulary)
+        self._vocabulary_re = None
+        if 0 < len(vocabulary) <= _SMALL_VOCABULARY:
+            alternatives = "|".join(re.escape(word) for word in sorted(vocabulary, key=len, reverse=True))
+            self._vocabulary_re = re.compile(rf"\b(?:{alternatives})\b")
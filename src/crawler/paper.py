@@ -0,0 +1,123 @@
+"""
+论文记录
+
+紧凑的论文数据结构：使用 __slots__ 避免每篇论文一个实例字典，类别和作者名称驻留（intern）后
+在所有论文之间共享，作者和类别使用元组。同时兼容原有的字典访问方式（paper['title']、
+paper.get('summary')），并与 latest.json 等已有 JSON 文件的格式保持一致。
+"""
+import sys
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class Paper:
+    """arXiv 论文记录"""
+    
+    # 与原有论文字典相同的字段及顺序（决定 JSON 输出的键顺序）
+    FIELDS = (
+        'id', 'title', 'authors', 'abstract', 'categories', 'primary_category',
+        'published', 'updated', 'pdf_url', 'entry_url', 'comment', 'journal_ref',
+        'doi', 'fetched_at',
+    )
+    
+    # 其他字段（如总结结果 summary、summary_error、summary_fallback）保存在 extra 中
+    __slots__ = FIELDS + ('extra',)
+    
+    def __init__(self, id: str, title: str = '', authors=(), abstract: str = '',
+                 categories=(), primary_category: str = '', published: str = '',
+                 updated: str = '', pdf_url: str = '', entry_url: str = '',
+                 comment: Optional[str] = None, journal_ref: Optional[str] = None,
+                 doi: Optional[str] = None, fetched_at: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.title = title
+        self.authors = tuple(sys.intern(author) for author in authors)
+        self.abstract = abstract
+        self.categories = tuple(sys.intern(category) for category in categories)
+        self.primary_category = sys.intern(primary_category) if primary_category else primary_category
+        self.published = published
+        self.updated = updated
+        self.pdf_url = pdf_url
+        self.entry_url = entry_url
+        self.comment = comment
+        self.journal_ref = journal_ref
+        self.doi = doi
+        self.fetched_at = fetched_at
+        self.extra = extra
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Paper':
+        """从论文字典（如 latest.json 中的条目）创建记录
+        
+        Args:
+            data: 论文字典
+        
+        Returns:
+            Paper 对象
+        """
+        if isinstance(data, cls):
+            return data
+        
+        fields = {key: data[key] for key in cls.FIELDS if key in data}
+        extra = {key: value for key, value in data.items() if key not in fields}
+        return cls(**fields, extra=extra or None)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为与原有格式一致的论文字典
+        
+        Returns:
+            论文字典（作者和类别为列表）
+        """
+        data = {key: getattr(self, key) for key in self.FIELDS}
+        data['authors'] = list(self.authors)
+        data['categories'] = list(self.categories)
+        if self.extra:
+            data.update(self.extra)
+        return data
+    
+    def copy(self) -> 'Paper':
+        """浅拷贝（字符串和元组在副本之间共享，只复制 extra）"""
+        paper = Paper.__new__(Paper)
+        for key in self.FIELDS:
+            setattr(paper, key, getattr(self, key))
+        paper.extra = dict(self.extra) if self.extra else None
+        return paper
+    
+    # ---- 兼容字典访问 ----
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value: Any):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS + tuple(self.extra or ())
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+    
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (Paper, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, Paper) else other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"Paper(id={self.id!r}, title={self.title[:40]!r})"
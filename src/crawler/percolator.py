@@ -0,0 +1,286 @@
+"""
+订阅匹配（Percolator）
+
+每天只按所有订阅的类别并集爬取一次，再用倒排索引把每篇论文同时匹配到多个订阅主题：
+所有订阅的关键词短语编译进同一个 Aho-Corasick 自动机，每篇论文只扫描一遍，
+只有命中了某个订阅的短语（或类别）时才对该订阅的表达式求值，开销随论文数增长，而不是论文数 × 订阅数。
+"""
+import argparse
+import copy
+import logging
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Set
+
+import yaml
+
+from src.utils import save_json, get_date_string, get_data_path
+from .arxiv_fetcher import ArxivFetcher
+from .keyword_matcher import KeywordMatcher
+
+
+class Percolator:
+    """把论文匹配到多个订阅主题"""
+    
+    def __init__(self, profiles: List[Dict[str, Any]]):
+        """初始化
+        
+        Args:
+            profiles: 订阅列表，每个订阅包含 name、categories（可选）、keywords（可选）
+        
+        Raises:
+            ValueError: 订阅名称重复或缺失
+            KeywordSyntaxError: 关键词表达式语法错误
+        """
+        self.logger = logging.getLogger('daily_arxiv.percolator')
+        self.profiles = profiles
+        self.names = [profile.get('name') for profile in profiles]
+        
+        if not all(self.names):
+            raise ValueError("每个订阅都需要 name")
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("订阅名称不能重复")
+        
+        # 所有订阅的关键词表达式编译进同一个匹配器，相同的短语共用一个编号
+        keywords = []
+        expression_owners = []
+        for index, profile in enumerate(profiles):
+            for keyword in profile.get('keywords') or []:
+                keywords.append(keyword)
+                expression_owners.append(index)
+        self.matcher = KeywordMatcher(keywords)
+        
+        # 每个订阅的表达式列表；没有关键词的订阅不过滤关键词
+        self._expressions = [[] for _ in profiles]
+        for owner, expression in zip(expression_owners, self.matcher.expressions):
+            self._expressions[owner].append(expression)
+        
+        # 短语 -> 订阅 的倒排索引；没有命中任何短语也可能成立的订阅（如只有 NOT）每次都要求值
+        self._phrase_index: Dict[int, Set[int]] = {}
+        self._keyword_free: Set[int] = set()
+        for index, expressions in enumerate(self._expressions):
+            if not expressions or any(expression.evaluate(set()) for expression in expressions):
+                self._keyword_free.add(index)
+            for expression in expressions:
+                for term in expression.terms():
+                    self._phrase_index.setdefault(term.index, set()).add(index)
+        
+        # 类别 -> 订阅 的倒排索引；没有限定类别的订阅接受所有类别
+        self._category_index: Dict[str, Set[int]] = {}
+        self._category_free: Set[int] = set()
+        for index, profile in enumerate(profiles):
+            categories = profile.get('categories') or []
+            if not categories:
+                self._category_free.add(index)
+            for category in categories:
+                self._category_index.setdefault(category, set()).add(index)
+        
+        self.logger.info(f"已加载 {len(profiles)} 个订阅，共 {len(keywords)} 个关键词表达式")
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'Percolator':
+        """从 YAML 文件加载订阅
+        
+        Args:
+            path: 订阅文件路径（顶层为 profiles 列表）
+        
+        Returns:
+            Percolator 对象
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        return cls(data.get('profiles') or [])
+    
+    @property
+    def categories(self) -> List[str]:
+        """所有订阅的类别并集（用于一次性爬取）"""
+        categories = []
+        for profile in self.profiles:
+            for category in profile.get('categories') or []:
+                if category not in categories:
+                    categories.append(category)
+        return categories
+    
+    def match(self, paper: Dict[str, Any]) -> List[str]:
+        """找出论文匹配的全部订阅
+        
+        Args:
+            paper: 论文（需要 title、abstract、categories）
+        
+        Returns:
+            订阅名称列表（按订阅顺序）
+        """
+        phrases = self.matcher.find_paper_phrases(paper) if self.matcher else set()
+        
+        candidates = set(self._keyword_free)
+        for phrase in phrases:
+            candidates |= self._phrase_index.get(phrase, set())
+        if not candidates:
+            return []
+        
+        allowed = set(self._category_free)
+        for category in paper.get('categories') or []:
+            allowed |= self._category_index.get(category, set())
+        candidates &= allowed
+        
+        return [
+            self.names[index] for index in sorted(candidates)
+            if not self._expressions[index]
+            or any(expression.evaluate(phrases) for expression in self._expressions[index])
+        ]
+    
+    def percolate(self, papers: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """把一批论文分配到各个订阅
+        
+        Args:
+            papers: 论文列表或迭代器
+        
+        Returns:
+            订阅名称 -> 论文列表（保持输入顺序）
+        """
+        results = {name: [] for name in self.names}
+        for paper in papers:
+            for name in self.match(paper):
+                results[name].append(paper)
+        return results
+
+
+class ProfileRunner:
+    """一次爬取，为所有订阅分别生成论文列表、总结和报告"""
+    
+    def __init__(self, config: Dict[str, Any], percolator: Percolator = None,
+                 fetcher: ArxivFetcher = None):
+        """初始化
+        
+        Args:
+            config: 配置字典
+            percolator: 订阅匹配器（默认从 percolator.profiles_path 加载）
+            fetcher: 论文爬取器（默认按所有订阅的类别并集创建）
+        """
+        self.config = config
+        self.percolator_config = config.get('percolator', {})
+        self.logger = logging.getLogger('daily_arxiv.percolator')
+        
+        self.percolator = percolator or Percolator.from_file(
+            self.percolator_config.get('profiles_path', 'config/profiles.yaml')
+        )
+        self.fetcher = fetcher or ArxivFetcher(self._harvest_config())
+        self.summarizer = None
+    
+    def _harvest_config(self) -> Dict[str, Any]:
+        """构建共享爬取的配置：只按类别并集查询，关键词留给本地匹配"""
+        categories = self.percolator.categories
+        if not categories:
+            raise ValueError("至少需要一个订阅限定类别，才能确定共享爬取的范围")
+        
+        config = copy.deepcopy(self.config)
+        arxiv_config = config.setdefault('arxiv', {})
+        arxiv_config['categories'] = categories
+        arxiv_config['keywords'] = []
+        arxiv_config['incremental'] = False
+        arxiv_config['max_results'] = self.percolator_config.get('max_results', 1000)
+        arxiv_config['fan_out'] = self.percolator_config.get('fan_out', arxiv_config.get('fan_out'))
+        return config
+    
+    def run(self, days_back: int = 1, summarize: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+        """执行共享爬取并生成每个订阅的结果
+        
+        Args:
+            days_back: 获取过去几天的论文
+            summarize: 是否使用 LLM 总结（每篇论文只总结一次，再分发给所有匹配的订阅）
+        
+        Returns:
+            订阅名称 -> 论文列表
+        """
+        self.logger.info("=" * 60)
+        self.logger.info(f"共享爬取: {len(self.percolator.profiles)} 个订阅, 类别 {', '.join(self.percolator.categories)}")
+        self.logger.info("=" * 60)
+        
+        papers = list(self.fetcher.iter_papers(days_back=days_back, save=False))
+        results = self.percolator.percolate(papers)
+        
+        for name, matched in results.items():
+            self.logger.info(f"  - {name}: {len(matched)} 篇")
+        
+        if summarize:
+            results = self._summarize(results)
+        
+        for name, matched in results.items():
+            self._save_profile(name, matched)
+        
+        return results
+    
+    def _summarize(self, results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """只总结被至少一个订阅匹配的论文，每篇一次
+        
+        Args:
+            results: 订阅名称 -> 论文列表
+        
+        Returns:
+            订阅名称 -> 包含总结的论文列表
+        """
+        from src.summarizer.paper_summarizer import PaperSummarizer
+        
+        unique = {}
+        for matched in results.values():
+            for paper in matched:
+                unique.setdefault(paper['id'], paper)
+        
+        self.summarizer = PaperSummarizer(self.config)
+        # 只保存到各订阅目录（_save_profile），不覆盖主流程的最新总结
+        summarized = {paper['id']: paper for paper in self.summarizer.summarize_papers(list(unique.values()), save=False)}
+        
+        return {name: [summarized[paper['id']] for paper in matched] for name, matched in results.items()}
+    
+    def _save_profile(self, name: str, papers: List[Dict[str, Any]]):
+        """保存订阅的论文列表和报告
+        
+        Args:
+            name: 订阅名称
+            papers: 论文列表
+        """
+        profile_dir = Path(get_data_path(self.config, 'papers')) / 'profiles' / self._slug(name)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        date_str = get_date_string()
+        
+        save_json({
+            'date': date_str,
+            'profile': name,
+            'count': len(papers),
+            'papers': papers,
+        }, str(profile_dir / f"papers_{date_str}.json"))
+        
+        if self.summarizer is not None:
+            report = self.summarizer.generate_daily_report(papers)
+            with open(profile_dir / f"report_{date_str}.md", 'w', encoding='utf-8') as f:
+                f.write(report)
+        
+        self.logger.info(f"💾 订阅 {name} 的结果已保存到: {profile_dir}")
+    
+    @staticmethod
+    def _slug(name: str) -> str:
+        """把订阅名称转换为目录名"""
+        return re.sub(r'[^\w.-]+', '_', name).strip('_') or 'profile'
+
+
+def main():
+    """命令行入口"""
+    from src.utils import load_config, load_env, setup_logging
+    
+    parser = argparse.ArgumentParser(description="一次爬取，匹配多个订阅主题")
+    parser.add_argument('--days-back', type=int, default=1, help="获取过去几天的论文")
+    parser.add_argument('--profiles', default=None, help="订阅文件路径（默认 percolator.profiles_path）")
+    parser.add_argument('--no-summary', action='store_true', help="只匹配论文，不调用 LLM 总结")
+    args = parser.parse_args()
+    
+    load_env()
+    config = load_config()
+    setup_logging(config)
+    
+    percolator = Percolator.from_file(args.profiles) if args.profiles else None
+    runner = ProfileRunner(config, percolator=percolator)
+    runner.run(days_back=args.days_back, summarize=not args.no_summary)
+
+
+if __name__ == "__main__":
+    main()
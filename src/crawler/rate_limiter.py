@@ -0,0 +1,179 @@
+"""
+arXiv API 限速器
+
+基于令牌桶在线程之间（TokenBucket）或进程之间（SQLiteTokenBucket）共享请求节奏，
+遇到 429/503 时由所有调用方共同退避，避免触发 arXiv 的访问频率限制
+"""
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Dict, Any
+
+
+class TokenBucket:
+    """进程内线程安全的令牌桶"""
+    
+    def __init__(self, rate: float = 1 / 3, capacity: float = 1.0):
+        """初始化
+        
+        Args:
+            rate: 每秒补充的令牌数（即稳定状态下每秒允许的请求数）
+            capacity: 桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.logger = logging.getLogger('daily_arxiv.rate_limiter')
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated_at = time.time()
+        self._blocked_until = 0.0
+    
+    def acquire(self):
+        """阻塞直到获得一个令牌"""
+        with self._lock:
+            wait = self._reserve(time.time())
+        self._sleep(wait)
+        
+    def backoff(self, seconds: float):
+        """暂停所有调用方一段时间（用于服务端限流后的退避）
+        
+        Args:
+            seconds: 暂停秒数
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+    
+    def _reserve(self, now: float) -> float:
+        """预约一个令牌，返回需要等待的秒数
+        
+        令牌数允许为负，表示已被预约的未来令牌，这样排队的调用方会按顺序
+        错开，而不是在同一时刻一起醒来重试。
+        """
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        self._tokens -= 1
+        
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self._blocked_until - now)
+    
+    def _sleep(self, wait: float):
+        """等待指定秒数"""
+        if wait > 0:
+            self.logger.debug(f"限速等待 {wait:.2f} 秒")
+            time.sleep(wait)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """基于 SQLite 的跨进程令牌桶
+    
+    调度器、手动运行的 main.py 和 test.py 共用同一个数据库文件，
+    桶状态在 BEGIN IMMEDIATE 事务中读写，保证多个进程之间的互斥。
+    """
+    
+    def __init__(self, path: str, name: str = 'arxiv', rate: float = 1 / 3, capacity: float = 1.0):
+        """初始化
+        
+        Args:
+            path: SQLite 数据库路径
+            name: 桶名称（同一数据库中可以有多个桶）
+            rate: 每秒补充的令牌数
+            capacity: 桶容量
+        """
+        super().__init__(rate=rate, capacity=capacity)
+        self.path = path
+        self.name = name
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL, updated_at REAL, blocked_until REAL)"
+            )
+    
+    def acquire(self):
+        """阻塞直到获得一个令牌"""
+        with self._transaction() as conn:
+            wait = self._reserve(time.time())
+            self._store(conn)
+        self._sleep(wait)
+    
+    def backoff(self, seconds: float):
+        """暂停所有进程中的调用方一段时间
+        
+        Args:
+            seconds: 暂停秒数
+        """
+        with self._transaction() as conn:
+            self._blocked_until = max(self._blocked_until, time.time() + seconds)
+            self._store(conn)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接（每次调用独立连接，便于多线程使用）"""
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+    
+    @contextmanager
+    def _transaction(self):
+        """开启写事务并把桶状态加载到实例上"""
+        # 同一进程内的线程先通过锁串行化，避免频繁的数据库锁竞争
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT tokens, updated_at, blocked_until FROM buckets WHERE name = ?",
+                    (self.name,)
+                ).fetchone()
+                if row:
+                    self._tokens, self._updated_at, self._blocked_until = row
+                else:
+                    self._tokens, self._updated_at, self._blocked_until = self.capacity, time.time(), 0.0
+                
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            finally:
+                conn.close()
+    
+    def _store(self, conn: sqlite3.Connection):
+        """写回桶状态"""
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (name, tokens, updated_at, blocked_until) VALUES (?, ?, ?, ?)",
+            (self.name, self._tokens, self._updated_at, self._blocked_until)
+        )
+
+
+# 进程内共享的限速器，同一进程中的所有 ArxivFetcher 使用同一个桶
+_shared_limiters: Dict[tuple, TokenBucket] = {}
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter(config: Dict[str, Any]) -> TokenBucket:
+    """获取（或创建）进程内共享的限速器
+    
+    Args:
+        config: 完整配置字典，读取 arxiv.rate_limit
+    
+    Returns:
+        令牌桶限速器
+    """
+    rate_config = config.get('arxiv', {}).get('rate_limit', {})
+    rate = rate_config.get('rate', 1 / 3)
+    capacity = rate_config.get('burst', 1)
+    backend = rate_config.get('backend', 'sqlite')
+    sqlite_path = rate_config.get('sqlite_path', 'data/arxiv_rate_limit.db')
+    
+    key = (backend, sqlite_path if backend == 'sqlite' else None, rate, capacity)
+    with _shared_lock:
+        if key not in _shared_limiters:
+            if backend == 'sqlite':
+                _shared_limiters[key] = SQLiteTokenBucket(sqlite_path, rate=rate, capacity=capacity)
+            elif backend == 'memory':
+                _shared_limiters[key] = TokenBucket(rate=rate, capacity=capacity)
+            else:
+                raise ValueError(f"不支持的限速后端: {backend}（可选: sqlite, memory）")
+        return _shared_limiters[key]
@@ -0,0 +1,159 @@
+"""
+arXiv 响应缓存
+
+按请求内容（查询 + 偏移 + 页大小 + 排序）寻址，把原始 Atom 响应保存在磁盘上，
+支持过期时间和按容量淘汰，也可以完全离线地从缓存回放
+
+缓存总大小在首次写入时扫描一次，之后随写入增量累加；只有超出容量时才重新扫描并淘汰到容量的 90%，
+其他进程写入的条目在下次扫描时计入
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import arxiv
+
+
+class CacheMissError(arxiv.ArxivError):
+    """离线回放模式下缓存未命中"""
+    
+    def __init__(self, url: str):
+        super().__init__(url, 0, "离线回放模式下缓存未命中")
+
+
+class ResponseCache:
+    """arXiv Atom 响应的磁盘缓存"""
+    
+    # 超出容量时淘汰到容量的这一比例，之后的若干次写入不会再次触发扫描
+    EVICT_TARGET = 0.9
+    
+    def __init__(self, cache_dir: str = 'data/cache/arxiv', ttl_seconds: float = 6 * 3600,
+                 max_size_mb: float = 200):
+        """初始化
+        
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 缓存有效期（秒），0 表示永不过期
+            max_size_mb: 缓存总容量上限（MB），超出后按最近最少使用淘汰
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.logger = logging.getLogger('daily_arxiv.response_cache')
+        
+        # 缓存目录的总大小（None 表示还没有扫描过）
+        self._total_size = None
+        self._size_lock = threading.Lock()
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(url: str) -> str:
+        """根据请求参数计算缓存键
+        
+        参数按名称排序后再计算哈希，参数顺序不同的同一请求会命中同一条缓存。
+        
+        Args:
+            url: 请求 URL
+        
+        Returns:
+            十六进制 SHA-256 摘要
+        """
+        parts = urlsplit(url)
+        canonical = f"{parts.netloc}{parts.path}?{urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))}"
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def get(self, url: str, allow_expired: bool = False) -> Optional[bytes]:
+        """读取缓存的响应
+        
+        Args:
+            url: 请求 URL
+            allow_expired: 是否返回已过期的缓存（离线回放时使用）
+        
+        Returns:
+            原始响应内容，未命中返回 None
+        """
+        path = self._path(self.make_key(url))
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        
+        now = time.time()
+        if not allow_expired and self.ttl_seconds and now - stat.st_mtime > self.ttl_seconds:
+            return None
+        
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        
+        # 用访问时间记录最近使用情况，修改时间保持为写入时间（用于判断过期）
+        os.utime(path, (now, stat.st_mtime))
+        return content
+    
+    def put(self, url: str, content: bytes):
+        """写入响应，累加缓存总大小，超出容量时才扫描淘汰
+        
+        Args:
+            url: 请求 URL
+            content: 原始响应内容
+        """
+        path = self._path(self.make_key(url))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced_size = path.stat().st_size
+        except FileNotFoundError:
+            replaced_size = 0
+        
+        # 先写临时文件再原子替换，并发写入同一条缓存也不会读到半个文件
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        
+        with self._size_lock:
+            if self._total_size is not None:
+                self._total_size += len(content) - replaced_size
+            needs_scan = self._total_size is None or self._total_size > self.max_size_bytes
+        if needs_scan:
+            self.evict()
+    
+    def evict(self):
+        """扫描缓存目录：删除过期条目，超出容量时按最近最少使用淘汰到容量的 EVICT_TARGET"""
+        now = time.time()
+        entries = []
+        total_size = 0
+        
+        for path in self.cache_dir.glob('*/*.xml'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self.ttl_seconds and now - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total_size += stat.st_size
+        
+        if total_size > self.max_size_bytes:
+            target = self.max_size_bytes * self.EVICT_TARGET
+            for _, size, path in sorted(entries):
+                path.unlink(missing_ok=True)
+                total_size -= size
+                if total_size <= target:
+                    break
+            self.logger.debug(f"缓存已淘汰到 {total_size / 1024 / 1024:.1f} MB")
+        
+        with self._size_lock:
+            self._total_size = total_size
+    
+    def _path(self, key: str) -> Path:
+        """获取缓存键对应的文件路径（按前两位分目录，避免单个目录文件过多）"""
+        return self.cache_dir / key[:2] / f"{key}.xml"
@@ -0,0 +1,174 @@
+"""
+已处理论文索引
+
+按 arXiv ID + 版本号持久化记录已经总结过的论文，重叠的时间窗口（如 days_back=3 的每日运行）
+中已处理的论文不再交给 LLM；前置一个内存中的 Bloom 过滤器，新论文无需查询数据库即可判定
+"""
+import hashlib
+import logging
+import math
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+
+class BloomFilter:
+    """简单的 Bloom 过滤器（只会误判“可能存在”，不会漏判）"""
+    
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01):
+        """初始化
+        
+        Args:
+            capacity: 预期元素数量
+            error_rate: 预期误判率
+        """
+        capacity = max(capacity, 1)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+    
+    def add(self, key: str):
+        """添加元素
+        
+        Args:
+            key: 元素
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+    
+    def _positions(self, key: str):
+        """用双重哈希生成 num_hashes 个比特位置"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+
+class SeenIndex:
+    """基于 SQLite 的已处理论文索引"""
+    
+    # 论文状态
+    NEW = 'new'              # 从未处理过
+    UPDATED = 'updated'      # 处理过旧版本（版本号或更新时间变化）
+    PROCESSED = 'processed'  # 当前版本已经处理过
+    
+    def __init__(self, path: str, use_bloom: bool = True, bloom_capacity: int = 100000):
+        """初始化
+        
+        Args:
+            path: SQLite 数据库路径
+            use_bloom: 是否在数据库前使用 Bloom 过滤器
+            bloom_capacity: Bloom 过滤器的预期论文数（实际论文数更多时自动放大）
+        """
+        self.path = path
+        self.logger = logging.getLogger('daily_arxiv.seen_index')
+        self._lock = threading.Lock()
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                "base_id TEXT PRIMARY KEY, version INTEGER, updated TEXT, processed_at TEXT)"
+            )
+            base_ids = [row[0] for row in conn.execute("SELECT base_id FROM papers")]
+        
+        self.bloom = None
+        if use_bloom:
+            self.bloom = BloomFilter(capacity=max(bloom_capacity, 2 * len(base_ids)))
+            for base_id in base_ids:
+                self.bloom.add(base_id)
+        
+        self.logger.debug(f"已加载 {len(base_ids)} 篇已处理论文")
+    
+    def classify(self, paper: Dict[str, Any]) -> str:
+        """判断论文是新论文、已更新还是已处理
+        
+        Args:
+            paper: 论文信息字典（需要 id，可选 updated）
+        
+        Returns:
+            NEW / UPDATED / PROCESSED
+        """
+        base_id, version = self.split_id(paper['id'])
+        
+        # Bloom 过滤器判定不存在时一定是新论文，无需查询数据库
+        if self.bloom is not None:
+            with self._lock:
+                if base_id not in self.bloom:
+                    return self.NEW
+        
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT version, updated FROM papers WHERE base_id = ?", (base_id,)
+            ).fetchone()
+        
+        if row is None:
+            return self.NEW
+        
+        seen_version, seen_updated = row
+        if version > seen_version or (version == seen_version and paper.get('updated', seen_updated) != seen_updated):
+            return self.UPDATED
+        return self.PROCESSED
+    
+    def mark_processed(self, papers: List[Dict[str, Any]]):
+        """记录论文已处理
+        
+        Args:
+            papers: 论文列表
+        """
+        now = datetime.now().isoformat()
+        rows = []
+        for paper in papers:
+            base_id, version = self.split_id(paper['id'])
+            rows.append((base_id, version, paper.get('updated'), now))
+        
+        if not rows:
+            return
+        
+        with closing(self._connect()) as conn:
+            with conn:
+                # 只会前进到更新的版本，旧版本不会覆盖新版本
+                conn.executemany(
+                    "INSERT INTO papers (base_id, version, updated, processed_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(base_id) DO UPDATE SET version = excluded.version, "
+                    "updated = excluded.updated, processed_at = excluded.processed_at "
+                    "WHERE excluded.version >= papers.version",
+                    rows
+                )
+        
+        if self.bloom is not None:
+            with self._lock:
+                for base_id, _, _, _ in rows:
+                    self.bloom.add(base_id)
+        
+        self.logger.info(f"💾 已记录 {len(rows)} 篇已处理论文")
+    
+    def __len__(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+    
+    @staticmethod
+    def split_id(arxiv_id: str) -> Tuple[str, int]:
+        """拆分 arXiv ID 与版本号
+        
+        Args:
+            arxiv_id: 带版本号的 arXiv ID，如 2506.08052v2
+        
+        Returns:
+            (不带版本号的 ID, 版本号)，没有版本号时版本为 1
+        """
+        match = re.match(r'^(.*?)v(\d+)$', arxiv_id)
+        if match:
+            return match.group(1), int(match.group(2))
+        return arxiv_id, 1
+    
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接（每次调用独立连接，便于多线程使用）"""
+        return sqlite3.connect(self.path, timeout=30)
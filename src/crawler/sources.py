@@ -0,0 +1,514 @@
+"""
+多来源论文采集
+
+每个来源适配器把自己的数据格式转换为与 arXiv 相同的论文记录（Paper），
+采集器在线程中并发运行所有来源（总耗时取决于最慢的来源，而不是各来源之和），
+再按 DOI 和标题指纹跨来源去重。
+
+支持的来源：
+    arxiv       arXiv API（使用 ArxivFetcher 的全部配置）
+    openreview  OpenReview API 的 notes JSON（HTTP 地址或本地导出文件）
+    rss         会议 RSS / Atom feed（HTTP 地址或本地导出文件）
+"""
+import argparse
+import json
+import logging
+import queue
+import re
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import feedparser
+import requests
+
+from .arxiv_fetcher import ArxivFetcher
+from .keyword_matcher import KeywordMatcher
+from .paper import Paper
+
+
+def normalize_doi(doi: Optional[str]) -> Optional[str]:
+    """规范化 DOI（去掉 doi.org 前缀，转为小写）
+    
+    Args:
+        doi: DOI 或 DOI 链接
+    
+    Returns:
+        规范化的 DOI，无效时返回 None
+    """
+    if not doi:
+        return None
+    doi = re.sub(r'^(https?://(dx\.)?doi\.org/|doi:)', '', doi.strip(), flags=re.IGNORECASE)
+    return doi.lower() if doi.startswith('10.') else None
+
+
+def title_fingerprint(title: str) -> str:
+    """计算标题指纹：去掉重音、标点和大小写差异后的单词序列
+    
+    Args:
+        title: 论文标题
+    
+    Returns:
+        标题指纹
+    """
+    title = unicodedata.normalize('NFKD', title or '')
+    title = ''.join(ch for ch in title if not unicodedata.combining(ch))
+    return ' '.join(re.findall(r'[a-z0-9]+', title.lower()))
+
+
+class BaseSource(ABC):
+    """论文来源基类"""
+    
+    # 来源类型（配置中的 type）
+    type = ''
+    
+    def __init__(self, config: Dict[str, Any]):
+        """初始化
+        
+        Args:
+            config: 来源配置（sources.adapters 中的一项）
+        """
+        self.config = config
+        self.name = config.get('name') or self.type
+        self.logger = logging.getLogger(f'daily_arxiv.sources.{self.name}')
+    
+    @abstractmethod
+    def iter_papers(self, days_back: int = 1) -> Iterator[Paper]:
+        """获取论文
+        
+        Args:
+            days_back: 获取过去几天的论文
+        
+        Yields:
+            论文记录（extra 中带 source 字段）
+        """
+        pass
+
+    def commit(self):
+        """采集结果保存成功后调用（如推进增量水位线），默认不做任何事"""
+        pass
+
+
+class ArxivSource(BaseSource):
+    """arXiv 来源（包装 ArxivFetcher）"""
+    
+    type = 'arxiv'
+    
+    def __init__(self, config: Dict[str, Any], fetcher: ArxivFetcher):
+        """初始化
+        
+        Args:
+            config: 来源配置
+            fetcher: arXiv 论文爬取器
+        """
+        super().__init__(config)
+        self.fetcher = fetcher
+        # 本次采集计算出的新水位线，合并后的论文保存成功后由 commit 写入
+        self.pending_watermarks = {}
+    
+    def iter_papers(self, days_back: int = 1) -> Iterator[Paper]:
+        # 合并后的论文由采集器统一保存，这里只收集新水位线
+        self.pending_watermarks = {}
+        for paper in self.fetcher.iter_papers(days_back=days_back, save=False,
+                                              watermarks=self.pending_watermarks):
+            paper['source'] = self.name
+            yield paper
+    
+    def commit(self):
+        self.fetcher.save_watermarks(self.pending_watermarks)
+        self.pending_watermarks = {}
+
+
+class FeedSource(BaseSource):
+    """从 HTTP 地址或本地文件读取整份数据的来源"""
+    
+    def __init__(self, config: Dict[str, Any], keyword_matcher: KeywordMatcher = None):
+        """初始化
+        
+        Args:
+            config: 来源配置，包含 url（HTTP 地址、file:// 或本地路径）、
+                timeout（可选）、filter_by_date（可选，默认 true）、keyword_filter（可选，默认 true）
+            keyword_matcher: 关键词匹配器（与 arXiv 相同的关键词，在本地匹配标题和摘要）
+        """
+        super().__init__(config)
+        if not config.get('url'):
+            raise ValueError(f"来源 {self.name} 需要 url")
+        
+        self.url = config['url']
+        self.timeout = config.get('timeout', 60)
+        self.filter_by_date = config.get('filter_by_date', True)
+        self.keyword_matcher = keyword_matcher if config.get('keyword_filter', True) else None
+        self.session = requests.Session()
+    
+    def iter_papers(self, days_back: int = 1) -> Iterator[Paper]:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days_back)
+        
+        count = 0
+        for paper in self.parse(self._read()):
+            # 没有日期的条目无法判断是否在时间窗口内，予以保留
+            if self.filter_by_date and paper['published'] and \
+                    datetime.fromisoformat(paper['published']) < cutoff:
+                continue
+            if self.keyword_matcher and not self.keyword_matcher.match_paper(paper):
+                continue
+            
+            paper['source'] = self.name
+            count += 1
+            yield paper
+        
+        self.logger.info(f"✓ {self.name}: {count} 篇论文")
+    
+    @abstractmethod
+    def parse(self, content: bytes) -> Iterator[Paper]:
+        """把原始数据转换为论文记录
+        
+        Args:
+            content: 原始数据
+        
+        Yields:
+            论文记录
+        """
+        pass
+    
+    def _read(self) -> bytes:
+        """读取原始数据；本地路径和 file:// 直接读取"""
+        url = self.url
+        if url.startswith('file://'):
+            url = url[len('file://'):]
+        if not re.match(r'^https?://', url):
+            return Path(url).read_bytes()
+        
+        resp = self.session.get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.content
+
+
+class OpenReviewSource(FeedSource):
+    """OpenReview 来源（API v1 / v2 的 notes JSON）"""
+    
+    type = 'openreview'
+    
+    def parse(self, content: bytes) -> Iterator[Paper]:
+        data = json.loads(content)
+        notes = data.get('notes', []) if isinstance(data, dict) else data
+        site = self.config.get('site', 'https://openreview.net').rstrip('/')
+        
+        for note in notes:
+            fields = note.get('content', {})
+            
+            def value(key, default=None):
+                # API v2 的字段包装为 {"value": ...}
+                item = fields.get(key, default)
+                return item.get('value', default) if isinstance(item, dict) else item
+            
+            forum = note.get('forum') or note['id']
+            published = self._timestamp(note.get('pdate') or note.get('cdate'))
+            venue = value('venue') or self.name
+            
+            pdf = value('pdf') or ''
+            if pdf.startswith('/'):
+                pdf = f"{site}{pdf}"
+            
+            yield Paper(
+                id=f"openreview:{forum}",
+                title=(value('title') or '').strip(),
+                authors=value('authors') or [],
+                abstract=re.sub(r'\s+', ' ', value('abstract') or '').strip(),
+                categories=[venue],
+                primary_category=venue,
+                published=published,
+                updated=self._timestamp(note.get('mdate')) or published,
+                pdf_url=pdf or f"{site}/pdf?id={forum}",
+                entry_url=f"{site}/forum?id={forum}",
+                journal_ref=value('venue'),
+                doi=normalize_doi(value('doi')),
+                fetched_at=datetime.now().isoformat(),
+            )
+    
+    @staticmethod
+    def _timestamp(milliseconds: Optional[int]) -> str:
+        """把毫秒时间戳转换为 ISO 格式"""
+        if not milliseconds:
+            return ''
+        return datetime.fromtimestamp(milliseconds / 1000, tz=timezone.utc).isoformat()
+
+
+class RSSSource(FeedSource):
+    """RSS / Atom 来源（如会议论文列表的 feed 导出）"""
+    
+    type = 'rss'
+    
+    def parse(self, content: bytes) -> Iterator[Paper]:
+        feed = feedparser.parse(content)
+        
+        for entry in feed.entries:
+            link = entry.get('link', '')
+            parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+            published = datetime(*parsed[:6], tzinfo=timezone.utc).isoformat() if parsed else ''
+            # 绕过 feedparser 把 updated_parsed 回退为 published_parsed 的兼容映射
+            updated = dict.get(entry, 'updated_parsed')
+            
+            authors = [author.get('name', '') for author in entry.get('authors', []) if author.get('name')]
+            if not authors and entry.get('author'):
+                authors = [name.strip() for name in re.split(r',| and ', entry['author']) if name.strip()]
+            
+            categories = [tag.term for tag in entry.get('tags', []) if tag.get('term')] or [self.name]
+            pdf_url = next((l.href for l in entry.get('links', []) if l.get('type') == 'application/pdf'), '')
+            doi = normalize_doi(entry.get('prism_doi') or entry.get('dc_identifier'))
+            
+            yield Paper(
+                id=f"{self.name}:{entry.get('id') or link}",
+                title=re.sub(r'\s+', ' ', entry.get('title', '')).strip(),
+                authors=authors,
+                abstract=re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', entry.get('summary', ''))).strip(),
+                categories=categories,
+                primary_category=categories[0],
+                published=published,
+                updated=datetime(*updated[:6], tzinfo=timezone.utc).isoformat() if updated else published,
+                pdf_url=pdf_url or link,
+                entry_url=link,
+                doi=doi,
+                fetched_at=datetime.now().isoformat(),
+            )
+
+
+class SourceIngestor:
+    """并发运行多个来源并跨来源去重"""
+    
+    # 支持的来源类型
+    SOURCES = {
+        'arxiv': ArxivSource,
+        'openreview': OpenReviewSource,
+        'rss': RSSSource,
+    }
+    
+    # 合并重复论文时，从其他来源补充的字段
+    MERGE_FIELDS = ('doi', 'journal_ref', 'comment', 'pdf_url', 'affiliations', 'code_urls')
+    # 下游（全文提取、链接补全）写入产出副本、保存前合并回内部记录的字段
+    ENRICHMENT_FIELDS = ('affiliations', 'code_urls', 'datasets')
+    
+    def __init__(self, config: Dict[str, Any], fetcher: ArxivFetcher = None):
+        """初始化
+        
+        Args:
+            config: 配置字典，读取 sources.adapters（默认只有 arXiv）
+            fetcher: arXiv 论文爬取器（默认根据配置创建，也用于保存结果和标记已处理状态）
+        
+        Raises:
+            ValueError: 来源类型不支持或来源名称重复
+        """
+        self.config = config
+        self.logger = logging.getLogger('daily_arxiv.sources')
+        self.fetcher = fetcher or ArxivFetcher(config)
+        
+        keyword_matcher = KeywordMatcher(config.get('arxiv', {}).get('keywords', []))
+        adapters = config.get('sources', {}).get('adapters') or [{'type': 'arxiv'}]
+        
+        self.sources: List[BaseSource] = []
+        for source_config in adapters:
+            source_type = source_config.get('type', '').lower()
+            if source_type not in self.SOURCES:
+                raise ValueError(
+                    f"不支持的来源类型: {source_type}\n"
+                    f"支持的来源: {', '.join(self.SOURCES.keys())}"
+                )
+            if source_type == 'arxiv':
+                self.sources.append(ArxivSource(source_config, self.fetcher))
+            else:
+                self.sources.append(self.SOURCES[source_type](source_config, keyword_matcher or None))
+        
+        names = [source.name for source in self.sources]
+        if len(set(names)) != len(names):
+            raise ValueError("来源名称不能重复（同一类型的多个来源请设置不同的 name）")
+    
+        # 最近一次采集的 (内部记录, 产出的副本)，保存时把下游补充的字段合并回内部记录
+        self._streamed: List[Tuple[Paper, Paper]] = []
+    
+    def iter_papers(self, days_back: int = 1, save: bool = True,
+                    merged: List[Paper] = None) -> Iterator[Paper]:
+        """并发获取所有来源的论文，按到达顺序产出去重后的论文
+        
+        重复论文（DOI 相同，或标题指纹相同）只产出第一次到达的记录的副本，其他来源的记录
+        用于补充内部记录缺失的字段，并记录在 sources 字段中（已产出的副本不会被修改，
+        合并结果随保存的论文数据一起落盘）。单个来源失败只记录错误。
+        用 with_fulltext / with_links 包装结果流时应设置 save=False，下游处理完成后再调用 save_fetched(merged)。
+        
+        Args:
+            days_back: 获取过去几天的论文
+            save: 结果流结束后是否保存论文数据（并推进各来源的水位线）
+            merged: 用于收集合并后论文记录的列表（可选，save=False 时传给 save_fetched）
+        
+        Yields:
+            论文记录
+        
+        Raises:
+            Exception: 所有来源都失败时抛出最后一个错误
+        """
+        self.logger.info("=" * 60)
+        self.logger.info(f"开始多来源采集: {', '.join(source.name for source in self.sources)}")
+        self.logger.info("=" * 60)
+        
+        papers = []
+        by_doi: Dict[str, Paper] = {}
+        by_title: Dict[str, Paper] = {}
+        counts = {source.name: 0 for source in self.sources}
+        duplicates = 0
+        self._streamed = []
+        
+        for source, paper in self._iter_sources(days_back):
+            counts[source.name] += 1
+            
+            existing = self._find_duplicate(paper, by_doi, by_title)
+            if existing is not None:
+                self._merge(existing, paper)
+                duplicates += 1
+                continue
+            
+            paper['sources'] = [paper['source']]
+            doi = normalize_doi(paper.get('doi'))
+            if doi:
+                by_doi[doi] = paper
+            fingerprint = title_fingerprint(paper['title'])
+            if fingerprint:
+                by_title[fingerprint] = paper
+            
+            papers.append(paper)
+            streamed = paper.copy()
+            self._streamed.append((paper, streamed))
+            yield streamed
+        
+        self.logger.info("=" * 60)
+        for name, count in counts.items():
+            self.logger.info(f"  - {name}: {count} 篇")
+        self.logger.info(f"✅ 合并后共 {len(papers)} 篇论文（跨来源重复 {duplicates} 篇）")
+        self.logger.info("=" * 60)
+        
+        if merged is not None:
+            merged.extend(papers)
+        
+        if save:
+            self.save_fetched(papers)
+    
+    def save_fetched(self, papers: List[Paper]):
+        """保存合并后的论文并推进各来源的水位线
+        
+        iter_papers(save=False) 的调用方在下游处理完成后调用；下游写入产出副本的
+        全文和链接字段（ENRICHMENT_FIELDS）先合并回内部记录再保存。
+        
+        Args:
+            papers: iter_papers 通过 merged 收集的合并后论文记录
+        """
+        for record, streamed in self._streamed:
+            for field in self.ENRICHMENT_FIELDS:
+                if streamed.get(field):
+                    record[field] = streamed[field]
+        
+        self.fetcher._save_papers(papers)
+        for source in self.sources:
+            source.commit()
+    
+    def fetch_papers(self, days_back: int = 1) -> List[Paper]:
+        """获取所有来源的论文，补充全文信息和链接后保存
+        
+        与 ArxivFetcher.fetch_papers 相同，启用全文提取、链接补全时在保存前补充。
+        
+        Args:
+            days_back: 获取过去几天的论文
+        
+        Returns:
+            去重后的论文列表
+        """
+        papers = []
+        streamed = list(self.iter_papers(days_back=days_back, save=False, merged=papers))
+        if self.fetcher.fulltext is not None:
+            self.fetcher.fulltext.process(streamed)
+        if self.fetcher.enricher is not None:
+            self.fetcher.enricher.process(streamed)
+        self.save_fetched(papers)
+        return papers
+    
+    def _iter_sources(self, days_back: int) -> Iterator[Tuple[BaseSource, Paper]]:
+        """在线程中并发运行所有来源，按到达顺序产出 (来源, 论文)"""
+        output = queue.Queue()
+        stop = threading.Event()
+        done = object()
+        
+        def worker(source):
+            try:
+                for paper in source.iter_papers(days_back=days_back):
+                    if stop.is_set():
+                        return
+                    output.put((source, paper))
+            except Exception as e:
+                output.put((source, e))
+            finally:
+                output.put((source, done))
+        
+        executor = ThreadPoolExecutor(max_workers=len(self.sources))
+        failed = []
+        last_error = None
+        try:
+            for source in self.sources:
+                executor.submit(worker, source)
+            
+            remaining = len(self.sources)
+            while remaining:
+                source, item = output.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    last_error = item
+                    failed.append(source.name)
+                    self.logger.error(f"❌ 来源 {source.name} 失败: {str(item)}")
+                else:
+                    yield source, item
+        finally:
+            # 下游提前停止消费时，通知仍在运行的来源尽快退出
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if len(failed) == len(self.sources) and last_error is not None:
+            raise last_error
+    
+    @staticmethod
+    def _find_duplicate(paper: Paper, by_doi: Dict[str, Paper], by_title: Dict[str, Paper]) -> Optional[Paper]:
+        """按 DOI、再按标题指纹查找已收录的同一篇论文"""
+        doi = normalize_doi(paper.get('doi'))
+        if doi and doi in by_doi:
+            return by_doi[doi]
+        return by_title.get(title_fingerprint(paper['title']))
+    
+    def _merge(self, existing: Paper, duplicate: Paper):
+        """用重复记录补充已收录论文的缺失字段"""
+        for field in self.MERGE_FIELDS:
+            if not existing.get(field) and duplicate.get(field):
+                existing[field] = duplicate[field]
+        if duplicate['source'] not in existing['sources']:
+            # 换成新列表：已产出的副本与内部记录共享原列表
+            existing['sources'] = existing['sources'] + [duplicate['source']]
+        self.logger.debug(f"跨来源重复: {existing['id']} <- {duplicate['id']}")
+
+
+def main():
+    """命令行入口"""
+    from src.utils import load_config, load_env, setup_logging
+    
+    parser = argparse.ArgumentParser(description="并发采集 arXiv 和其他来源的论文并跨来源去重")
+    parser.add_argument('--days-back', type=int, default=1, help="获取过去几天的论文")
+    args = parser.parse_args()
+    
+    load_env()
+    config = load_config()
+    setup_logging(config)
+    
+    ingestor = SourceIngestor(config)
+    papers = ingestor.fetch_papers(days_back=args.days_back)
+    ingestor.fetcher.print_paper_summary(papers)
+
+
+if __name__ == "__main__":
+    main()
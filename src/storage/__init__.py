@@ -0,0 +1,5 @@
+"""数据存储模块"""
+from .base_storage import BaseStorage
+from .storage_factory import StorageFactory
+
+__all__ = ['BaseStorage', 'StorageFactory']
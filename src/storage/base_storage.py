@@ -0,0 +1,185 @@
+"""
+数据存储基类
+
+定义论文、总结、分析结果和运行记录的统一读写接口。基类中的查询方法基于最新数据的完整加载实现，
+支持索引查询的后端（如 SQLite）可以覆盖这些方法。
+"""
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class BaseStorage(ABC):
+    """数据存储基类"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """初始化
+        
+        Args:
+            config: 完整配置字典
+        """
+        self.config = config
+        self.storage_config = config.get('storage', {})
+    
+    @abstractmethod
+    def save_papers(self, papers: List[Dict[str, Any]]):
+        """保存一次爬取得到的论文（成为最新论文）
+        
+        Args:
+            papers: 论文列表
+        """
+        pass
+    
+    @abstractmethod
+    def load_latest_papers(self) -> Optional[Dict[str, Any]]:
+        """读取最新一次保存的论文
+        
+        Returns:
+            {'date', 'count', 'papers'}，没有数据时返回 None
+        """
+        pass
+    
+    @abstractmethod
+    def save_summaries(self, papers: List[Dict[str, Any]], llm_provider: str = None, llm_model: str = None):
+        """保存一次总结的结果（成为最新总结）
+        
+        Args:
+            papers: 包含总结的论文列表
+            llm_provider: LLM 提供商名称
+            llm_model: LLM 模型名称
+        """
+        pass
+    
+    @abstractmethod
+    def load_latest_summaries(self) -> Optional[Dict[str, Any]]:
+        """读取最新一次保存的总结
+        
+        Returns:
+            {'date', 'count', 'papers', 'llm_provider', 'llm_model'}，没有数据时返回 None
+        """
+        pass
+    
+    @abstractmethod
+    def save_analysis(self, analysis: Dict[str, Any]):
+        """保存趋势分析结果
+        
+        Args:
+            analysis: 分析结果
+        """
+        pass
+    
+    @abstractmethod
+    def load_latest_analysis(self) -> Optional[Dict[str, Any]]:
+        """读取最新的趋势分析结果
+        
+        Returns:
+            分析结果，没有数据时返回 None
+        """
+        pass
+    
+    @abstractmethod
+    def load_daily(self, kind: str, date_str: str) -> Optional[Any]:
+        """读取某一天保存的论文、总结或分析结果（历史查询）
+        
+        Args:
+            kind: 记录类型 papers / summaries / analysis
+            date_str: 日期 YYYY-MM-DD
+        
+        Returns:
+            论文和总结为当天最后一次保存的论文列表，分析为分析结果；没有数据时返回 None
+        """
+        pass
+    
+    @abstractmethod
+    def record_run(self, started_at: datetime, finished_at: datetime, success: bool,
+                   stats: Dict[str, Any] = None, error: str = None):
+        """记录一次每日任务的运行
+        
+        Args:
+            started_at: 开始时间
+            finished_at: 结束时间
+            success: 是否成功
+            stats: 统计信息（papers_count、summaries_count 等）
+            error: 错误信息
+        """
+        pass
+    
+    def latest_date(self) -> Optional[str]:
+        """获取最新论文的保存日期
+        
+        Returns:
+            日期字符串 YYYY-MM-DD，没有数据时返回 None
+        """
+        papers_data = self.load_latest_papers()
+        return papers_data.get('date') if papers_data else None
+    
+    def get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """按 arXiv ID（带或不带版本号）查找最新论文，并附上总结
+        
+        Args:
+            paper_id: 论文 ID
+        
+        Returns:
+            论文字典，不存在时返回 None
+        """
+        papers_data = self.load_latest_papers() or {}
+        paper = next((p for p in papers_data.get('papers', []) if self._matches(p, paper_id)), None)
+        if paper is None:
+            return None
+        
+        summaries_data = self.load_latest_summaries() or {}
+        summarized = next((p for p in summaries_data.get('papers', []) if self._matches(p, paper_id)), None)
+        if summarized is not None and summarized.get('summary'):
+            paper['summary'] = summarized['summary']
+        return paper
+    
+    def query_papers(self, category: str = None, offset: int = 0,
+                     limit: int = None) -> Tuple[List[Dict[str, Any]], int]:
+        """分页查询最新论文
+        
+        Args:
+            category: 只返回包含该类别的论文（可选）
+            offset: 跳过的论文数
+            limit: 最多返回的论文数，None 表示不限
+        
+        Returns:
+            (论文列表, 符合条件的论文总数)
+        """
+        papers = (self.load_latest_papers() or {}).get('papers', [])
+        if category:
+            papers = [p for p in papers if category in p.get('categories', [])]
+        end = None if limit is None else offset + limit
+        return papers[offset:end], len(papers)
+    
+    def category_counts(self) -> Dict[str, int]:
+        """统计最新论文的类别分布
+        
+        Returns:
+            类别 -> 论文数
+        """
+        counts = {}
+        for paper in (self.load_latest_papers() or {}).get('papers', []):
+            for category in paper.get('categories', []):
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取最新数据的概况
+        
+        Returns:
+            包含 papers_count、summaries_count、analysis_available、last_update 的字典
+        """
+        papers_data = self.load_latest_papers()
+        summaries_data = self.load_latest_summaries()
+        return {
+            'papers_count': len(papers_data.get('papers', [])) if papers_data else 0,
+            'summaries_count': len(summaries_data.get('papers', [])) if summaries_data else 0,
+            'analysis_available': self.load_latest_analysis() is not None,
+            'last_update': papers_data.get('date') if papers_data else None,
+        }
+    
+    @staticmethod
+    def _matches(paper: Dict[str, Any], paper_id: str) -> bool:
+        """判断论文 ID 是否匹配（不带版本号的 ID 匹配任意版本）"""
+        return paper.get('id') == paper_id or re.sub(r'v\d+$', '', paper.get('id', '')) == paper_id
@@ -0,0 +1,449 @@
+"""
+列式历史论文库
+
+所有历史论文按列保存为原始的小端二进制数组，跨天分析时用 numpy.memmap 直接映射，不解析 JSON、不复制数据
+（storage.corpus）：
+    
+    data/corpus/meta.json            # 行数、各列文件的有效字节数、类别表（提交点，临时文件 + 重命名原子替换）
+    data/corpus/vocab.json           # 词表（词 ID -> 词）
+    data/corpus/published.bin        # 发布日期 / 入库日期 (datetime64[D])
+    data/corpus/ids.bin ...          # 变长文本（不带版本号的 ID、标题、摘要）: UTF-8 字节 + 偏移量列
+    data/corpus/term_indptr.bin ...  # 标题和摘要的词频稀疏矩阵 (CSR: indptr / indices / counts)
+
+新论文只追加到各列文件末尾，最后替换 meta.json 提交；读取方只映射 meta.json 中记录的字节数，
+中断的追加在下一次写入时截断。每篇论文（不带版本号的 ID）只入库一次。
+多个进程写入同一个论文库时，重新加载、追加和提交都在 .lock 文件的独占锁内进行。
+"""
+import argparse
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from src.utils import dumps_json, loads_json, file_lock, get_date_string
+
+
+# 列名 -> 数据类型（*_indptr / *_offsets 比行数多一项，第一项为 0）
+_COLUMNS = {
+    'id_offsets': '<i8',
+    'ids': 'u1',
+    'published': 'M8[D]',
+    'added': 'M8[D]',
+    'primary_category': '<i2',
+    'token_counts': '<i4',
+    'category_indptr': '<i8',
+    'category_indices': '<i2',
+    'title_offsets': '<i8',
+    'titles': 'u1',
+    'abstract_offsets': '<i8',
+    'abstracts': 'u1',
+    'term_indptr': '<i8',
+    'term_indices': '<i4',
+    'term_counts': '<i4',
+}
+
+# 变长文本列 -> 偏移量列
+_TEXT_COLUMNS = {'ids': 'id_offsets', 'titles': 'title_offsets', 'abstracts': 'abstract_offsets'}
+
+# 词: 小写字母开头的字母数字串，允许中间的连字符（如 vision-language）
+_TOKEN_PATTERN = re.compile(r'[a-z][a-z0-9]*(?:-[a-z0-9]+)*')
+
+
+def tokenize(text: str) -> List[str]:
+    """把标题或摘要切分为小写的词
+    
+    Args:
+        text: 文本
+    
+    Returns:
+        词列表（长度不小于 2）
+    """
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+
+class PaperCorpus:
+    """按列存储、可内存映射的历史论文库"""
+    
+    def __init__(self, path: str):
+        """初始化（映射已有的列文件）
+        
+        Args:
+            path: 论文库目录
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger('daily_arxiv.storage')
+        self._lock = threading.Lock()
+        self._meta_mtime = None
+        # 已入库的论文 ID（只追加：重新加载时只解码新增的行）
+        self._ids = set()
+        self._ids_count = 0
+        self._load()
+    
+    def __len__(self) -> int:
+        return self._meta['count']
+    
+    def refresh(self):
+        """其他进程追加了论文时重新映射列文件"""
+        meta_path = self.path / 'meta.json'
+        mtime = meta_path.stat().st_mtime_ns if meta_path.exists() else None
+        if mtime != self._meta_mtime:
+            self._load()
+    
+    def column(self, name: str) -> np.ndarray:
+        """获取一列（只读内存映射）
+        
+        Args:
+            name: 列名，如 published、added、primary_category、token_counts
+        
+        Returns:
+            长度为行数的数组（*_indptr / *_offsets 为行数 + 1）
+        """
+        return self._columns[name]
+    
+    @property
+    def categories(self) -> List[str]:
+        """类别表（primary_category 和 category_indices 中的编号对应的类别）"""
+        return self._meta['categories']
+    
+    def paper_id(self, row: int) -> str:
+        """获取一行的论文 ID（不带版本号）"""
+        return self._text('ids', row)
+    
+    def title(self, row: int) -> str:
+        """获取一行的标题"""
+        return self._text('titles', row)
+    
+    def abstract(self, row: int) -> str:
+        """获取一行的摘要"""
+        return self._text('abstracts', row)
+    
+    def categories_of(self, row: int) -> List[str]:
+        """获取一行的全部类别"""
+        indptr = self._columns['category_indptr']
+        return [self.categories[i] for i in self._columns['category_indices'][indptr[row]:indptr[row + 1]]]
+    
+    def term_id(self, term: str) -> Optional[int]:
+        """获取词的 ID，不在词表中时返回 None"""
+        return self._term_ids.get(term.lower())
+    
+    def rows(self, start: str = None, end: str = None, category: str = None) -> np.ndarray:
+        """按发布日期范围和类别筛选行（在映射的列上向量化计算）
+        
+        Args:
+            start: 起始日期 YYYY-MM-DD（包含）
+            end: 结束日期 YYYY-MM-DD（包含）
+            category: 类别（任意类别匹配即可，不限于主类别）
+        
+        Returns:
+            行号数组
+        """
+        published = self._columns['published']
+        mask = np.ones(len(self), dtype=bool)
+        if start:
+            mask &= published >= np.datetime64(start, 'D')
+        if end:
+            mask &= published <= np.datetime64(end, 'D')
+        if category:
+            mask &= self._category_mask(category)
+        return np.flatnonzero(mask)
+    
+    def term_matrix(self):
+        """获取全部论文的词频矩阵（scipy.sparse.csr_matrix，词 ID 和词频直接使用映射的数组）
+        
+        Returns:
+            形状为 (论文数, 词表大小) 的稀疏矩阵
+        """
+        from scipy.sparse import csr_matrix
+        
+        return csr_matrix(
+            (self._columns['term_counts'], self._columns['term_indices'], self._columns['term_indptr']),
+            shape=(len(self), len(self.vocab)),
+            copy=False
+        )
+    
+    def document_frequencies(self, rows: np.ndarray = None) -> np.ndarray:
+        """统计包含每个词的论文数
+        
+        Args:
+            rows: 行号数组，None 表示全部论文
+        
+        Returns:
+            长度为词表大小的数组
+        """
+        indices = self._columns['term_indices']
+        if rows is not None:
+            indices = indices[self._entry_mask(rows)]
+        return np.bincount(indices, minlength=len(self.vocab))
+    
+    def monthly_counts(self, rows: np.ndarray = None) -> Dict[str, int]:
+        """按发布月份统计论文数
+        
+        Args:
+            rows: 行号数组，None 表示全部论文
+        
+        Returns:
+            月份 YYYY-MM -> 论文数
+        """
+        published = self._columns['published']
+        if rows is not None:
+            published = published[rows]
+        months, counts = np.unique(published[~np.isnat(published)].astype('M8[M]'), return_counts=True)
+        return {str(month): int(count) for month, count in zip(months, counts)}
+    
+    def term_trend(self, term: str, category: str = None) -> Dict[str, Dict[str, int]]:
+        """统计每个月包含某个词的论文数
+        
+        Args:
+            term: 词（小写匹配）
+            category: 只统计该类别的论文（可选）
+        
+        Returns:
+            月份 YYYY-MM -> {'papers': 包含该词的论文数, 'total': 论文总数}
+        """
+        rows = self.rows(category=category)
+        totals = self.monthly_counts(rows)
+        term_id = self.term_id(term)
+        if term_id is None:
+            return {month: {'papers': 0, 'total': total} for month, total in totals.items()}
+        
+        # 包含该词的矩阵元素 -> 所在行
+        indptr = self._columns['term_indptr']
+        entries = np.flatnonzero(self._columns['term_indices'] == term_id)
+        matched = np.searchsorted(indptr, entries, side='right') - 1
+        matched = np.intersect1d(matched, rows, assume_unique=True)
+        counts = self.monthly_counts(matched)
+        return {month: {'papers': counts.get(month, 0), 'total': total} for month, total in totals.items()}
+    
+    def add_papers(self, papers: List[Dict[str, Any]], added: str = None) -> int:
+        """把尚未入库的论文追加到论文库
+        
+        Args:
+            papers: 论文列表
+            added: 入库日期 YYYY-MM-DD（默认今天，导入历史文件时使用文件日期）
+        
+        Returns:
+            新入库的论文数
+        """
+        with self._lock, file_lock(self.path / '.lock'):
+            # 持有锁后再加载其他进程提交的论文，避免重复入库或覆盖对方的追加
+            self.refresh()
+            new_papers = {}
+            for paper in papers:
+                base_id = re.sub(r'v\d+$', '', paper['id'])
+                if base_id not in self._ids and base_id not in new_papers:
+                    new_papers[base_id] = paper
+            if not new_papers:
+                return 0
+            
+            try:
+                self._append(self._encode(list(new_papers.items()), added or get_date_string()))
+            finally:
+                # 写入失败时恢复为已提交的状态
+                self._load()
+        
+        self.logger.info(f"📚 {len(new_papers)} 篇论文已加入历史论文库（共 {len(self)} 篇）")
+        return len(new_papers)
+    
+    def _encode(self, papers: List[tuple], added: str) -> Dict[str, np.ndarray]:
+        """把一批论文编码为各列要追加的数组（同时扩展类别表和词表）"""
+        categories = {name: i for i, name in enumerate(self.categories)}
+        chunks = {name: [] for name in _COLUMNS}
+        offsets = {name: self._last(name) for name in _COLUMNS if name.endswith(('_indptr', '_offsets'))}
+        
+        for base_id, paper in papers:
+            texts = {
+                'ids': base_id.encode('utf-8'),
+                'titles': (paper.get('title') or '').encode('utf-8'),
+                'abstracts': (paper.get('abstract') or '').encode('utf-8'),
+            }
+            published = (paper.get('published') or '')[:10]
+            category_ids = [categories.setdefault(name, len(categories)) for name in paper.get('categories') or []]
+            primary = paper.get('primary_category')
+            
+            tokens = tokenize(f"{paper.get('title') or ''} {paper.get('abstract') or ''}")
+            term_counts = Counter(self._term_ids.setdefault(token, len(self._term_ids)) for token in tokens)
+            term_ids = sorted(term_counts)
+            
+            chunks['published'].append(published or 'NaT')
+            chunks['added'].append(added)
+            chunks['primary_category'].append(categories.setdefault(primary, len(categories)) if primary else -1)
+            chunks['token_counts'].append(len(tokens))
+            chunks['category_indices'].extend(category_ids)
+            chunks['term_indices'].extend(term_ids)
+            chunks['term_counts'].extend(term_counts[term_id] for term_id in term_ids)
+            
+            for name, text in texts.items():
+                chunks[name].append(text)
+                offsets[_TEXT_COLUMNS[name]] += len(text)
+            offsets['category_indptr'] += len(category_ids)
+            offsets['term_indptr'] += len(term_ids)
+            for name, offset in offsets.items():
+                chunks[name].append(offset)
+        
+        self._meta['categories'] = list(categories)
+        self.vocab.extend(list(self._term_ids)[len(self.vocab):])
+        
+        arrays = {}
+        for name, values in chunks.items():
+            if name in _TEXT_COLUMNS:
+                arrays[name] = np.frombuffer(b''.join(values), dtype='u1')
+            else:
+                arrays[name] = np.array(values, dtype=_COLUMNS[name])
+        return arrays
+    
+    def _append(self, arrays: Dict[str, np.ndarray]):
+        """把各列数组追加到列文件末尾，再依次替换 vocab.json 和 meta.json 提交"""
+        sizes = dict(self._meta['sizes'])
+        for name, array in arrays.items():
+            # 偏移量列的第一项 0 在第一次写入时补上
+            if name.endswith(('_indptr', '_offsets')) and sizes[name] == 0:
+                array = np.concatenate([np.zeros(1, dtype=_COLUMNS[name]), array])
+            
+            path = self.path / f"{name}.bin"
+            with open(path, 'r+b' if path.exists() else 'wb') as f:
+                # 丢弃上次中断的追加
+                f.truncate(sizes[name])
+                f.seek(sizes[name])
+                f.write(array.tobytes())
+            sizes[name] += array.nbytes
+        
+        # 读取方先读 meta.json 再读 vocab.json，词表总是不少于已提交的行用到的词
+        self._write_atomic('vocab.json', dumps_json(self.vocab))
+        self._write_atomic('meta.json', dumps_json({
+            'count': len(self) + len(arrays['published']),
+            'sizes': sizes,
+            'categories': self._meta['categories'],
+            'vocab_size': len(self.vocab),
+        }))
+    
+    def _load(self):
+        """读取 meta.json 和词表，映射各列文件中已提交的部分"""
+        meta_path = self.path / 'meta.json'
+        if meta_path.exists():
+            self._meta_mtime = meta_path.stat().st_mtime_ns
+            with open(meta_path, 'rb') as f:
+                self._meta = loads_json(f.read())
+            with open(self.path / 'vocab.json', 'rb') as f:
+                self.vocab = loads_json(f.read())[:self._meta['vocab_size']]
+        else:
+            self._meta_mtime = None
+            self._meta = {'count': 0, 'sizes': {name: 0 for name in _COLUMNS}, 'categories': [], 'vocab_size': 0}
+            self.vocab = []
+        
+        self._columns = {}
+        for name, dtype in _COLUMNS.items():
+            length = self._meta['sizes'][name] // np.dtype(dtype).itemsize
+            if length:
+                self._columns[name] = np.memmap(self.path / f"{name}.bin", dtype=dtype, mode='r', shape=(length,))
+            else:
+                self._columns[name] = np.zeros(1 if name.endswith(('_indptr', '_offsets')) else 0, dtype=dtype)
+        
+        self._term_ids = {term: i for i, term in enumerate(self.vocab)}
+        if self._meta['count'] < self._ids_count:
+            # 论文库被重建
+            self._ids = set()
+            self._ids_count = 0
+        self._ids.update(self._texts('ids', start=self._ids_count))
+        self._ids_count = self._meta['count']
+    
+    def _last(self, name: str) -> int:
+        """获取偏移量列的最后一项"""
+        return int(self._columns[name][-1])
+    
+    def _text(self, name: str, row: int) -> str:
+        """从变长文本列中读取一行"""
+        offsets = self._columns[_TEXT_COLUMNS[name]]
+        return bytes(self._columns[name][offsets[row]:offsets[row + 1]]).decode('utf-8')
+    
+    def _texts(self, name: str, start: int = 0) -> List[str]:
+        """读取变长文本列从 start 开始的全部行"""
+        offsets = self._columns[_TEXT_COLUMNS[name]][start:].tolist()
+        data = self._columns[name][offsets[0]:offsets[-1]].tobytes()
+        return [data[offsets[i] - offsets[0]:offsets[i + 1] - offsets[0]].decode('utf-8')
+                for i in range(len(offsets) - 1)]
+    
+    def _category_mask(self, category: str) -> np.ndarray:
+        """计算包含某个类别的行"""
+        mask = np.zeros(len(self), dtype=bool)
+        if category in self.categories:
+            entries = np.flatnonzero(self._columns['category_indices'] == self.categories.index(category))
+            mask[np.searchsorted(self._columns['category_indptr'], entries, side='right') - 1] = True
+        return mask
+    
+    def _entry_mask(self, rows: np.ndarray) -> np.ndarray:
+        """把行号转换为词频矩阵元素的掩码"""
+        selected = np.zeros(len(self), dtype=bool)
+        selected[rows] = True
+        return np.repeat(selected, np.diff(self._columns['term_indptr']))
+    
+    def _write_atomic(self, name: str, content: bytes):
+        """原子替换论文库目录中的文件（先写临时文件再重命名）"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, self.path / name)
+
+
+# 进程内共享的论文库（按目录）
+_shared_corpora: Dict[str, PaperCorpus] = {}
+_shared_lock = threading.Lock()
+
+
+def get_corpus(config: Dict[str, Any]) -> Optional[PaperCorpus]:
+    """获取（或创建）进程内共享的历史论文库
+    
+    Args:
+        config: 完整配置字典，读取 storage.corpus
+    
+    Returns:
+        历史论文库，未启用时返回 None
+    """
+    corpus_config = config.get('storage', {}).get('corpus', {})
+    if not corpus_config.get('enabled', False):
+        return None
+    
+    path = corpus_config.get('path', 'data/corpus')
+    with _shared_lock:
+        if path not in _shared_corpora:
+            _shared_corpora[path] = PaperCorpus(path)
+        return _shared_corpora[path]
+
+
+def main():
+    """命令行入口：把已保存的按日期论文（包括维护任务归档的）导入历史论文库"""
+    from src.utils import load_config, load_env, setup_logging
+    from src.storage import StorageFactory
+    
+    parser = argparse.ArgumentParser(description="把已保存的历史论文导入列式历史论文库")
+    parser.add_argument('--start', required=True, help="起始日期 YYYY-MM-DD")
+    parser.add_argument('--end', default=None, help="结束日期 YYYY-MM-DD（默认今天）")
+    args = parser.parse_args()
+    
+    load_env()
+    config = load_config()
+    setup_logging(config)
+    
+    corpus_config = config.get('storage', {}).get('corpus', {})
+    corpus = PaperCorpus(corpus_config.get('path', 'data/corpus'))
+    storage = StorageFactory.create_storage(config)
+    
+    day = datetime.strptime(args.start, '%Y-%m-%d')
+    end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.now()
+    while day <= end:
+        date_str = get_date_string(day)
+        papers = storage.load_daily('papers', date_str)
+        if papers:
+            corpus.add_papers(papers, added=date_str)
+        day += timedelta(days=1)
+
+
+if __name__ == "__main__":
+    main()
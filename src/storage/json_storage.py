@@ -0,0 +1,131 @@
+"""
+JSON 文件存储
+
+每次保存写入按日期命名的 JSON 文件，并覆盖一份 latest.json 供 Web 服务读取（storage.type: json）
+"""
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from src.utils import save_json, load_json, dumps_json, get_date_string, get_data_path
+from .base_storage import BaseStorage
+from .maintenance import load_archived
+
+
+class JSONStorage(BaseStorage):
+    """JSON 文件存储"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """初始化
+        
+        Args:
+            config: 完整配置字典
+        """
+        super().__init__(config)
+        self.papers_path = get_data_path(config, 'papers')
+        self.summaries_path = get_data_path(config, 'summaries')
+        self.analysis_path = 'data/analysis'
+        # 按日期命名的文件是否缩进（给人阅读）；latest.json 始终为紧凑格式（供程序和 Web 服务读取）
+        self.pretty = self.storage_config.get('pretty_json', False)
+        self.logger = logging.getLogger('daily_arxiv.storage')
+    
+    def save_papers(self, papers: List[Dict[str, Any]]):
+        """保存论文到 papers_<日期>.json 和 latest.json
+        
+        Args:
+            papers: 论文列表
+        """
+        date_str = get_date_string()
+        filepath = f"{self.papers_path}/papers_{date_str}.json"
+        save_json(papers, filepath, pretty=self.pretty)
+        self.logger.info(f"💾 论文数据已保存到: {filepath}")
+        
+        # 同时保存一份到 latest.json，方便 Web 服务读取
+        latest_filepath = f"{self.papers_path}/latest.json"
+        save_json({
+            'date': date_str,
+            'count': len(papers),
+            'papers': papers
+        }, latest_filepath)
+        self.logger.info(f"💾 最新数据已保存到: {latest_filepath}")
+    
+    def load_latest_papers(self) -> Optional[Dict[str, Any]]:
+        """读取论文目录下的 latest.json"""
+        return load_json(f"{self.papers_path}/latest.json")
+    
+    def save_summaries(self, papers: List[Dict[str, Any]], llm_provider: str = None, llm_model: str = None):
+        """保存总结到 summaries_<日期>.json 和 latest.json
+        
+        Args:
+            papers: 包含总结的论文列表
+            llm_provider: LLM 提供商名称
+            llm_model: LLM 模型名称
+        """
+        date_str = get_date_string()
+        filepath = f"{self.summaries_path}/summaries_{date_str}.json"
+        save_json(papers, filepath, pretty=self.pretty)
+        self.logger.info(f"💾 总结数据已保存到: {filepath}")
+        
+        latest_filepath = f"{self.summaries_path}/latest.json"
+        save_json({
+            'date': date_str,
+            'count': len(papers),
+            'papers': papers,
+            'llm_provider': llm_provider,
+            'llm_model': llm_model,
+        }, latest_filepath)
+        self.logger.info(f"💾 最新总结已保存到: {latest_filepath}")
+    
+    def load_latest_summaries(self) -> Optional[Dict[str, Any]]:
+        """读取总结目录下的 latest.json"""
+        return load_json(f"{self.summaries_path}/latest.json")
+    
+    def save_analysis(self, analysis: Dict[str, Any]):
+        """保存分析结果到 analysis_<日期>.json 和 latest.json
+        
+        Args:
+            analysis: 分析结果
+        """
+        json_path = f"{self.analysis_path}/analysis_{get_date_string()}.json"
+        save_json(analysis, json_path, pretty=self.pretty)
+        self.logger.info(f"💾 分析结果已保存: {json_path}")
+        
+        # 保存最新分析（供 Web 服务使用）
+        latest_path = f"{self.analysis_path}/latest.json"
+        save_json(analysis, latest_path)
+        self.logger.info(f"💾 最新分析已保存: {latest_path}")
+    
+    def load_latest_analysis(self) -> Optional[Dict[str, Any]]:
+        """读取分析目录下的 latest.json"""
+        return load_json(f"{self.analysis_path}/latest.json")
+    
+    def load_daily(self, kind: str, date_str: str) -> Optional[Any]:
+        """读取按日期命名的文件，已被维护任务归档时从按月归档中读取"""
+        directory = {'papers': self.papers_path, 'summaries': self.summaries_path, 'analysis': self.analysis_path}[kind]
+        data = load_json(f"{directory}/{kind}_{date_str}.json")
+        if data is None:
+            data = load_archived(Path(directory), kind, date_str)
+        return data
+    
+    def record_run(self, started_at: datetime, finished_at: datetime, success: bool,
+                   stats: Dict[str, Any] = None, error: str = None):
+        """把运行记录追加到 runs.jsonl
+        
+        Args:
+            started_at: 开始时间
+            finished_at: 结束时间
+            success: 是否成功
+            stats: 统计信息
+            error: 错误信息
+        """
+        path = Path(self.papers_path) / 'runs.jsonl'
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'ab') as f:
+            f.write(dumps_json({
+                'started_at': started_at.isoformat(),
+                'finished_at': finished_at.isoformat(),
+                'status': 'success' if success else 'failed',
+                'stats': stats or {},
+                'error': error,
+            }) + b'\n')
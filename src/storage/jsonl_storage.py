@@ -0,0 +1,302 @@
+"""
+追加写入的 JSONL 存储
+
+论文和总结按保存日期分区追加到 JSONL 文件（每行一条记录），每个分区配有一个按 arXiv ID 的偏移量索引
+（storage.type: jsonl）：
+    
+    data/papers/papers-2025-06-01.jsonl          # 数据，每行一篇论文
+    data/papers/papers-2025-06-01.index.jsonl    # 索引，每行 {id, base_id, batch, offset, length}
+    data/papers/papers.latest.json               # 最新一批的指针（临时文件 + 重命名原子替换）
+
+每次保存只追加新记录，写入量与新记录数成正比；指针替换是一批记录的提交点，写入中断时读取方仍然看到上一批。
+多个进程追加同一分区时由分区锁文件（papers-2025-06-01.lock）互斥，数据偏移量和索引行不会交错。
+查找单篇论文只需要一次 seek 和一行 JSON 解析。趋势分析结果和运行记录与 JSON 存储相同。
+"""
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from src.utils import get_date_string, dumps_json, loads_json, file_lock, JSON_DECODE_ERRORS
+from .json_storage import JSONStorage
+
+
+class JSONLStorage(JSONStorage):
+    """按日期分区、追加写入的 JSONL 存储"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """初始化
+        
+        Args:
+            config: 完整配置字典，读取 storage.json_path、storage.retention_days
+        """
+        super().__init__(config)
+        self.retention_days = self.storage_config.get('retention_days', 0)
+        self.dirs = {'papers': Path(self.papers_path), 'summaries': Path(self.summaries_path)}
+        
+        # 记录类型 -> 不带版本号的 ID -> 索引记录（最后写入的版本）
+        self._index: Dict[str, Dict[str, Dict[str, Any]]] = {kind: {} for kind in self.dirs}
+        # 索引文件 -> 已读取到的位置（其他进程追加的索引行在下次查询时增量读取）
+        self._index_positions: Dict[str, Dict[str, int]] = {kind: {} for kind in self.dirs}
+        
+        for directory in self.dirs.values():
+            directory.mkdir(parents=True, exist_ok=True)
+    
+    def save_papers(self, papers: List[Dict[str, Any]]):
+        """追加一批论文，并按 retention_days 删除过期分区
+        
+        Args:
+            papers: 论文列表
+        """
+        path = self._append('papers', papers)
+        self.logger.info(f"💾 {len(papers)} 篇论文已追加到: {path}")
+        self._purge()
+    
+    def load_latest_papers(self) -> Optional[Dict[str, Any]]:
+        """读取最新一批论文"""
+        return self._load_latest('papers')
+    
+    def save_summaries(self, papers: List[Dict[str, Any]], llm_provider: str = None, llm_model: str = None):
+        """追加一批总结
+        
+        Args:
+            papers: 包含总结的论文列表
+            llm_provider: LLM 提供商名称
+            llm_model: LLM 模型名称
+        """
+        path = self._append('summaries', papers, llm_provider=llm_provider, llm_model=llm_model)
+        self.logger.info(f"💾 {len(papers)} 篇总结已追加到: {path}")
+    
+    def load_latest_summaries(self) -> Optional[Dict[str, Any]]:
+        """读取最新一批总结"""
+        return self._load_latest('summaries')
+    
+    def get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """按 arXiv ID（带或不带版本号）查找论文并附上总结（每条记录一次 seek）"""
+        paper = self._read_record('papers', paper_id)
+        if paper is None:
+            return None
+        
+        summarized = self._read_record('summaries', paper_id)
+        if summarized is not None and summarized.get('summary'):
+            paper['summary'] = summarized['summary']
+        return paper
+    
+    def latest_date(self) -> Optional[str]:
+        """获取最新论文的保存日期（只读取指针）"""
+        pointer = self._load_pointer('papers')
+        return pointer['date'] if pointer else None
+    
+    def load_daily(self, kind: str, date_str: str) -> Optional[Any]:
+        """读取某一天分区中最后一批论文或总结（分析结果与 JSON 存储相同）"""
+        if kind not in self.dirs:
+            return super().load_daily(kind, date_str)
+        
+        data_path = self.dirs[kind] / f"{kind}-{date_str}.jsonl"
+        entries = self._read_index(self._index_path(data_path))
+        if not entries:
+            return None
+        
+        batch = entries[-1]['batch']
+        return self._read_entries(data_path, [entry for entry in entries if entry['batch'] == batch])
+    
+    def _append(self, kind: str, records: List[Dict[str, Any]], **extra) -> Path:
+        """持有分区锁，把一批记录追加到当天的分区，再原子替换最新批次指针
+        
+        Args:
+            kind: 记录类型 papers / summaries
+            records: 记录列表
+            **extra: 写入指针的附加信息（如 llm_provider）
+        
+        Returns:
+            数据文件路径
+        """
+        date_str = get_date_string()
+        data_path = self.dirs[kind] / f"{kind}-{date_str}.jsonl"
+        lines = [dumps_json(record) + b'\n' for record in records]
+        
+        # 偏移量、数据、索引和指针在同一把锁内写入，其他进程的批次不会穿插进来
+        with file_lock(data_path.with_suffix('.lock')):
+            batch = datetime.now().isoformat()
+            self._write_batch(data_path, batch, records, lines)
+            
+            # 替换指针，提交这一批
+            self._write_pointer(kind, {
+                'date': date_str,
+                'batch': batch,
+                'file': data_path.name,
+                'count': len(records),
+                **extra,
+            })
+        return data_path
+    
+    def _write_batch(self, data_path: Path, batch: str, records: List[Dict[str, Any]], lines: List[bytes]):
+        """追加一批记录的数据行和索引行（调用方持有分区锁）"""
+        # 先写数据，再写索引：索引中的记录一定完整
+        with open(data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(b''.join(lines))
+        
+        index_lines = []
+        for record, line in zip(records, lines):
+            index_lines.append(dumps_json({
+                'id': record['id'],
+                'base_id': self._base_id(record['id']),
+                'batch': batch,
+                'offset': offset,
+                'length': len(line),
+            }) + b'\n')
+            offset += len(line)
+        index_path = self._index_path(data_path)
+        with open(index_path, 'ab+') as f:
+            # 上次写入中断留下的不完整行单独成行，不影响本批索引
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+            f.write(b''.join(index_lines))
+        
+    def _load_latest(self, kind: str) -> Optional[Dict[str, Any]]:
+        """按指针读取最新一批记录"""
+        pointer = self._load_pointer(kind)
+        if pointer is None:
+            return None
+        
+        data_path = self.dirs[kind] / pointer['file']
+        entries = [entry for entry in self._read_index(self._index_path(data_path))
+                   if entry['batch'] == pointer['batch']]
+        records = self._read_entries(data_path, entries)
+        
+        data = {key: value for key, value in pointer.items() if key not in ('batch', 'file', 'count')}
+        data['count'] = len(records)
+        data['papers'] = records
+        return data
+    
+    @staticmethod
+    def _read_entries(data_path: Path, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """按索引记录逐条 seek 读取数据（同一批记录在数据文件中不一定连续）
+        
+        Args:
+            data_path: 数据文件路径
+            entries: 索引记录列表
+        
+        Returns:
+            记录列表
+        """
+        records = []
+        if not entries:
+            return records
+        with open(data_path, 'rb') as f:
+            for entry in entries:
+                f.seek(entry['offset'])
+                records.append(loads_json(f.read(entry['length'])))
+        return records
+    
+    def _read_record(self, kind: str, paper_id: str) -> Optional[Dict[str, Any]]:
+        """按 ID 读取一条记录（最新版本）"""
+        self._refresh_index(kind)
+        entry = self._index[kind].get(self._base_id(paper_id))
+        if entry is None:
+            return None
+        
+        try:
+            with open(self.dirs[kind] / entry['file'], 'rb') as f:
+                f.seek(entry['offset'])
+                return loads_json(f.read(entry['length']))
+        except FileNotFoundError:
+            # 分区已被清理
+            return None
+    
+    def _refresh_index(self, kind: str):
+        """增量读取各分区索引中新追加的行"""
+        paths = sorted(self.dirs[kind].glob(f"{kind}-*.index.jsonl"))
+        positions = self._index_positions[kind]
+        
+        # 有分区被删除时重新加载整个索引
+        if set(positions) - {path.name for path in paths}:
+            self._index[kind].clear()
+            positions.clear()
+        
+        for path in paths:
+            position = positions.get(path.name, 0)
+            if path.stat().st_size <= position:
+                continue
+            file_name = path.name[:-len('.index.jsonl')] + '.jsonl'
+            for entry in self._read_index(path, position, positions):
+                entry['file'] = file_name
+                self._index[kind][entry['base_id']] = entry
+    
+    def _read_index(self, path: Path, position: int = 0, positions: Dict[str, int] = None) -> List[Dict[str, Any]]:
+        """读取索引文件中 position 之后的完整行（忽略写入中断留下的不完整行）
+        
+        Args:
+            path: 索引文件路径
+            position: 起始位置
+            positions: 传入时记录读取到的位置
+        
+        Returns:
+            索引记录列表
+        """
+        if not path.exists():
+            return []
+        
+        with open(path, 'rb') as f:
+            f.seek(position)
+            content = f.read()
+        
+        # 只处理以换行结尾的完整行，不完整的行留到下次读取
+        complete = content[:content.rfind(b'\n') + 1]
+        if positions is not None:
+            positions[path.name] = position + len(complete)
+        
+        entries = []
+        for line in complete.splitlines():
+            try:
+                entries.append(loads_json(line))
+            except JSON_DECODE_ERRORS:
+                self.logger.warning(f"忽略损坏的索引行: {path}")
+        return entries
+    
+    def _load_pointer(self, kind: str) -> Optional[Dict[str, Any]]:
+        """读取最新批次指针"""
+        path = self.dirs[kind] / f"{kind}.latest.json"
+        if not path.exists():
+            return None
+        with open(path, 'rb') as f:
+            return loads_json(f.read())
+    
+    def _write_pointer(self, kind: str, pointer: Dict[str, Any]):
+        """原子替换最新批次指针（先写临时文件再重命名）"""
+        path = self.dirs[kind] / f"{kind}.latest.json"
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(dumps_json(pointer))
+        os.replace(tmp_path, path)
+    
+    def _purge(self):
+        """删除超过 retention_days 的分区（最新批次所在的分区保留）"""
+        if not self.retention_days:
+            return
+        
+        cutoff = get_date_string(datetime.now() - timedelta(days=self.retention_days))
+        for kind, directory in self.dirs.items():
+            pointer = self._load_pointer(kind) or {}
+            for data_path in directory.glob(f"{kind}-*.jsonl"):
+                match = re.match(rf'^{kind}-(\d{{4}}-\d{{2}}-\d{{2}})\.jsonl$', data_path.name)
+                if match and match.group(1) < cutoff and data_path.name != pointer.get('file'):
+                    self._index_path(data_path).unlink(missing_ok=True)
+                    data_path.with_suffix('.lock').unlink(missing_ok=True)
+                    data_path.unlink()
+                    self.logger.info(f"🗑️  已清理过期分区: {data_path.name}")
+    
+    @staticmethod
+    def _index_path(data_path: Path) -> Path:
+        """获取数据文件对应的索引文件路径"""
+        return data_path.with_name(data_path.name[:-len('.jsonl')] + '.index.jsonl')
+    
+    @staticmethod
+    def _base_id(paper_id: str) -> str:
+        """去除 arXiv ID 的版本号"""
+        return re.sub(r'v\d+$', '', paper_id)
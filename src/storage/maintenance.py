@@ -0,0 +1,251 @@
+"""
+数据目录维护
+
+按日期命名的文件每天新增一份，长期运行后目录扫描和磁盘占用会持续增长。维护任务把数据分为三层：
+    
+    最近 compact_after_days 天    按日期命名的 JSON 文件原样保留
+    更早、retention_days 天以内   压缩归档到按月的 gzip 文件（<目录>/archive/papers_2025-06.json.gz），
+                                  load_daily / load_archived 仍可按日期读取
+    超过 retention_days 天        删除（按日期命名的文件、报告、词云图片和整月都已过期的归档）
+
+超过 image_after_days 天的词云图片缩小到 image_max_width 宽并转为调色板 PNG。
+每次运行每日任务后自动执行（storage.maintenance.enabled），也可以单独运行：
+    
+    python -m src.storage.maintenance [--dry-run]
+"""
+import argparse
+import gzip
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from src.utils import get_date_string, get_data_path, dumps_json, loads_json
+
+
+# 按日期命名的文件: <前缀>_YYYY-MM-DD.<扩展名>
+DATED_FILE_PATTERN = re.compile(r'^(papers|summaries|analysis|report|wordcloud)_(\d{4}-\d{2}-\d{2})\.(json|md|png)$')
+# 按月归档文件: <前缀>_YYYY-MM.json.gz
+ARCHIVE_FILE_PATTERN = re.compile(r'^(papers|summaries|analysis)_(\d{4}-\d{2})\.json\.gz$')
+
+
+def archive_path(directory: Path, kind: str, month: str) -> Path:
+    """获取按月归档文件的路径
+    
+    Args:
+        directory: 数据目录
+        kind: 记录类型 papers / summaries / analysis
+        month: 月份 YYYY-MM
+    
+    Returns:
+        归档文件路径
+    """
+    return Path(directory) / 'archive' / f"{kind}_{month}.json.gz"
+
+
+def load_archive(path: Path) -> Dict[str, Any]:
+    """读取整个月的归档
+    
+    Args:
+        path: 归档文件路径
+    
+    Returns:
+        日期 -> 当天文件内容，文件不存在时返回空字典
+    """
+    if not path.exists():
+        return {}
+    with gzip.open(path, 'rb') as f:
+        return loads_json(f.read())
+
+
+def load_archived(directory: Path, kind: str, date_str: str) -> Optional[Any]:
+    """从按月归档中读取某一天的文件内容
+    
+    Args:
+        directory: 数据目录
+        kind: 记录类型 papers / summaries / analysis
+        date_str: 日期 YYYY-MM-DD
+    
+    Returns:
+        当天文件的内容，没有归档时返回 None
+    """
+    return load_archive(archive_path(directory, kind, date_str[:7])).get(date_str)
+
+
+class DataMaintenance:
+    """数据目录的压缩归档、图片重压缩和过期清理"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """初始化
+        
+        Args:
+            config: 完整配置字典，读取 storage.retention_days 和 storage.maintenance
+        """
+        storage_config = config.get('storage', {})
+        maintenance_config = storage_config.get('maintenance', {})
+        
+        self.retention_days = storage_config.get('retention_days', 0)
+        self.compact_after_days = maintenance_config.get('compact_after_days', 7)
+        self.image_after_days = maintenance_config.get('image_after_days', 7)
+        self.image_max_width = maintenance_config.get('image_max_width', 1200)
+        self.dirs = {
+            'papers': Path(get_data_path(config, 'papers')),
+            'summaries': Path(get_data_path(config, 'summaries')),
+            'analysis': Path('data/analysis'),
+        }
+        self.logger = logging.getLogger('daily_arxiv.storage')
+    
+    def run(self, now: datetime = None, dry_run: bool = False) -> Dict[str, int]:
+        """执行一次维护：先删除过期文件，再归档和重压缩剩余的旧文件
+        
+        Args:
+            now: 当前时间（默认 datetime.now()）
+            dry_run: 只统计不修改文件
+        
+        Returns:
+            统计信息 {'archived', 'images', 'deleted', 'bytes_freed'}
+        """
+        now = now or datetime.now()
+        stats = {'archived': 0, 'images': 0, 'deleted': 0, 'bytes_freed': 0}
+        
+        for directory in self.dirs.values():
+            if directory.is_dir():
+                self._purge(directory, now, stats, dry_run)
+                self._compact(directory, now, stats, dry_run)
+                self._recompress_images(directory, now, stats, dry_run)
+        
+        self.logger.info(
+            f"🧹 数据维护完成{'（试运行）' if dry_run else ''}: 归档 {stats['archived']} 个文件，"
+            f"重压缩 {stats['images']} 张图片，删除 {stats['deleted']} 个文件，"
+            f"释放 {stats['bytes_freed'] / 1024 / 1024:.1f} MB"
+        )
+        return stats
+    
+    def _purge(self, directory: Path, now: datetime, stats: Dict[str, int], dry_run: bool):
+        """删除超过 retention_days 的按日期命名的文件和整月都已过期的归档"""
+        if not self.retention_days:
+            return
+        
+        cutoff = get_date_string(now - timedelta(days=self.retention_days))
+        expired = []
+        for path in directory.iterdir():
+            match = DATED_FILE_PATTERN.match(path.name)
+            if match and match.group(2) < cutoff:
+                expired.append(path)
+        for path in (directory / 'archive').glob('*.json.gz'):
+            match = ARCHIVE_FILE_PATTERN.match(path.name)
+            # 月份中最晚的日期（按字符串比较，-31 不小于该月任何一天）早于截止日期时整月过期
+            if match and f"{match.group(2)}-31" < cutoff:
+                expired.append(path)
+        
+        for path in expired:
+            stats['deleted'] += 1
+            stats['bytes_freed'] += path.stat().st_size
+            if not dry_run:
+                path.unlink()
+                self.logger.info(f"🗑️  已删除过期文件: {path}")
+    
+    def _compact(self, directory: Path, now: datetime, stats: Dict[str, int], dry_run: bool):
+        """把超过 compact_after_days 的按日期命名的 JSON 文件合并到按月的 gzip 归档"""
+        cutoff = get_date_string(now - timedelta(days=self.compact_after_days))
+        
+        # (记录类型, 月份) -> 日期 -> 文件路径
+        groups: Dict[tuple, Dict[str, Path]] = {}
+        for path in directory.iterdir():
+            match = DATED_FILE_PATTERN.match(path.name)
+            if match and match.group(3) == 'json' and match.group(2) < cutoff:
+                kind, date_str = match.group(1), match.group(2)
+                groups.setdefault((kind, date_str[:7]), {})[date_str] = path
+        
+        for (kind, month), paths in sorted(groups.items()):
+            stats['archived'] += len(paths)
+            stats['bytes_freed'] += sum(path.stat().st_size for path in paths.values())
+            if dry_run:
+                continue
+            
+            target = archive_path(directory, kind, month)
+            archive = load_archive(target)
+            stats['bytes_freed'] += target.stat().st_size if target.exists() else 0
+            for date_str, path in sorted(paths.items()):
+                with open(path, 'rb') as f:
+                    archive[date_str] = loads_json(f.read())
+            
+            # 先原子替换归档，再删除原文件：中断时同一天的数据最多同时存在于两处
+            self._write_archive(target, archive)
+            stats['bytes_freed'] -= target.stat().st_size
+            for path in paths.values():
+                path.unlink()
+            self.logger.info(f"📦 已归档 {len(paths)} 个文件到: {target}")
+    
+    def _recompress_images(self, directory: Path, now: datetime, stats: Dict[str, int], dry_run: bool):
+        """把超过 image_after_days 的词云图片缩小并转为调色板 PNG（已处理过的图片跳过）"""
+        cutoff = get_date_string(now - timedelta(days=self.image_after_days))
+        paths = []
+        for path in sorted(directory.glob('wordcloud_*.png')):
+            match = DATED_FILE_PATTERN.match(path.name)
+            if match and match.group(2) < cutoff:
+                paths.append(path)
+        if not paths:
+            return
+        
+        try:
+            from PIL import Image
+        except ImportError:
+            self.logger.warning("未安装 Pillow，跳过图片重压缩。请运行: pip install pillow")
+            return
+        
+        for path in paths:
+            with Image.open(path) as image:
+                # 调色板模式且宽度不超过上限：已经处理过
+                if image.mode == 'P' and image.width <= self.image_max_width:
+                    continue
+                if dry_run:
+                    stats['images'] += 1
+                    continue
+                
+                image = image.convert('RGB')
+                if image.width > self.image_max_width:
+                    height = round(image.height * self.image_max_width / image.width)
+                    image = image.resize((self.image_max_width, height), Image.LANCZOS)
+                image = image.quantize(colors=256)
+            
+            size = path.stat().st_size
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                image.save(f, format='PNG', optimize=True)
+            os.replace(tmp_path, path)
+            
+            stats['images'] += 1
+            stats['bytes_freed'] += size - path.stat().st_size
+            self.logger.info(f"🖼️  已重压缩图片: {path} ({size // 1024} KB -> {path.stat().st_size // 1024} KB)")
+    
+    @staticmethod
+    def _write_archive(path: Path, archive: Dict[str, Any]):
+        """原子写入按月归档（先写临时文件再重命名）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(gzip.compress(dumps_json(dict(sorted(archive.items())))))
+        os.replace(tmp_path, path)
+
+
+def main():
+    """命令行入口"""
+    from src.utils import load_config, load_env, setup_logging
+    
+    parser = argparse.ArgumentParser(description="压缩归档、重压缩图片并清理过期数据")
+    parser.add_argument('--dry-run', action='store_true', help="只统计不修改文件")
+    args = parser.parse_args()
+    
+    load_env()
+    config = load_config()
+    setup_logging(config)
+    
+    DataMaintenance(config).run(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
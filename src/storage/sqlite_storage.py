@@ -0,0 +1,348 @@
+"""
+SQLite 存储
+
+论文、总结、分析结果和运行记录保存在同一个 SQLite 数据库中（storage.type: sqlite）：
+    - papers: 每篇论文一行（不带版本号的 ID 为主键，新版本覆盖旧版本），带版本号的 ID、发布日期有索引
+    - paper_categories: 论文与类别的对应关系，按类别查询走索引
+    - paper_batches / summary_batches: 每次保存的批次成员 (saved_at, position, base_id)，
+      论文再次出现在新批次中时不会从之前的批次中消失
+    - summaries / analyses / runs: 总结、趋势分析结果和每日任务的运行记录
+
+数据库使用 WAL 模式（Web 服务读取时不阻塞写入），每批论文在一个事务中批量 upsert；
+“最新论文”是最近一次保存的那一批，与 JSON 存储的 latest.json 含义相同。
+历史批次按批次成员读取，论文内容为该论文最后保存的版本。
+"""
+import logging
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils import dumps_json, loads_json
+from .base_storage import BaseStorage
+
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS papers ("
+    "base_id TEXT PRIMARY KEY, id TEXT, title TEXT, published TEXT, primary_category TEXT, "
+    "saved_at TEXT, position INTEGER, data TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_papers_id ON papers (id)",
+    "CREATE INDEX IF NOT EXISTS idx_papers_published ON papers (published)",
+    "CREATE INDEX IF NOT EXISTS idx_papers_saved_at ON papers (saved_at, position)",
+    "CREATE TABLE IF NOT EXISTS paper_categories ("
+    "category TEXT, base_id TEXT, PRIMARY KEY (category, base_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_paper_categories_base_id ON paper_categories (base_id)",
+    "CREATE TABLE IF NOT EXISTS summaries ("
+    "base_id TEXT PRIMARY KEY, id TEXT, saved_at TEXT, position INTEGER, "
+    "llm_provider TEXT, llm_model TEXT, data TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_summaries_saved_at ON summaries (saved_at, position)",
+    "CREATE TABLE IF NOT EXISTS paper_batches ("
+    "saved_at TEXT, position INTEGER, base_id TEXT, PRIMARY KEY (saved_at, position)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_paper_batches_base_id ON paper_batches (base_id)",
+    "CREATE TABLE IF NOT EXISTS summary_batches ("
+    "saved_at TEXT, position INTEGER, base_id TEXT, PRIMARY KEY (saved_at, position)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS idx_summary_batches_base_id ON summary_batches (base_id)",
+    "CREATE TABLE IF NOT EXISTS analyses (date TEXT PRIMARY KEY, created_at TEXT, data TEXT)",
+    "CREATE TABLE IF NOT EXISTS runs ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, started_at TEXT, finished_at TEXT, status TEXT, "
+    "papers_count INTEGER, summaries_count INTEGER, stats TEXT, error TEXT)",
+    # 旧版本数据库没有批次表：按各行最后保存的批次补齐
+    "INSERT INTO paper_batches SELECT saved_at, position, base_id FROM papers "
+    "WHERE NOT EXISTS (SELECT 1 FROM paper_batches)",
+    "INSERT INTO summary_batches SELECT saved_at, position, base_id FROM summaries "
+    "WHERE NOT EXISTS (SELECT 1 FROM summary_batches)",
+]
+
+# 记录类型对应的批次表
+_BATCH_TABLES = {'papers': 'paper_batches', 'summaries': 'summary_batches'}
+
+
+class SQLiteStorage(BaseStorage):
+    """SQLite 存储"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """初始化（创建表和索引，开启 WAL 模式）
+        
+        Args:
+            config: 完整配置字典，读取 storage.sqlite_path、storage.retention_days
+        """
+        super().__init__(config)
+        self.path = self.storage_config.get('sqlite_path', 'data/arxiv.db')
+        self.retention_days = self.storage_config.get('retention_days', 0)
+        self.logger = logging.getLogger('daily_arxiv.storage')
+        
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+    
+    def save_papers(self, papers: List[Dict[str, Any]]):
+        """批量 upsert 一批论文，并按 retention_days 清理过期数据
+        
+        Args:
+            papers: 论文列表
+        """
+        saved_at = datetime.now().isoformat()
+        rows = []
+        categories = []
+        for position, paper in enumerate(papers):
+            base_id = self._base_id(paper['id'])
+            rows.append((
+                base_id, paper['id'], paper.get('title'), paper.get('published'),
+                paper.get('primary_category'), saved_at, position, self._dumps(paper),
+            ))
+            categories.extend((category, base_id) for category in paper.get('categories') or [])
+        
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(base_id) DO UPDATE SET id = excluded.id, title = excluded.title, "
+                    "published = excluded.published, primary_category = excluded.primary_category, "
+                    "saved_at = excluded.saved_at, position = excluded.position, data = excluded.data",
+                    rows
+                )
+                conn.executemany("DELETE FROM paper_categories WHERE base_id = ?", [(row[0],) for row in rows])
+                conn.executemany("INSERT OR IGNORE INTO paper_categories VALUES (?, ?)", categories)
+                conn.executemany(
+                    "INSERT INTO paper_batches VALUES (?, ?, ?)",
+                    [(saved_at, row[6], row[0]) for row in rows]
+                )
+                self._purge(conn)
+        
+        self.logger.info(f"💾 {len(rows)} 篇论文已保存到数据库: {self.path}")
+    
+    def load_latest_papers(self) -> Optional[Dict[str, Any]]:
+        """读取最近一次保存的那一批论文"""
+        with closing(self._connect()) as conn:
+            saved_at = self._latest_batch(conn, 'papers')
+            if saved_at is None:
+                return None
+            papers = self._load_batch(conn, 'papers', saved_at)
+        return {'date': saved_at[:10], 'count': len(papers), 'papers': papers}
+    
+    def save_summaries(self, papers: List[Dict[str, Any]], llm_provider: str = None, llm_model: str = None):
+        """批量 upsert 一批总结
+        
+        Args:
+            papers: 包含总结的论文列表
+            llm_provider: LLM 提供商名称
+            llm_model: LLM 模型名称
+        """
+        saved_at = datetime.now().isoformat()
+        rows = [
+            (self._base_id(paper['id']), paper['id'], saved_at, position, llm_provider, llm_model, self._dumps(paper))
+            for position, paper in enumerate(papers)
+        ]
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany(
+                    "INSERT INTO summary_batches VALUES (?, ?, ?)",
+                    [(saved_at, row[3], row[0]) for row in rows]
+                )
+        
+        self.logger.info(f"💾 {len(rows)} 篇总结已保存到数据库: {self.path}")
+    
+    def load_latest_summaries(self) -> Optional[Dict[str, Any]]:
+        """读取最近一次保存的那一批总结"""
+        with closing(self._connect()) as conn:
+            saved_at = self._latest_batch(conn, 'summaries')
+            if saved_at is None:
+                return None
+            rows = conn.execute(
+                "SELECT data, llm_provider, llm_model FROM summary_batches AS batch "
+                "JOIN summaries USING (base_id) WHERE batch.saved_at = ? ORDER BY batch.position",
+                (saved_at,)
+            ).fetchall()
+        return {
+            'date': saved_at[:10],
+            'count': len(rows),
+            'papers': [loads_json(data) for data, _, _ in rows],
+            'llm_provider': rows[0][1],
+            'llm_model': rows[0][2],
+        }
+    
+    def save_analysis(self, analysis: Dict[str, Any]):
+        """保存当天的趋势分析结果（同一天重复分析时覆盖）
+        
+        Args:
+            analysis: 分析结果
+        """
+        now = datetime.now()
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)",
+                    (now.strftime('%Y-%m-%d'), now.isoformat(), self._dumps(analysis))
+                )
+        self.logger.info(f"💾 分析结果已保存到数据库: {self.path}")
+    
+    def load_latest_analysis(self) -> Optional[Dict[str, Any]]:
+        """读取最近一天的趋势分析结果"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data FROM analyses ORDER BY date DESC LIMIT 1").fetchone()
+        return loads_json(row[0]) if row else None
+    
+    def load_daily(self, kind: str, date_str: str) -> Optional[Any]:
+        """读取某一天最后一次保存的论文或总结（走批次表的 saved_at 索引），或当天的分析结果"""
+        with closing(self._connect()) as conn:
+            if kind == 'analysis':
+                row = conn.execute("SELECT data FROM analyses WHERE date = ?", (date_str,)).fetchone()
+                return loads_json(row[0]) if row else None
+            
+            # 当天的 saved_at 形如 YYYY-MM-DDTHH:MM:SS，落在 [日期, 日期 + 'U') 范围内
+            saved_at = conn.execute(
+                f"SELECT MAX(saved_at) FROM {_BATCH_TABLES[kind]} WHERE saved_at >= ? AND saved_at < ?",
+                (date_str, f"{date_str}U")
+            ).fetchone()[0]
+            if saved_at is None:
+                return None
+            return self._load_batch(conn, kind, saved_at)
+    
+    def record_run(self, started_at: datetime, finished_at: datetime, success: bool,
+                   stats: Dict[str, Any] = None, error: str = None):
+        """写入一条运行记录
+        
+        Args:
+            started_at: 开始时间
+            finished_at: 结束时间
+            success: 是否成功
+            stats: 统计信息
+            error: 错误信息
+        """
+        stats = stats or {}
+        with closing(self._connect()) as conn:
+            with conn:
+                conn.execute(
+                    "INSERT INTO runs (started_at, finished_at, status, papers_count, summaries_count, stats, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (started_at.isoformat(), finished_at.isoformat(), 'success' if success else 'failed',
+                     stats.get('papers_count', 0), stats.get('summaries_count', 0), self._dumps(stats), error)
+                )
+    
+    def latest_date(self) -> Optional[str]:
+        """获取最新论文的保存日期（走 saved_at 索引）"""
+        with closing(self._connect()) as conn:
+            saved_at = self._latest_batch(conn, 'papers')
+        return saved_at[:10] if saved_at else None
+    
+    def get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """按 arXiv ID（带或不带版本号）查找论文并附上总结（走主键 / ID 索引）"""
+        base_id = self._base_id(paper_id)
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data FROM papers WHERE base_id = ?", (base_id,)).fetchone()
+            if row is None:
+                return None
+            summary = conn.execute("SELECT data FROM summaries WHERE base_id = ?", (base_id,)).fetchone()
+        
+        paper = loads_json(row[0])
+        if summary is not None:
+            summarized = loads_json(summary[0])
+            if summarized.get('summary'):
+                paper['summary'] = summarized['summary']
+        return paper
+    
+    def query_papers(self, category: str = None, offset: int = 0,
+                     limit: int = None) -> Tuple[List[Dict[str, Any]], int]:
+        """分页查询最新论文（类别过滤走 paper_categories 索引）"""
+        with closing(self._connect()) as conn:
+            saved_at = self._latest_batch(conn, 'papers')
+            if saved_at is None:
+                return [], 0
+            
+            if category:
+                source = "paper_batches AS batch JOIN paper_categories USING (base_id)"
+                condition = "batch.saved_at = ? AND category = ?"
+                params = (saved_at, category)
+            else:
+                source = "paper_batches AS batch"
+                condition = "batch.saved_at = ?"
+                params = (saved_at,)
+            
+            total = conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {condition}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT data FROM {source} JOIN papers USING (base_id) WHERE {condition} "
+                f"ORDER BY batch.position LIMIT ? OFFSET ?",
+                params + (-1 if limit is None else limit, offset)
+            )
+            return [loads_json(data) for data, in rows], total
+    
+    def category_counts(self) -> Dict[str, int]:
+        """统计最新论文的类别分布（在数据库中聚合）"""
+        with closing(self._connect()) as conn:
+            saved_at = self._latest_batch(conn, 'papers')
+            return dict(conn.execute(
+                "SELECT category, COUNT(*) FROM paper_batches AS batch JOIN paper_categories USING (base_id) "
+                "WHERE batch.saved_at = ? GROUP BY category", (saved_at,)
+            ))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取最新数据的概况（只做计数查询，不加载论文内容）"""
+        with closing(self._connect()) as conn:
+            papers_at = self._latest_batch(conn, 'papers')
+            summaries_at = self._latest_batch(conn, 'summaries')
+            return {
+                'papers_count': conn.execute(
+                    "SELECT COUNT(*) FROM paper_batches WHERE saved_at = ?", (papers_at,)).fetchone()[0],
+                'summaries_count': conn.execute(
+                    "SELECT COUNT(*) FROM summary_batches WHERE saved_at = ?", (summaries_at,)).fetchone()[0],
+                'analysis_available': conn.execute("SELECT 1 FROM analyses LIMIT 1").fetchone() is not None,
+                'last_update': papers_at[:10] if papers_at else None,
+            }
+    
+    def _purge(self, conn: sqlite3.Connection):
+        """删除超过 retention_days 的批次、论文、总结、分析结果和运行记录（在调用方的事务中执行）
+        
+        papers / summaries 的 saved_at 是该论文最后一次保存的时间，早于截止时间说明之后的批次都不包含它
+        """
+        if not self.retention_days:
+            return
+        
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        cutoff_at = cutoff.isoformat()
+        conn.execute(
+            "DELETE FROM paper_categories WHERE base_id IN (SELECT base_id FROM papers WHERE saved_at < ?)",
+            (cutoff_at,)
+        )
+        deleted = conn.execute("DELETE FROM papers WHERE saved_at < ?", (cutoff_at,)).rowcount
+        conn.execute("DELETE FROM summaries WHERE saved_at < ?", (cutoff_at,))
+        conn.execute("DELETE FROM paper_batches WHERE saved_at < ?", (cutoff_at,))
+        conn.execute("DELETE FROM summary_batches WHERE saved_at < ?", (cutoff_at,))
+        conn.execute("DELETE FROM analyses WHERE date < ?", (cutoff.strftime('%Y-%m-%d'),))
+        conn.execute("DELETE FROM runs WHERE started_at < ?", (cutoff_at,))
+        if deleted:
+            self.logger.info(f"🗑️  已清理 {deleted} 篇超过 {self.retention_days} 天的论文")
+    
+    @staticmethod
+    def _latest_batch(conn: sqlite3.Connection, kind: str) -> Optional[str]:
+        """获取论文或总结最近一次保存的时间（走批次表的 saved_at 索引）"""
+        return conn.execute(f"SELECT MAX(saved_at) FROM {_BATCH_TABLES[kind]}").fetchone()[0]
+    
+    @staticmethod
+    def _load_batch(conn: sqlite3.Connection, kind: str, saved_at: str) -> List[Dict[str, Any]]:
+        """按批次表中的顺序读取一批论文或总结"""
+        return [loads_json(data) for data, in conn.execute(
+            f"SELECT data FROM {_BATCH_TABLES[kind]} AS batch JOIN {kind} USING (base_id) "
+            f"WHERE batch.saved_at = ? ORDER BY batch.position", (saved_at,)
+        )]
+    
+    @staticmethod
+    def _base_id(paper_id: str) -> str:
+        """去除 arXiv ID 的版本号"""
+        return re.sub(r'v\d+$', '', paper_id)
+    
+    @staticmethod
+    def _dumps(data: Any) -> str:
+        """序列化为 JSON（支持 Paper 等带 to_dict 方法的对象）"""
+        return dumps_json(data).decode('utf-8')
+    
+    def _connect(self) -> sqlite3.Connection:
+        """创建数据库连接"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
@@ -0,0 +1,47 @@
+"""
+存储工厂
+
+根据 storage.type 创建对应的存储后端
+"""
+import logging
+from typing import Dict, Any
+
+from .base_storage import BaseStorage
+from .json_storage import JSONStorage
+from .jsonl_storage import JSONLStorage
+from .sqlite_storage import SQLiteStorage
+
+
+class StorageFactory:
+    """存储工厂"""
+    
+    # 支持的存储类型映射
+    BACKENDS = {
+        'json': JSONStorage,
+        'jsonl': JSONLStorage,
+        'sqlite': SQLiteStorage,
+    }
+    
+    @classmethod
+    def create_storage(cls, config: Dict[str, Any]) -> BaseStorage:
+        """创建存储后端
+        
+        Args:
+            config: 完整配置字典
+        
+        Returns:
+            存储后端实例
+        
+        Raises:
+            ValueError: 如果存储类型不支持
+        """
+        storage_type = config.get('storage', {}).get('type', 'json').lower()
+        
+        if storage_type not in cls.BACKENDS:
+            raise ValueError(
+                f"不支持的存储类型: {storage_type}\n"
+                f"支持的存储类型: {', '.join(cls.BACKENDS.keys())}"
+            )
+        
+        logging.getLogger('daily_arxiv.storage').debug(f"使用 {storage_type} 存储")
+        return cls.BACKENDS[storage_type](config)
@@ -2,9 +2,17 @@
 LLM 客户端基类
 
 定义统一的接口供所有 LLM 提供商实现
+
+各提供商只需实现异步接口 agenerate（基于各自的异步 SDK），同步接口 generate / generate_batch
+是在客户端自己的后台事件循环上运行异步接口的薄包装。批量接口默认并发发送单条请求，
+支持服务端批量提交的提供商可重写 _agenerate_batch
 """
+import asyncio
+import logging
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Union
 
 
 class BaseLLMClient(ABC):
@@ -17,11 +25,111 @@ class BaseLLMClient(ABC):
             config: LLM 配置
         """
         self.config = config
+        # 子类通常换成各自提供商的日志记录器
+        self.logger = logging.getLogger('daily_arxiv.llm')
         self.model = config.get('model', '')
         self.temperature = config.get('temperature', 0.7)
         self.max_tokens = config.get('max_tokens', 1500)
+        # 批量总结时同时进行的请求数上限
+        self.max_concurrency = config.get('max_concurrency', 4)
+        # 每批的提示词数上限（流式总结每次合并的论文数、Batch API 每个任务的请求数）
+        self.batch_size = config.get('batch_size', 50)
+    
+        # 异步 SDK 的连接池绑定在创建它的事件循环上，每个事件循环各用一个
+        self._async_clients = weakref.WeakKeyDictionary()
+        # 同一事件循环上的所有批量调用共用一个信号量，同时进行的请求总数不超过 max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()
+        # 同步接口使用的后台事件循环（首次调用时启动）
+        self._loop = None
+        self._loop_lock = threading.Lock()
     
     @abstractmethod
+    def _create_async_client(self) -> Any:
+        """创建异步 SDK 客户端（在事件循环中调用）
+        
+        Returns:
+            异步 SDK 客户端
+        """
+        pass
+    
+    @property
+    def async_client(self) -> Any:
+        """当前事件循环对应的异步 SDK 客户端"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = self._create_async_client()
+        return client
+    
+    @abstractmethod
+    async def agenerate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
+        """异步生成文本
+        
+        Args:
+            prompt: 用户提示词
+            system_prompt: 系统提示词（可选）
+            max_tokens: 最大生成 tokens 数（可选，覆盖默认值）
+        
+        Returns:
+            生成的文本
+        """
+        pass
+    
+    @property
+    def request_semaphore(self) -> asyncio.Semaphore:
+        """当前事件循环对应的请求信号量"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(max(1, self.max_concurrency))
+        return semaphore
+    
+    async def agenerate_batch(self, prompts: List[str], system_prompt: str = None,
+                              return_exceptions: bool = False,
+                              on_done: Callable[[], None] = None) -> List[Union[str, Exception]]:
+        """异步批量生成文本
+        
+        Args:
+            prompts: 用户提示词列表
+            system_prompt: 系统提示词（可选）
+            return_exceptions: 单个提示词失败时对应位置放异常对象（默认放 "Error: ..." 文本）
+            on_done: 每完成一条调用一次（如更新进度条），在事件循环线程中执行
+        
+        Returns:
+            生成的文本列表（与 prompts 顺序一致）
+        """
+        results = await self._agenerate_batch(prompts, system_prompt, on_done)
+        if return_exceptions:
+            return results
+        return [f"Error: {str(result)}" if isinstance(result, Exception) else result for result in results]
+    
+    async def _agenerate_batch(self, prompts: List[str], system_prompt: str = None,
+                               on_done: Callable[[], None] = None) -> List[Union[str, Exception]]:
+        """批量生成的默认实现：并发发送单条请求，同时进行的请求不超过 max_concurrency
+        
+        Args:
+            prompts: 用户提示词列表
+            system_prompt: 系统提示词（可选）
+            on_done: 每完成一条调用一次
+        
+        Returns:
+            生成的文本列表，失败的位置为异常对象
+        """
+        semaphore = self.request_semaphore
+        
+        async def generate_one(prompt: str) -> Union[str, Exception]:
+            async with semaphore:
+                try:
+                    result = await self.agenerate(prompt, system_prompt)
+                except Exception as e:
+                    self.logger.error(f"批量生成失败: {str(e)}")
+                    result = e
+            if on_done is not None:
+                on_done()
+            return result
+        
+        return list(await asyncio.gather(*(generate_one(prompt) for prompt in prompts)))
+    
     def generate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
         """生成文本
         
@@ -33,20 +141,31 @@ class BaseLLMClient(ABC):
         Returns:
             生成的文本
         """
-        pass
+        return self._run(self.agenerate(prompt, system_prompt, max_tokens))
     
-    @abstractmethod
-    def generate_batch(self, prompts: List[str], system_prompt: str = None) -> List[str]:
+    def generate_batch(self, prompts: List[str], system_prompt: str = None,
+                       return_exceptions: bool = False,
+                       on_done: Callable[[], None] = None) -> List[Union[str, Exception]]:
         """批量生成文本
         
         Args:
             prompts: 用户提示词列表
             system_prompt: 系统提示词（可选）
+            return_exceptions: 单个提示词失败时对应位置放异常对象（默认放 "Error: ..." 文本）
+            on_done: 每完成一条调用一次（如更新进度条），在后台事件循环线程中执行
             
         Returns:
-            生成的文本列表
+            生成的文本列表（与 prompts 顺序一致）
         """
-        pass
+        return self._run(self.agenerate_batch(prompts, system_prompt, return_exceptions, on_done))
+    
+    def _run(self, coro) -> Any:
+        """在后台事件循环上运行协程并等待结果（可在多个线程中同时调用）"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='llm-event-loop', daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
     
     def get_provider_name(self) -> str:
         """获取提供商名称
@@ -3,8 +3,7 @@ Anthropic Claude 客户端实现
 """
 import os
 import logging
-from typing import List
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from .base_llm_client import BaseLLMClient
 
@@ -21,13 +20,17 @@ class ClaudeClient(BaseLLMClient):
         if not api_key:
             raise ValueError("Claude API Key 未设置！请在 .env 文件中设置 CLAUDE_API_KEY")
         
-        # 创建客户端
-        self.client = Anthropic(api_key=api_key)
+        # 异步客户端在使用它的事件循环中按需创建
+        self.api_key = api_key
         
         self.logger.info(f"Claude 客户端初始化成功，模型: {self.model}")
     
-    def generate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
-        """生成文本"""
+    def _create_async_client(self) -> AsyncAnthropic:
+        """创建异步客户端"""
+        return AsyncAnthropic(api_key=self.api_key)
+    
+    async def agenerate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
+        """异步生成文本"""
         try:
             # 使用传入的 max_tokens 或默认值
             tokens = max_tokens if max_tokens is not None else self.max_tokens
@@ -45,7 +48,7 @@ class ClaudeClient(BaseLLMClient):
             if system_prompt:
                 kwargs["system"] = system_prompt
             
-            response = self.client.messages.create(**kwargs)
+            response = await self.async_client.messages.create(**kwargs)
             
             # Claude 的响应结构
             return response.content[0].text.strip()
@@ -53,15 +56,3 @@ class ClaudeClient(BaseLLMClient):
         except Exception as e:
             self.logger.error(f"Claude 生成失败: {str(e)}")
             raise
-    
-    def generate_batch(self, prompts: List[str], system_prompt: str = None) -> List[str]:
-        """批量生成文本"""
-        results = []
-        for prompt in prompts:
-            try:
-                result = self.generate(prompt, system_prompt)
-                results.append(result)
-            except Exception as e:
-                self.logger.error(f"批量生成失败: {str(e)}")
-                results.append(f"Error: {str(e)}")
-        return results
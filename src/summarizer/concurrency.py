@@ -0,0 +1,47 @@
+"""
+有界并发执行
+
+LLM 调用几乎全部是网络等待：在线程池中同时进行至多 max_workers 个调用，结果仍按输入顺序返回
+"""
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterable, List
+
+
+def map_bounded(func: Callable[[int, Any], Any], items: Iterable[Any], max_workers: int,
+                on_done: Callable[[], None] = None) -> List[Any]:
+    """并发地对每一项调用 func(序号, 项)，同时进行的调用不超过 max_workers
+    
+    items 按需读取（可以是边爬取边产生的迭代器）：在途调用达到上限时先等待其中一个完成，再读取下一项。
+    func 抛出的异常会在收集结果时传播，需要隔离单项失败时由 func 自己捕获。
+    
+    Args:
+        func: 处理函数，参数为序号（从 0 开始）和项
+        items: 输入项
+        max_workers: 最大并发数（小于 1 时按 1 处理）
+        on_done: 每完成一项调用一次（如更新进度条），在调用方线程中执行
+    
+    Returns:
+        按输入顺序排列的结果列表
+    """
+    max_workers = max(1, max_workers)
+    results = {}
+    
+    def collect(futures):
+        for future in futures:
+            results[pending.pop(future)] = future.result()
+            if on_done is not None:
+                on_done()
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-worker') as executor:
+        pending = {}
+        for index, item in enumerate(items):
+            if len(pending) >= max_workers:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[executor.submit(func, index, item)] = index
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    
+    return [results[index] for index in range(len(results))]
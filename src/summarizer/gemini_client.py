@@ -3,7 +3,6 @@ Google Gemini 客户端实现
 """
 import os
 import logging
-from typing import List
 import google.generativeai as genai
 
 from .base_llm_client import BaseLLMClient
@@ -24,21 +23,23 @@ class GeminiClient(BaseLLMClient):
         # 配置 API
         genai.configure(api_key=api_key)
         
-        # 创建模型
-        generation_config = {
+        # 生成配置
+        self.generation_config = {
             "temperature": self.temperature,
             "max_output_tokens": self.max_tokens,
         }
         
-        self.model_instance = genai.GenerativeModel(
+        self.logger.info(f"Gemini 客户端初始化成功，模型: {self.model}")
+    
+    def _create_async_client(self) -> genai.GenerativeModel:
+        """创建模型实例（其异步 gRPC 客户端绑定在首次调用时的事件循环上）"""
+        return genai.GenerativeModel(
             model_name=self.model,
-            generation_config=generation_config
+            generation_config=self.generation_config
         )
-        
-        self.logger.info(f"Gemini 客户端初始化成功，模型: {self.model}")
     
-    def generate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
-        """生成文本"""
+    async def agenerate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
+        """异步生成文本"""
         try:
             # Gemini 将 system prompt 和 user prompt 组合
             full_prompt = prompt
@@ -47,17 +48,16 @@ class GeminiClient(BaseLLMClient):
             
             # 如果指定了 max_tokens，需要更新配置
             if max_tokens is not None and max_tokens != self.max_tokens:
-                import google.generativeai as genai
                 generation_config = genai.types.GenerationConfig(
                     temperature=self.temperature,
                     max_output_tokens=max_tokens
                 )
-                response = self.model_instance.generate_content(
+                response = await self.async_client.generate_content_async(
                     full_prompt,
                     generation_config=generation_config
                 )
             else:
-                response = self.model_instance.generate_content(full_prompt)
+                response = await self.async_client.generate_content_async(full_prompt)
             
             # 检查响应
             if not response.text:
@@ -69,15 +69,3 @@ class GeminiClient(BaseLLMClient):
         except Exception as e:
             self.logger.error(f"Gemini 生成失败: {str(e)}")
             raise
-    
-    def generate_batch(self, prompts: List[str], system_prompt: str = None) -> List[str]:
-        """批量生成文本"""
-        results = []
-        for prompt in prompts:
-            try:
-                result = self.generate(prompt, system_prompt)
-                results.append(result)
-            except Exception as e:
-                self.logger.error(f"批量生成失败: {str(e)}")
-                results.append(f"Error: {str(e)}")
-        return results
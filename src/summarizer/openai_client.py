@@ -2,9 +2,12 @@
 OpenAI 客户端实现
 """
 import os
+import json
+import time
+import asyncio
 import logging
-from typing import List
-from openai import OpenAI
+from typing import Callable, List, Union
+from openai import AsyncOpenAI
 
 from .base_llm_client import BaseLLMClient
 
@@ -24,27 +27,42 @@ class OpenAIClient(BaseLLMClient):
         # 获取 Base URL（可选，用于代理或自定义端点）
         base_url = config.get('base_url') or os.getenv('OPENAI_BASE_URL')
         
-        # 创建客户端
+        # 异步客户端在使用它的事件循环中按需创建
+        self.api_key = api_key
+        self.base_url = base_url
         if base_url:
-            self.client = OpenAI(api_key=api_key, base_url=base_url)
             self.logger.info(f"使用自定义 OpenAI 端点: {base_url}")
-        else:
-            self.client = OpenAI(api_key=api_key)
+        
+        # Batch API（可选）：批量请求作为一个服务端任务提交，价格减半，但需要等待任务完成
+        self.batch_api = config.get('batch_api', False)
+        self.batch_poll_interval = config.get('batch_poll_interval', 30)
+        self.batch_timeout = config.get('batch_timeout', 3600)
         
         self.logger.info(f"OpenAI 客户端初始化成功，模型: {self.model}")
     
-    def generate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
-        """生成文本"""
+    def _create_async_client(self) -> AsyncOpenAI:
+        """创建异步客户端"""
+        if self.base_url:
+            return AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        return AsyncOpenAI(api_key=self.api_key)
+    
+    def _messages(self, prompt: str, system_prompt: str = None) -> List[dict]:
+        """构造对话消息"""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    async def agenerate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
+        """异步生成文本"""
         try:
-            messages = []
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
+            messages = self._messages(prompt, system_prompt)
             
             # 使用传入的 max_tokens 或默认值
             tokens = max_tokens if max_tokens is not None else self.max_tokens
             
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=self.temperature,
@@ -56,15 +74,110 @@ class OpenAIClient(BaseLLMClient):
         except Exception as e:
             self.logger.error(f"OpenAI 生成失败: {str(e)}")
             raise
+
+    async def _agenerate_batch(self, prompts: List[str], system_prompt: str = None,
+                               on_done: Callable[[], None] = None) -> List[Union[str, Exception]]:
+        """批量生成：启用 batch_api 时通过 Batch API 提交，否则并发发送单条请求
+        
+        每 batch_size 条请求一个 Batch 任务，所有任务同时提交、同时等待，总耗时约为最慢的一个任务。
+        """
+        if not self.batch_api:
+            return await super()._agenerate_batch(prompts, system_prompt, on_done)
+        
+        size = max(1, self.batch_size)
+        chunks = await asyncio.gather(*(
+            self._agenerate_batch_job(prompts[start:start + size], system_prompt, on_done)
+            for start in range(0, len(prompts), size)
+        ))
+        return [result for chunk in chunks for result in chunk]
     
-    def generate_batch(self, prompts: List[str], system_prompt: str = None) -> List[str]:
-        """批量生成文本"""
-        results = []
-        for prompt in prompts:
-            try:
-                result = self.generate(prompt, system_prompt)
-                results.append(result)
-            except Exception as e:
-                self.logger.error(f"批量生成失败: {str(e)}")
-                results.append(f"Error: {str(e)}")
+    async def _agenerate_batch_job(self, prompts: List[str], system_prompt: str = None,
+                                   on_done: Callable[[], None] = None) -> List[Union[str, Exception]]:
+        """通过一个 Batch 任务生成
+        
+        任务提交失败时整批改为并发请求；任务超时（被取消）或过期时，没有结果的条目改为并发请求。
+        """
+        try:
+            results = await self._run_batch_job(prompts, system_prompt)
+        except Exception as e:
+            self.logger.warning(f"⚠️  Batch 任务失败，改为并发请求: {str(e)}")
+            return await super()._agenerate_batch(prompts, system_prompt, on_done)
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if on_done is not None:
+            for _ in range(len(prompts) - len(missing)):
+                on_done()
+        if missing:
+            self.logger.warning(f"⚠️  Batch 任务中 {len(missing)} 条请求没有结果，改为并发请求")
+            retried = await super()._agenerate_batch([prompts[i] for i in missing], system_prompt, on_done)
+            for i, result in zip(missing, retried):
+                results[i] = result
+        return results
+    
+    async def _run_batch_job(self, prompts: List[str], system_prompt: str = None) -> List[Union[str, Exception, None]]:
+        """提交 Batch 任务并等待完成
+        
+        Args:
+            prompts: 用户提示词列表
+            system_prompt: 系统提示词（可选）
+        
+        Returns:
+            生成的文本列表，单条失败的位置为异常对象，没有结果的位置为 None
+        """
+        client = self.async_client
+        
+        # 每条请求一行，custom_id 记录它在 prompts 中的位置
+        lines = [
+            json.dumps({
+                "custom_id": f"request-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": self._messages(prompt, system_prompt),
+                    "temperature": self.temperature,
+                    "max_tokens": self.max_tokens,
+                },
+            }, ensure_ascii=False)
+            for i, prompt in enumerate(prompts)
+        ]
+        input_file = await client.files.create(file=('batch.jsonl', '\n'.join(lines).encode('utf-8')), purpose='batch')
+        batch = await client.post('/batches', cast_to=object, body={
+            "input_file_id": input_file.id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+        })
+        self.logger.info(f"📦 已提交 Batch 任务 {batch['id']}（{len(prompts)} 条请求）")
+        
+        # 轮询任务状态，超时后取消任务（已完成的条目仍可下载）
+        deadline = time.monotonic() + self.batch_timeout
+        while batch['status'] not in ('completed', 'failed', 'expired', 'cancelled'):
+            if time.monotonic() >= deadline:
+                self.logger.warning(f"⚠️  Batch 任务 {batch['id']} 超过 {self.batch_timeout} 秒未完成，取消任务")
+                batch = await client.post(f"/batches/{batch['id']}/cancel", cast_to=object)
+                break
+            await asyncio.sleep(self.batch_poll_interval)
+            batch = await client.get(f"/batches/{batch['id']}", cast_to=object)
+        
+        if batch['status'] == 'failed':
+            raise RuntimeError(f"Batch 任务 {batch['id']} 失败: {batch.get('errors')}")
+        
+        results = [None] * len(prompts)
+        for file_key in ('output_file_id', 'error_file_id'):
+            if not batch.get(file_key):
+                continue
+            content = await client.files.content(batch[file_key])
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                index = int(record['custom_id'].rsplit('-', 1)[1])
+                response = record.get('response') or {}
+                if response.get('status_code') == 200:
+                    results[index] = response['body']['choices'][0]['message']['content'].strip()
+                else:
+                    error = record.get('error') or (response.get('body') or {}).get('error')
+                    results[index] = RuntimeError(f"Batch 请求失败: {error}")
+        
+        self.logger.info(f"✅ Batch 任务 {batch['id']} 结束（{batch['status']}）")
         return results
@@ -4,13 +4,16 @@
 使用 LLM 对 arXiv 论文进行智能总结
 """
 import logging
+import queue
 import re
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Callable, Iterable
 from datetime import datetime
-from pathlib import Path
 from tqdm import tqdm
 
-from src.utils import save_json, get_date_string, get_data_path
+from src.utils import get_date_string
+from src.storage import StorageFactory
+from .concurrency import map_bounded
 from .llm_factory import LLMClientFactory
 
 
@@ -29,6 +32,9 @@ class PaperSummarizer:
         self.config = config
         self.logger = logging.getLogger('daily_arxiv.summarizer')
         
+        # 总结结果存储（storage.type: json / sqlite）
+        self.storage = StorageFactory.create_storage(config)
+        
         # 创建 LLM 客户端
         try:
             self.llm_client = LLMClientFactory.create_client(config)
@@ -54,12 +60,20 @@ class PaperSummarizer:
             'pdf_url': paper.get('pdf_url', ''),
             'primary_category': paper.get('primary_category', ''),
             'categories': paper.get('categories', []),
-            'doi': paper.get('doi', None)
+            'doi': paper.get('doi', None),
+            # 非 arXiv 来源（如 OpenReview、会议 RSS）使用论文页面链接
+            'source': paper.get('source', 'arxiv'),
+            'entry_url': paper.get('entry_url', ''),
+            # 全文提取阶段（可选）得到的作者单位和代码链接
+            'affiliations': paper.get('affiliations', []),
+            'code_urls': paper.get('code_urls', []),
+            # 链接补全阶段（可选）得到的数据集链接
+            'datasets': paper.get('datasets', []),
         }
     
-    def format_with_llm(self, paper_info: Dict[str, Any]) -> str:
-        """Use LLM API to format paper information into specific markdown format"""
-        prompt = f"""Please format the following arXiv paper information in EXACTLY this markdown format:
+    def build_prompt(self, paper_info: Dict[str, Any]) -> str:
+        """Build the LLM prompt that formats one paper into the markdown entry"""
+        return f"""Please format the following arXiv paper information in EXACTLY this markdown format:
 
     - [ReCogDrive: A Reinforced Cognitive Framework for End-to-End Autonomous Driving](https://arxiv.org/abs/2506.08052)
     - Yongkang Li, Kaixin Xiong, Xiangyu Guo, Fang Li, Sixu Yan, Gangwei Xu, Lijun Zhou, Long Chen, Haiyang Sun, Bing Wang, Guang Chen, Hangjun Ye, Wenyu Liu, Xinggang Wang
@@ -79,8 +93,12 @@ class PaperSummarizer:
     Abstract: {paper_info['summary']}
     Published Date: {paper_info['published']}
     PDF URL: {paper_info['pdf_url']}
+    Paper URL: {paper_info.get('entry_url') or 'N/A'} (source: {paper_info.get('source', 'arxiv')})
     Categories: {', '.join(paper_info['categories'])}
     DOI: {paper_info.get('doi', 'N/A')}
+    Affiliations (from the PDF first page): {'; '.join(paper_info.get('affiliations') or []) or 'N/A'}
+    Code links (from the PDF full text / metadata service): {', '.join(paper_info.get('code_urls') or []) or 'N/A'}
+    Dataset links (from the metadata service): {', '.join(f"{d['name']} ({d['url']})" for d in paper_info.get('datasets') or []) or 'N/A'}
 
     Generate a formatted entry in EXACTLY the same markdown format. Follow these rules:
 
@@ -100,16 +118,16 @@ class PaperSummarizer:
         - `    - Second summary point.`
 
     3. **URL rules**:
-    - arXiv URL: `https://arxiv.org/abs/arxiv_id`
-    - GitHub code: Extract from abstract or infer common patterns
+    - arXiv URL: `https://arxiv.org/abs/arxiv_id` (for papers whose source is not arxiv, link the Paper URL instead)
+    - GitHub code: Use the Code links above verbatim; otherwise only a URL written in the abstract. Never guess a repository URL
     - Project page: Look for "project page" or "website" in abstract
-    - Dataset links: Use standard dataset URLs when possible
+    - Dataset links: Use the Dataset links above verbatim when available; otherwise standard dataset URLs
 
     4. **Field extraction guidelines**:
-    - **Publisher**: Extract from authors' affiliations mentioned in abstract or infer from title/categories
+    - **Publisher**: Use the affiliations from the PDF first page when available; otherwise extract from authors' affiliations mentioned in abstract or infer from title/categories
     - **Publish Date**: Format as YYYY.MM.DD
     - **Project Page**: Look for phrases like "project page", "website", "demo", "homepage"
-    - **Code**: Look for "github.com", "code available", "we release code"
+    - **Code**: Use the Code links above when available; otherwise look for "github.com", "code available", "we release code"
     - **Task**: One of: VQA, Planning, Prediction, Perception, Detection, Tracking, Reasoning, Navigation, Control, End-to-End
     - **Datasets**: Extract from mentions of Waymo, nuScenes, KITTI, Argoverse, BDD100K, CARLA, NAVSIM, etc.
     - **Summary**: Create 2-3 bullet points summarizing key contributions
@@ -123,10 +141,12 @@ class PaperSummarizer:
 
     Return ONLY the formatted markdown entry with no additional text or explanations."""
 
+    def format_with_llm(self, paper_info: Dict[str, Any]) -> str:
+        """Use LLM API to format paper information into specific markdown format"""
         try:
             # 生成总结
             summary = self.llm_client.generate(
-                prompt=prompt,
+                prompt=self.build_prompt(paper_info),
                 system_prompt=self.SYSTEM_PROMPT
             )
             return summary
@@ -145,15 +165,17 @@ class PaperSummarizer:
         except:
             pass
         
-        # ArXiv URL
+        # ArXiv URL (other sources link to their own paper page)
         arxiv_url = f"https://arxiv.org/abs/{paper_info.get('arxiv_id', '')}"
+        if paper_info.get('source', 'arxiv') != 'arxiv' and paper_info.get('entry_url'):
+            arxiv_url = paper_info['entry_url']
         
         # Extract information
         summary = paper_info.get('summary', '')
         
-        # Try to extract various info
-        code_url = self.extract_code_mention(summary)
-        dataset_info = self.extract_dataset_info(summary)
+        # Try to extract various info (prefer links found in the PDF full text)
+        code_url = (paper_info.get('code_urls') or [''])[0] or self.extract_code_mention(summary)
+        dataset_info = self.format_dataset_links(paper_info.get('datasets')) or self.extract_dataset_info(summary)
         task_type = self.infer_task_type(summary)
         publisher_info = self.extract_publisher_info(paper_info)
         project_page = self.extract_project_page(summary)
@@ -195,6 +217,10 @@ class PaperSummarizer:
 
     def extract_publisher_info(self, paper_info: Dict[str, Any]) -> str:
         """Extract publisher/institution information"""
+        # Prefer affiliations extracted from the PDF first page
+        if paper_info.get('affiliations'):
+            return ', '.join(paper_info['affiliations'][:3])
+        
         # Try to infer from categories
         category_venue = self.infer_venue(paper_info.get('categories', []))
         if category_venue:
@@ -243,6 +269,13 @@ class PaperSummarizer:
         
         return ""
 
+    def format_dataset_links(self, datasets: List[Dict[str, str]]) -> str:
+        """Format dataset links returned by the metadata service"""
+        return ', '.join(
+            f"[{dataset['name']}]({dataset['url']})" if dataset.get('url') else dataset['name']
+            for dataset in datasets or []
+        )
+
     def extract_dataset_info(self, text: str) -> str:
         """Extract dataset information with links"""
         # Map of common datasets to their URLs
@@ -355,34 +388,87 @@ class PaperSummarizer:
         Returns:
             包含总结的论文信息
         """
-        try:
-            # 提取论文信息
-            paper_info = self.extract_paper_info(paper)
-            
-            # 使用LLM或手动格式化生成总结
-            summary = self.format_with_llm(paper_info)
+        return self.summarize_batch([paper])[0]
+    
+    def summarize_batch(self, papers: List[Dict[str, Any]], show_progress: bool = True,
+                        on_done: Callable[[], None] = None) -> List[Dict[str, Any]]:
+        """用一次 generate_batch 调用总结一批论文
+        
+        单篇论文的 LLM 调用失败时回退为手动格式化并标记 summary_fallback（不记为已处理，
+        下次运行重新交给 LLM）；字段格式异常、无法构建提示词的论文标记 summary_error，
+        不交给 LLM。任何错误都只影响这一篇
+        
+        Args:
+            papers: 论文列表
+            show_progress: 是否显示进度条（不显示时记录每篇总结的预览）
+            on_done: 每完成一篇调用一次（如更新进度条）
+        
+        Returns:
+            包含总结的论文列表（与输入顺序一致）
+        """
+        # 逐篇构建提示词：字段格式异常的论文直接标记失败，不交给 LLM，也不影响同一批的其他论文
+        paper_infos = []
+        prompts = []
+        for paper in papers:
+            try:
+                paper_info = self.extract_paper_info(paper)
+                prompts.append(self.build_prompt(paper_info))
+                paper_infos.append(paper_info)
+            except Exception as e:
+                paper_infos.append(e)
+        
+        generated = iter(self._generate_batch(prompts, on_done) if prompts else [])
+        
+        summarized_papers = []
+        for paper, paper_info in zip(papers, paper_infos):
+            if isinstance(paper_info, Exception):
+                self.logger.error(f"构建提示词失败 [{str(paper.get('title') or 'Unknown')[:50]}]: {str(paper_info)}")
+                paper_with_summary = paper.copy()
+                paper_with_summary['summary'] = f"总结生成失败: {str(paper_info)}"
+                paper_with_summary['summary_error'] = True
+                summarized_papers.append(paper_with_summary)
+                if on_done is not None:
+                    on_done()
+                continue
             
-            # 添加总结到论文信息
-            paper_with_summary = paper.copy()
-            paper_with_summary['summary'] = summary
-            paper_with_summary['summarized_at'] = datetime.now().isoformat()
+            summary = next(generated)
+            try:
+                fallback = isinstance(summary, Exception)
+                if fallback:
+                    self.logger.error(f"LLM 格式化失败 [{str(paper.get('title') or 'Unknown')[:50]}]: {str(summary)}")
+                    summary = self.format_manually(paper_info)
+                elif not show_progress:
+                    # 如果没有进度条，显示总结预览
+                    self.logger.info(f"  总结预览: {summary[:100]}...")
+                
+                # 添加总结到论文信息（Paper.copy() 只复制附加字段，其余字段在副本之间共享）
+                paper_with_summary = paper.copy()
+                paper_with_summary['summary'] = summary
+                paper_with_summary['summarized_at'] = datetime.now().isoformat()
+                if fallback:
+                    paper_with_summary['summary_fallback'] = True
             
-            return paper_with_summary
+            except Exception as e:
+                self.logger.error(f"总结论文失败 [{str(paper.get('title') or 'Unknown')}]: {str(e)}")
+                paper_with_summary = paper.copy()
+                paper_with_summary['summary'] = f"总结生成失败: {str(e)}"
+                paper_with_summary['summary_error'] = True
             
-        except Exception as e:
-            self.logger.error(f"总结论文失败 [{paper.get('title', 'Unknown')}]: {str(e)}")
-            paper_with_summary = paper.copy()
-            paper_with_summary['summary'] = f"总结生成失败: {str(e)}"
-            paper_with_summary['summary_error'] = True
-            return paper_with_summary
+            summarized_papers.append(paper_with_summary)
+        
+        return summarized_papers
     
     def summarize_papers(self, papers: List[Dict[str, Any]], 
-                        show_progress: bool = True) -> List[Dict[str, Any]]:
+                        show_progress: bool = True, save: bool = True) -> List[Dict[str, Any]]:
         """批量总结论文
         
+        整批论文只调用一次 generate_batch（并发请求，或启用 Batch API 时按 batch_size
+        拆成同时提交的服务端任务，取决于提供商）
+        
         Args:
             papers: 论文列表
             show_progress: 是否显示进度条
+            save: 是否保存为最新的总结结果（订阅等只总结部分论文的调用方自行保存时设为 False）
             
         Returns:
             包含总结的论文列表
@@ -393,49 +479,160 @@ class PaperSummarizer:
         
         self.logger.info("=" * 60)
         self.logger.info(f"开始总结 {len(papers)} 篇论文")
-        self.logger.info(f"使用模型: {self.llm_client.model}")
+        self.logger.info(f"使用模型: {self.llm_client.model}（并发数: {self._max_concurrency()}）")
         self.logger.info("=" * 60)
         
-        summarized_papers = []
+        # 使用进度条（每完成一篇更新一次）
+        progress = tqdm(total=len(papers), desc="总结论文") if show_progress else None
+        
+        try:
+            summarized_papers = self.summarize_batch(
+                papers, show_progress, on_done=progress.update if progress is not None else None
+            )
+        finally:
+            if progress is not None:
+                progress.close()
+        
+        self._finish_summaries(summarized_papers, save=save)
+        
+        return summarized_papers
+    
+    def summarize_stream(self, papers: Iterable[Dict[str, Any]],
+                         show_progress: bool = True, save: bool = True) -> List[Dict[str, Any]]:
+        """流式总结论文
+        
+        在后台线程中消费论文迭代器（如 ArxivFetcher.iter_papers），已到达的论文立即
+        合并为一批交给 LLM 总结（每批不超过 batch_size 篇），使爬取的网络等待与 LLM 的
+        生成时间重叠，而不是先后相加。
+        
+        Args:
+            papers: 论文迭代器
+            show_progress: 是否显示进度条
+            save: 是否保存为最新的总结结果（从归档重新处理历史论文等调用方自行保存时设为 False）
+        
+        Returns:
+            包含总结的论文列表（按到达顺序）
+        
+        Raises:
+            Exception: 论文迭代器抛出的错误（已到达论文的总结会先保存）
+        """
+        batch_size = self._batch_size()
+        self.logger.info("=" * 60)
+        self.logger.info("开始流式总结论文（边爬取边总结）")
+        self.logger.info(f"使用模型: {self.llm_client.model}（并发数: {self._max_concurrency()}，每批至多 {batch_size} 篇）")
+        self.logger.info("=" * 60)
         
-        # 使用进度条
-        iterator = tqdm(papers, desc="总结论文") if show_progress else papers
+        incoming = queue.Queue()
+        done = object()
+        fetch_error = []
         
-        for i, paper in enumerate(iterator, 1):
+        def produce():
             try:
-                self.logger.info(f"\n[{i}/{len(papers)}] 正在总结: {paper['title'][:50]}...")
+                for paper in papers:
+                    incoming.put(paper)
+            except Exception as e:
+                fetch_error.append(e)
+            finally:
+                incoming.put(done)
                 
-                summarized_paper = self.summarize_paper(paper)
-                summarized_papers.append(summarized_paper)
+        def batches():
+            while True:
+                # 等待下一篇论文，再把已经到达的论文合并进同一批（不等待后续论文）
+                paper = incoming.get()
+                if paper is done:
+                    return
+                batch = [paper]
+                while len(batch) < batch_size:
+                    try:
+                        paper = incoming.get_nowait()
+                    except queue.Empty:
+                        break
+                    if paper is done:
+                        yield batch
+                        return
+                    batch.append(paper)
+                yield batch
+        
+        producer = threading.Thread(target=produce, name="paper-producer", daemon=True)
+        producer.start()
                 
-                if not summarized_paper.get('summary_error'):
-                    self.logger.info(f"✓ 总结完成")
-                    if not show_progress:
-                        # 如果没有进度条，显示总结预览
-                        summary_preview = summarized_paper['summary'][:100]
-                        self.logger.info(f"  总结预览: {summary_preview}...")
-                else:
-                    self.logger.warning(f"⚠ 总结失败")
+        progress = tqdm(desc="总结论文", unit="篇") if show_progress else None
                     
+        summarized_papers = []
+        try:
+            for batch in batches():
+                self.logger.info(f"\n[{len(summarized_papers) + 1}-{len(summarized_papers) + len(batch)}] 正在总结 {len(batch)} 篇论文...")
+                summarized_papers.extend(self.summarize_batch(
+                    batch, show_progress, on_done=progress.update if progress is not None else None
+                ))
+        finally:
+            if progress is not None:
+                progress.close()
+        
+        producer.join()
+        
+        if summarized_papers:
+            self._finish_summaries(summarized_papers, save=save)
+        else:
+            self.logger.warning("没有论文需要总结")
+        
+        if fetch_error:
+            self.logger.error(f"论文获取中断，已总结 {len(summarized_papers)} 篇: {str(fetch_error[0])}")
+            raise fetch_error[0]
+        
+        return summarized_papers
+    
+    def _max_concurrency(self) -> int:
+        """获取同时进行的 LLM 调用数上限（llm.<提供商>.max_concurrency，自定义客户端没有该属性时串行）"""
+        return getattr(self.llm_client, 'max_concurrency', 1)
+    
+    def _batch_size(self) -> int:
+        """获取流式总结每次合并的论文数上限（llm.<提供商>.batch_size）"""
+        return max(1, getattr(self.llm_client, 'batch_size', 50))
+    
+    def _generate_batch(self, prompts: List[str], on_done: Callable[[], None] = None) -> List[Any]:
+        """批量调用 LLM，失败的位置为异常对象
+        
+        自定义客户端没有 generate_batch 时，按 max_concurrency 并发调用 generate
+        
+        Args:
+            prompts: 提示词列表
+            on_done: 每完成一条调用一次
+        
+        Returns:
+            生成的文本列表（与 prompts 顺序一致）
+        """
+        if hasattr(self.llm_client, 'generate_batch'):
+            return self.llm_client.generate_batch(prompts, system_prompt=self.SYSTEM_PROMPT,
+                                                  return_exceptions=True, on_done=on_done)
+            
+        def generate(i: int, prompt: str) -> Any:
+            try:
+                return self.llm_client.generate(prompt=prompt, system_prompt=self.SYSTEM_PROMPT)
             except Exception as e:
-                self.logger.error(f"处理论文时出错: {str(e)}")
-                paper_with_error = paper.copy()
-                paper_with_error['summary'] = f"处理失败: {str(e)}"
-                paper_with_error['summary_error'] = True
-                summarized_papers.append(paper_with_error)
+                return e
+            
+        return map_bounded(generate, prompts, self._max_concurrency(), on_done=on_done)
+    
+    def _finish_summaries(self, summarized_papers: List[Dict[str, Any]], save: bool = True):
+        """统计并保存总结结果
         
+        Args:
+            summarized_papers: 包含总结的论文列表
+            save: 是否保存
+        """
         # 统计
         success_count = sum(1 for p in summarized_papers if not p.get('summary_error'))
         fail_count = len(summarized_papers) - success_count
+        fallback_count = sum(1 for p in summarized_papers if p.get('summary_fallback'))
         
         self.logger.info("\n" + "=" * 60)
-        self.logger.info(f"✅ 总结完成: {success_count} 篇成功, {fail_count} 篇失败")
+        self.logger.info(f"✅ 总结完成: {success_count} 篇成功（{fallback_count} 篇回退为手动格式化）, {fail_count} 篇失败")
         self.logger.info("=" * 60)
         
         # 保存结果
-        self._save_summaries(summarized_papers)
-        
-        return summarized_papers
+        if save:
+            self._save_summaries(summarized_papers)
     
     def _save_summaries(self, papers: List[Dict[str, Any]]):
         """保存总结结果
@@ -446,28 +643,12 @@ class PaperSummarizer:
         if not papers:
             return
         
-        # 获取存储路径
-        data_path = get_data_path(self.config, 'summaries')
-        Path(data_path).mkdir(parents=True, exist_ok=True)
-        
-        # 按日期保存
-        date_str = get_date_string()
-        filepath = f"{data_path}/summaries_{date_str}.json"
-        
-        # 保存数据
-        save_json(papers, filepath)
-        self.logger.info(f"💾 总结数据已保存到: {filepath}")
-        
-        # 同时保存一份到 latest.json
-        latest_filepath = f"{data_path}/latest.json"
-        save_json({
-            'date': date_str,
-            'count': len(papers),
-            'papers': papers,
-            'llm_provider': self.llm_client.get_provider_name(),
-            'llm_model': self.llm_client.model,
-        }, latest_filepath)
-        self.logger.info(f"💾 最新总结已保存到: {latest_filepath}")
+        # 按 storage.type 保存（JSON 文件或 SQLite 数据库）
+        self.storage.save_summaries(
+            papers,
+            llm_provider=self.llm_client.get_provider_name(),
+            llm_model=self.llm_client.model,
+        )
     
     def generate_daily_report(self, papers: List[Dict[str, Any]]) -> str:
         """生成每日报告
@@ -502,16 +683,14 @@ class PaperSummarizer:
 
 def main():
     """测试函数"""
-    from src.utils import load_config, load_env, setup_logging, load_json
+    from src.utils import load_config, load_env, setup_logging
     
     load_env()
     config = load_config()
     logger = setup_logging(config)
     
     # 加载已爬取的论文
-    data_path = get_data_path(config, 'papers')
-    latest_file = f"{data_path}/latest.json"
-    data = load_json(latest_file)
+    data = StorageFactory.create_storage(config).load_latest_papers()
     
     if not data or not data.get('papers'):
         logger.error("没有找到论文数据，请先运行论文爬取")
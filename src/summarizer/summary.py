@@ -6,10 +6,11 @@
 import logging
 from typing import List, Dict, Any
 from datetime import datetime
-from pathlib import Path
 from tqdm import tqdm
 
-from src.utils import save_json, get_date_string, get_data_path
+from src.utils import get_date_string
+from src.storage import StorageFactory
+from .concurrency import map_bounded
 from .llm_factory import LLMClientFactory
 
 
@@ -49,6 +50,9 @@ class PaperSummarizer:
         self.config = config
         self.logger = logging.getLogger('daily_arxiv.summarizer')
         
+        # 总结结果存储（storage.type: json / sqlite）
+        self.storage = StorageFactory.create_storage(config)
+        
         # 创建 LLM 客户端
         try:
             self.llm_client = LLMClientFactory.create_client(config)
@@ -113,22 +117,20 @@ class PaperSummarizer:
             self.logger.warning("没有论文需要总结")
             return []
         
+        # 同时进行的 LLM 调用数上限（llm.<提供商>.max_concurrency，自定义客户端没有该属性时串行）
+        max_workers = getattr(self.llm_client, 'max_concurrency', 1)
+        
         self.logger.info("=" * 60)
         self.logger.info(f"开始总结 {len(papers)} 篇论文")
-        self.logger.info(f"使用模型: {self.llm_client.model}")
+        self.logger.info(f"使用模型: {self.llm_client.model}（并发数: {max_workers}）")
         self.logger.info("=" * 60)
         
-        summarized_papers = []
-        
-        # 使用进度条
-        iterator = tqdm(papers, desc="总结论文") if show_progress else papers
-        
-        for i, paper in enumerate(iterator, 1):
+        def summarize(i, paper):
+            # 任何错误都只影响这一篇
             try:
-                self.logger.info(f"\n[{i}/{len(papers)}] 正在总结: {paper['title'][:50]}...")
+                self.logger.info(f"\n[{i + 1}/{len(papers)}] 正在总结: {paper['title'][:50]}...")
                 
                 summarized_paper = self.summarize_paper(paper)
-                summarized_papers.append(summarized_paper)
                 
                 if not summarized_paper.get('summary_error'):
                     self.logger.info(f"✓ 总结完成")
@@ -139,12 +141,25 @@ class PaperSummarizer:
                 else:
                     self.logger.warning(f"⚠ 总结失败")
                     
+                return summarized_paper
+            
             except Exception as e:
                 self.logger.error(f"处理论文时出错: {str(e)}")
                 paper_with_error = paper.copy()
                 paper_with_error['summary'] = f"处理失败: {str(e)}"
                 paper_with_error['summary_error'] = True
-                summarized_papers.append(paper_with_error)
+                return paper_with_error
+        
+        # 使用进度条（每完成一篇更新一次），结果按输入顺序排列
+        progress = tqdm(total=len(papers), desc="总结论文") if show_progress else None
+        try:
+            summarized_papers = map_bounded(
+                summarize, papers, max_workers,
+                on_done=progress.update if progress is not None else None,
+            )
+        finally:
+            if progress is not None:
+                progress.close()
         
         # 统计
         success_count = sum(1 for p in summarized_papers if not p.get('summary_error'))
@@ -168,28 +183,12 @@ class PaperSummarizer:
         if not papers:
             return
         
-        # 获取存储路径
-        data_path = get_data_path(self.config, 'summaries')
-        Path(data_path).mkdir(parents=True, exist_ok=True)
-        
-        # 按日期保存
-        date_str = get_date_string()
-        filepath = f"{data_path}/summaries_{date_str}.json"
-        
-        # 保存数据
-        save_json(papers, filepath)
-        self.logger.info(f"💾 总结数据已保存到: {filepath}")
-        
-        # 同时保存一份到 latest.json
-        latest_filepath = f"{data_path}/latest.json"
-        save_json({
-            'date': date_str,
-            'count': len(papers),
-            'papers': papers,
-            'llm_provider': self.llm_client.get_provider_name(),
-            'llm_model': self.llm_client.model,
-        }, latest_filepath)
-        self.logger.info(f"💾 最新总结已保存到: {latest_filepath}")
+        # 按 storage.type 保存（JSON 文件或 SQLite 数据库）
+        self.storage.save_summaries(
+            papers,
+            llm_provider=self.llm_client.get_provider_name(),
+            llm_model=self.llm_client.model,
+        )
     
     def generate_daily_report(self, papers: List[Dict[str, Any]]) -> str:
         """生成每日报告
@@ -229,16 +228,14 @@ class PaperSummarizer:
 
 def main():
     """测试函数"""
-    from src.utils import load_config, load_env, setup_logging, load_json
+    from src.utils import load_config, load_env, setup_logging
     
     load_env()
     config = load_config()
     logger = setup_logging(config)
     
     # 加载已爬取的论文
-    data_path = get_data_path(config, 'papers')
-    latest_file = f"{data_path}/latest.json"
-    data = load_json(latest_file)
+    data = StorageFactory.create_storage(config).load_latest_papers()
     
     if not data or not data.get('papers'):
         logger.error("没有找到论文数据，请先运行论文爬取")
@@ -5,8 +5,7 @@ vLLM 提供 OpenAI 兼容的 API 接口
 """
 import os
 import logging
-from typing import List
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from .base_llm_client import BaseLLMClient
 
@@ -25,18 +24,23 @@ class VLLMClient(BaseLLMClient):
         # 获取模型名称
         self.model = config.get('model') or os.getenv('VLLM_MODEL', 'default')
         
-        # 创建客户端（使用 OpenAI SDK）
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url=base_url
-        )
+        # 异步客户端（使用 OpenAI SDK）在使用它的事件循环中按需创建
+        self.api_key = api_key
+        self.base_url = base_url
         
         self.logger.info(f"vLLM 客户端初始化成功")
         self.logger.info(f"  - 端点: {base_url}")
         self.logger.info(f"  - 模型: {self.model}")
     
-    def generate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
-        """生成文本"""
+    def _create_async_client(self) -> AsyncOpenAI:
+        """创建异步客户端"""
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url
+        )
+    
+    async def agenerate(self, prompt: str, system_prompt: str = None, max_tokens: int = None) -> str:
+        """异步生成文本"""
         try:
             messages = []
             if system_prompt:
@@ -46,7 +50,7 @@ class VLLMClient(BaseLLMClient):
             # 使用传入的 max_tokens 或默认值
             tokens = max_tokens if max_tokens is not None else self.max_tokens
             
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=self.temperature,
@@ -57,17 +61,5 @@ class VLLMClient(BaseLLMClient):
             
         except Exception as e:
             self.logger.error(f"vLLM 生成失败: {str(e)}")
-            self.logger.error(f"请确保 vLLM 服务正在运行: {self.client.base_url}")
+            self.logger.error(f"请确保 vLLM 服务正在运行: {self.base_url}")
             raise
-    
-    def generate_batch(self, prompts: List[str], system_prompt: str = None) -> List[str]:
-        """批量生成文本"""
-        results = []
-        for prompt in prompts:
-            try:
-                result = self.generate(prompt, system_prompt)
-                results.append(result)
-            except Exception as e:
-                self.logger.error(f"批量生成失败: {str(e)}")
-                results.append(f"Error: {str(e)}")
-        return results
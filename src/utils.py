@@ -3,11 +3,18 @@ import os
 import yaml
 import json
 import logging
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Type, Iterator
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:
+    # Windows 没有 fcntl，file_lock 不做跨进程互斥
+    fcntl = None
+
 
 def load_config(config_path: str = "config/config.yaml") -> Dict[str, Any]:
     """加载配置文件
@@ -65,23 +72,93 @@ def setup_logging(config: Dict[str, Any]) -> logging.Logger:
     return logger
 
 
-def save_json(data: Any, filepath: str):
+# ================ JSON 编解码 ================
+# 按可用性选择 JSON 编解码器: orjson > msgspec > 标准库 json（orjson / msgspec 为可选依赖）
+try:
+    import orjson
+    JSON_CODEC = 'orjson'
+except ImportError:
+    try:
+        import msgspec
+        JSON_CODEC = 'msgspec'
+    except ImportError:
+        JSON_CODEC = 'json'
+
+# 解析失败时可能抛出的异常（orjson 的异常是 ValueError 的子类，msgspec 不是）
+JSON_DECODE_ERRORS = (ValueError, msgspec.DecodeError) if JSON_CODEC == 'msgspec' else (ValueError,)
+
+
+def dumps_json(data: Any, pretty: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON
+    
+    Args:
+        data: 要序列化的数据
+        pretty: 是否缩进（给人阅读的文件）；默认紧凑格式（给程序读取的文件）
+    
+    Returns:
+        JSON 字节串（非 ASCII 字符不转义）
+    """
+    if JSON_CODEC == 'orjson':
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, default=json_default, option=option)
+    if JSON_CODEC == 'msgspec':
+        content = msgspec.json.encode(data, enc_hook=json_default)
+        return msgspec.json.format(content, indent=2) if pretty else content
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2, default=json_default).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8')
+
+
+def loads_json(content) -> Any:
+    """解析 JSON（接受 bytes 或 str）
+    
+    Args:
+        content: JSON 内容
+    
+    Returns:
+        解析后的数据
+    """
+    if JSON_CODEC == 'orjson':
+        return orjson.loads(content)
+    if JSON_CODEC == 'msgspec':
+        return msgspec.json.decode(content)
+    return json.loads(content)
+
+
+def save_json(data: Any, filepath: str, pretty: bool = False):
     """保存 JSON 数据
     
     Args:
         data: 要保存的数据
         filepath: 文件路径
+        pretty: 是否缩进（给人阅读的文件）；默认紧凑格式
     """
     Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(filepath, 'wb') as f:
+        f.write(dumps_json(data, pretty=pretty))
 
 
-def load_json(filepath: str) -> Any:
+def json_default(obj: Any) -> Any:
+    """JSON 序列化的兜底转换（支持 Paper 等带 to_dict 方法的对象）
+    
+    Args:
+        obj: 无法直接序列化的对象
+        
+    Returns:
+        可序列化的对象
+    """
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def load_json(filepath: str, record_type: Type = None) -> Any:
     """加载 JSON 数据
     
     Args:
         filepath: 文件路径
+        record_type: 记录类型（需要 from_dict 类方法，如 Paper），传入时把论文列表直接解码为记录：
+            文件内容是列表时转换每一项，是带 papers 字段的字典时转换 papers 中的每一项
         
     Returns:
         加载的数据
@@ -89,8 +166,30 @@ def load_json(filepath: str) -> Any:
     if not os.path.exists(filepath):
         return None
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(filepath, 'rb') as f:
+        data = loads_json(f.read())
+    
+    if record_type is not None:
+        if isinstance(data, list):
+            data = [record_type.from_dict(item) for item in data]
+        elif isinstance(data, dict) and isinstance(data.get('papers'), list):
+            data['papers'] = [record_type.from_dict(item) for item in data['papers']]
+    return data
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """持有锁文件的独占锁（fcntl.flock），多个进程追加同一份数据时互斥
+    
+    Args:
+        path: 锁文件路径（不存在时创建）
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        # 关闭文件时自动释放锁
+        yield
 
 
 def get_date_string(date: datetime = None) -> str:
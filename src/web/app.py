@@ -17,7 +17,9 @@ from flask import Flask, render_template, jsonify, request, send_from_directory
 # from flask_cors import CORS  # 暂时注释，本地开发不需要
 import markdown
 
-from src.utils import load_config, load_json, get_date_string
+from src.utils import load_config, get_date_string
+from src.storage import StorageFactory
+from src.storage.corpus import get_corpus
 
 
 # 创建 Flask 应用
@@ -37,6 +39,12 @@ web_config = config.get('web', {})
 app.config['TITLE'] = web_config.get('title', 'Daily arXiv - AI Research Tracker')
 app.config['DESCRIPTION'] = web_config.get('description', '每日追踪最新的 AI 研究论文')
 
+# 数据存储（storage.type: json / sqlite），所有接口通过它读取数据
+storage = StorageFactory.create_storage(config)
+
+# 历史论文库（storage.corpus），跨天统计直接在内存映射的列上计算
+corpus = get_corpus(config)
+
 
 @app.route('/')
 def index():
@@ -51,7 +59,7 @@ def get_analysis():
     """获取趋势分析数据"""
     try:
         # 加载最新的分析数据
-        analysis_data = load_json('data/analysis/latest.json')
+        analysis_data = storage.load_latest_analysis()
         
         if not analysis_data:
             return jsonify({'error': '没有找到分析数据'}), 404
@@ -81,23 +89,12 @@ def get_papers():
         per_page = request.args.get('per_page', 20, type=int)
         category = request.args.get('category', '')
         
-        # 加载论文数据
-        papers_data = load_json('data/papers/latest.json')
-        
-        if not papers_data:
+        date = storage.latest_date()
+        if date is None:
             return jsonify({'error': '没有找到论文数据'}), 404
         
-        papers = papers_data.get('papers', [])
-        
-        # 按类别过滤
-        if category:
-            papers = [p for p in papers if category in p.get('categories', [])]
-        
-        # 分页
-        total = len(papers)
-        start = (page - 1) * per_page
-        end = start + per_page
-        papers_page = papers[start:end]
+        # 按类别过滤并分页（SQLite 存储在数据库中完成过滤和分页）
+        papers_page, total = storage.query_papers(category=category, offset=(page - 1) * per_page, limit=per_page)
         
         return jsonify({
             'papers': papers_page,
@@ -105,7 +102,7 @@ def get_papers():
             'page': page,
             'per_page': per_page,
             'total_pages': (total + per_page - 1) // per_page,
-            'date': papers_data.get('date')
+            'date': date
         })
     
     except Exception as e:
@@ -116,30 +113,12 @@ def get_papers():
 def get_paper_detail(paper_id):
     """获取论文详情（包括总结）"""
     try:
-        # 加载论文数据
-        papers_data = load_json('data/papers/latest.json')
-        papers = papers_data.get('papers', [])
-        
-        # 查找论文
-        paper = None
-        for p in papers:
-            if p.get('id') == paper_id:
-                paper = p
-                break
+        # 查找论文及其总结
+        paper = storage.get_paper(paper_id)
         
         if not paper:
             return jsonify({'error': '论文不存在'}), 404
         
-        # 加载总结数据
-        summaries_data = load_json('data/summaries/latest.json')
-        if summaries_data:
-            summaries = summaries_data.get('summaries', [])
-            # 查找对应的总结
-            for summary in summaries:
-                if summary.get('paper_id') == paper_id:
-                    paper['summary'] = summary.get('summary')
-                    break
-        
         return jsonify(paper)
     
     except Exception as e:
@@ -150,7 +129,7 @@ def get_paper_detail(paper_id):
 def get_summaries():
     """获取论文总结列表"""
     try:
-        summaries_data = load_json('data/summaries/latest.json')
+        summaries_data = storage.load_latest_summaries()
         
         if not summaries_data:
             return jsonify({'error': '没有找到总结数据'}), 404
@@ -161,23 +140,64 @@ def get_summaries():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/history/trends')
+def get_history_trends():
+    """获取历史论文库中每月的论文数，以及包含某个词的论文数（可按类别过滤）"""
+    try:
+        if corpus is None:
+            return jsonify({'error': '历史论文库未启用'}), 404
+        
+        term = request.args.get('term', '')
+        category = request.args.get('category', '')
+        
+        # 爬取进程追加新论文后重新映射
+        corpus.refresh()
+        if term:
+            months = corpus.term_trend(term, category=category or None)
+        else:
+            months = {month: {'total': total} for month, total in corpus.monthly_counts(corpus.rows(category=category or None)).items()}
+        
+        return jsonify({
+            'term': term,
+            'category': category,
+            'total_papers': len(corpus),
+            'months': [{'month': month, **counts} for month, counts in months.items()]
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/history/<kind>/<date_str>')
+def get_history(kind, date_str):
+    """获取某一天的论文、总结或分析结果（已归档的日期从按月归档中读取）"""
+    try:
+        if kind not in ('papers', 'summaries', 'analysis'):
+            return jsonify({'error': f'不支持的数据类型: {kind}'}), 400
+        
+        data = storage.load_daily(kind, date_str)
+        
+        if data is None:
+            return jsonify({'error': f'没有找到 {date_str} 的数据'}), 404
+        
+        if kind == 'analysis':
+            return jsonify(data)
+        return jsonify({'date': date_str, 'count': len(data), 'papers': data})
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/categories')
 def get_categories():
     """获取所有类别"""
     try:
-        papers_data = load_json('data/papers/latest.json')
+        # 统计类别
+        categories = storage.category_counts()
         
-        if not papers_data:
+        if not categories:
             return jsonify({'error': '没有找到论文数据'}), 404
         
-        papers = papers_data.get('papers', [])
-        
-        # 统计类别
-        categories = {}
-        for paper in papers:
-            for cat in paper.get('categories', []):
-                categories[cat] = categories.get(cat, 0) + 1
-        
         # 转换为列表并排序
         category_list = [
             {'name': cat, 'count': count}
@@ -195,19 +215,7 @@ def get_categories():
 def get_stats():
     """获取统计信息"""
     try:
-        # 加载数据
-        papers_data = load_json('data/papers/latest.json')
-        summaries_data = load_json('data/summaries/latest.json')
-        analysis_data = load_json('data/analysis/latest.json')
-        
-        stats = {
-            'papers_count': len(papers_data.get('papers', [])) if papers_data else 0,
-            'summaries_count': len(summaries_data.get('summaries', [])) if summaries_data else 0,
-            'analysis_available': analysis_data is not None,
-            'last_update': papers_data.get('date') if papers_data else None
-        }
-        
-        return jsonify(stats)
+        return jsonify(storage.get_stats())
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -224,7 +232,7 @@ def serve_image(filename):
 def get_wordcloud():
     """获取词云图片路径"""
     try:
-        analysis_data = load_json('data/analysis/latest.json')
+        analysis_data = storage.load_latest_analysis()
         
         if not analysis_data:
             return jsonify({'error': '没有找到分析数据'}), 404
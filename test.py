@@ -5,6 +5,7 @@ Daily arXiv Agent - 主程序入口
 """
 import sys
 import time
+from datetime import datetime
 from pathlib import Path
 
 # 添加项目根目录到 Python 路径
@@ -21,6 +22,7 @@ def main():
     """主函数"""
     # 记录任务开始时间
     start_time = time.time()
+    started_at = datetime.now()
     
     # 加载配置
     load_env()
@@ -47,20 +49,64 @@ def main():
         # 第一步 - 实现论文爬取 ✅
         logger.info("步骤 1: 爬取 arXiv 论文...")
         from src.crawler.arxiv_fetcher import ArxivFetcher
+        from src.summarizer.paper_summarizer import PaperSummarizer
         fetcher = ArxivFetcher(config)
         
+        # 多来源采集：arXiv 与其他来源并发采集并跨来源去重
+        ingestor = None
+        if config.get('sources', {}).get('enabled', False):
+            from src.crawler.sources import SourceIngestor
+            ingestor = SourceIngestor(config, fetcher)
+        
+        summarizer = None
+        try:
+            summarizer = PaperSummarizer(config)
+        except Exception as e:
+            logger.error(f"初始化总结器失败，将只爬取论文: {str(e)}")
+        
         # 尝试获取论文，如果没找到，逐步放宽条件
         # papers = fetcher.fetch_papers(days_back=210)
-        papers = fetcher.fetch_papers(days_back=3)
-        if not papers:
+        # 长时间窗口请使用按时间片并发、可断点续传的回填命令:
+        #   python -m src.crawler.backfill --start 2025-06-01 --slice-days 7
+        summarized_papers = None
+        # 之前运行中已经总结过、这次被跳过的论文
+        skipped = []
+        if summarizer:
+            # 边爬取边总结：每解析出一篇论文就立即交给 LLM
+            logger.info("\n步骤 2: 流式总结论文（与爬取并行）...")
+            # 结果流结束时全文提取和链接补全可能还没完成，论文和水位线等总结完成后再保存
+            fetched = []
+            watermarks = {}
+            if ingestor:
+                stream = ingestor.iter_papers(days_back=3, save=False, merged=fetched)
+            else:
+                stream = fetcher.iter_papers(days_back=3, save=False, watermarks=watermarks, fetched=fetched)
+            # 与前两天重叠的、已经总结过的论文直接跳过，只总结新论文和版本更新的论文
+            summarized_papers = summarizer.summarize_stream(
+                fetcher.with_links(fetcher.with_fulltext(fetcher.filter_unprocessed(stream, skipped)))
+            )
+            if ingestor:
+                ingestor.save_fetched(fetched)
+            else:
+                fetcher.finish_fetch(fetched, watermarks)
+            fetcher.mark_processed(summarized_papers)
+            papers = summarized_papers
+        else:
+            papers = (ingestor or fetcher).fetch_papers(days_back=3)
+        if not papers and not skipped:
             logger.warning("⚠️  过去2天没有找到符合条件的论文...")
             # logger.warning("⚠️  过去2天没有找到符合条件的论文，尝试扩大到7天...")
             # papers = fetcher.fetch_papers(days_back=7)
         
-        if papers:
-            fetcher.print_paper_summary(papers)
+        if papers or skipped:
+            if papers:
+                fetcher.print_paper_summary(papers)
+            else:
+                # 论文都已在之前的运行中总结过：照常记录运行，但不覆盖今天已经生成的报告
+                logger.info(f"✅ 找到的 {len(skipped)} 篇论文都已在之前的运行中总结过，没有新论文")
             # 更新统计信息
             stats['papers_count'] = len(papers)
+            stats['skipped_count'] = len(skipped)
             stats['categories_count'] = len(config.get('arxiv', {}).get('categories', []))
             stats['keywords_count'] = len(config.get('arxiv', {}).get('keywords', []))
         else:
@@ -71,26 +117,25 @@ def main():
             logger.info("   3. 修改类别范围")
             return
         
-        # 第二步 - 实现论文总结 ✅
-        logger.info("\n步骤 2: 总结论文...")
-        from src.summarizer.paper_summarizer import PaperSummarizer
-        
-        summarized_papers = None
+        # 第二步 - 实现论文总结 ✅（已在爬取时流式完成，这里生成每日报告）
         try:
-            summarizer = PaperSummarizer(config)
-            summarized_papers = summarizer.summarize_papers(papers)
-            
-            # 生成每日报告
-            logger.info("\n生成每日报告...")
-            report = summarizer.generate_daily_report(summarized_papers)
+            if not papers:
+                # 没有新论文时保留已有的每日报告（不写入、不上传空报告）
+                logger.info("\n没有新论文，跳过每日报告的生成和上传")
+            elif not summarizer:
+                raise RuntimeError("总结器未初始化")
+            else:
+                # 生成每日报告
+                logger.info("\n生成每日报告...")
+                report = summarizer.generate_daily_report(summarized_papers)
             
-            # 保存报告
-            report_path = f"data/summaries/report_{get_date_string()}.md"
-            from pathlib import Path
-            Path(report_path).parent.mkdir(parents=True, exist_ok=True)
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(report)
-            logger.info(f"📄 每日报告已保存到: {report_path}")
+                # 保存报告
+                report_path = f"data/summaries/report_{get_date_string()}.md"
+                from pathlib import Path
+                Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+                with open(report_path, 'w', encoding='utf-8') as f:
+                    f.write(report)
+                logger.info(f"📄 每日报告已保存到: {report_path}")
             
             # 更新统计信息
             stats['summaries_count'] = len(summarized_papers)
@@ -104,7 +149,7 @@ def main():
         # 第三步——创建 GitHub PR ✅
         logger.info("\n步骤 3: 创建 GitHub PR...")
         try:
-            if gh_token and config.get('github'):
+            if papers and gh_token and config.get('github'):
                 logger.info("\n创建 GitHub PR...")
                 report_path = f"data/summaries/report_{get_date_string()}.md"
                 #create_github_pr(config, gh_token, report_path)
@@ -124,6 +169,23 @@ def main():
         # 计算任务执行时间
         duration = time.time() - start_time
         
+        # 记录本次运行（storage.type: sqlite 时写入 runs 表）
+        try:
+            from src.storage import StorageFactory
+            StorageFactory.create_storage(config).record_run(
+                started_at, datetime.now(), task_success, stats=stats, error=error_msg
+            )
+        except Exception as e:
+            logger.warning(f"记录运行信息失败: {str(e)}")
+        
+        # 数据目录维护：归档旧的按日期命名的文件、重压缩旧词云、删除过期数据
+        if config.get('storage', {}).get('maintenance', {}).get('enabled', False):
+            try:
+                from src.storage.maintenance import DataMaintenance
+                DataMaintenance(config).run()
+            except Exception as e:
+                logger.warning(f"数据维护失败: {str(e)}")
+        
         # 发送邮件通知
         if notifier:
             logger.info("\n步骤 4: 发送邮件通知...")
@@ -109,6 +109,1181 @@ def test_save_load():
         print("   请先运行论文爬取测试")
 
 
+def test_watermark():
+    """测试增量水位线"""
+    print("\n" + "=" * 60)
+    print("测试 4: 增量水位线")
+    print("=" * 60)
+    
+    import tempfile
+    from datetime import datetime, timedelta, timezone
+    from types import SimpleNamespace
+    import arxiv
+    
+    config = load_config()
+    config['arxiv']['sort_by'] = 'submittedDate'
+    config['arxiv']['sort_order'] = 'descending'
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config['storage'] = {'json_path': tmp_dir}
+        fetcher = ArxivFetcher(config)
+        query = fetcher.build_query()
+        
+        assert fetcher._load_watermark(query) is None
+        
+        papers = [
+            {'id': '2501.00005v2', 'published': '2025-01-03T00:00:00+00:00'},
+            {'id': '2501.00001v1', 'published': '2025-01-02T00:00:00+00:00'},
+            {'id': '2501.00003v1', 'published': '2025-01-03T00:00:00+00:00'},
+        ]
+        # 被 max_results 截断的查询不推进水位线
+        assert fetcher._compute_watermarks(papers, {query: papers}, set(), True) == {}
+        # 有论文在合并截断时被丢弃的查询不推进水位线
+        assert fetcher._compute_watermarks(papers[:2], {query: papers}, {query}, True) == {}
+        
+        fetcher.save_watermarks(fetcher._compute_watermarks(papers, {query: papers}, {query}, True))
+        watermark = fetcher._load_watermark(query)
+        # 记录最新发布时间的全部 ID
+        assert watermark['ids'] == ['2501.00003', '2501.00005']
+        
+        def make_result(arxiv_id, day):
+            return SimpleNamespace(
+                entry_id=f"http://arxiv.org/abs/{arxiv_id}",
+                published=datetime(2025, 1, day, tzinfo=timezone.utc),
+            )
+        
+        assert fetcher._compare_watermark(make_result('2501.00009v1', 4), watermark) == 1
+        # 同一发布时间的 ID 不按顺序排列：较小或较大的新 ID 都是新论文
+        assert fetcher._compare_watermark(make_result('2501.00004v1', 3), watermark) == 1
+        assert fetcher._compare_watermark(make_result('2501.00002v1', 3), watermark) == 1
+        assert fetcher._compare_watermark(make_result('2501.00003v1', 3), watermark) == 0
+        assert fetcher._compare_watermark(make_result('2501.00005v3', 3), watermark) == 0
+        assert fetcher._compare_watermark(make_result('2501.00002v1', 2), watermark) == -1
+        
+        # 同一发布时间新到的论文与原水位线的 ID 合并
+        late = [{'id': '2501.00002v1', 'published': '2025-01-03T00:00:00+00:00'}]
+        fetcher.save_watermarks(fetcher._compute_watermarks(late, {query: late}, {query}, True))
+        assert fetcher._load_watermark(query)['ids'] == ['2501.00002', '2501.00003', '2501.00005']
+        
+        # 兼容旧格式（只记录一个 id）
+        old = {'published': '2025-01-03T00:00:00+00:00', 'id': '2501.00003'}
+        assert fetcher._compare_watermark(make_result('2501.00003v1', 3), old) == 0
+        assert fetcher._compare_watermark(make_result('2501.00002v1', 3), old) == 1
+    
+    # 实际的查询流程：结果流在 max_results 处结束时不算完整遍历
+    config['arxiv']['seen_index'] = {'enabled': False}
+    config['arxiv']['keyword_filter'] = 'remote'
+    published = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=1)
+    results = [
+        arxiv.Result(entry_id=f"http://arxiv.org/abs/{arxiv_id}", published=published, updated=published,
+                     title=arxiv_id)
+        for arxiv_id in ('2501.00007v1', '2501.00003v1', '2501.00005v1')
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config['storage'] = {'json_path': tmp_dir}
+        fetcher = ArxivFetcher(config)
+        query = fetcher.build_query()
+        fetcher.client = SimpleNamespace(
+            results=lambda search, page_size: iter(results[:search.max_results]),
+            plan_page_size=lambda *args: 10,
+            record_window=lambda *args: None,
+        )
+        
+        fetcher.max_results = 2
+        fetcher.fetch_papers(days_back=1, incremental=True, fan_out=None)
+        assert fetcher._load_watermark(query) is None
+        
+        fetcher.max_results = 10
+        papers = fetcher.fetch_papers(days_back=1, incremental=True, fan_out=None)
+        assert len(papers) == 3
+        assert fetcher._load_watermark(query)['ids'] == ['2501.00003', '2501.00005', '2501.00007']
+        
+        # 同一发布时间新出现的论文（ID 更小）不会被当作已获取
+        results.insert(1, arxiv.Result(entry_id="http://arxiv.org/abs/2501.00001v1", published=published,
+                                       updated=published, title='late'))
+        papers = fetcher.fetch_papers(days_back=1, incremental=True, fan_out=None)
+        assert [p['id'] for p in papers] == ['2501.00001v1']
+    
+    print("✅ 增量水位线测试通过\n")
+
+
+def test_fan_out():
+    """测试子查询拆分与合并去重"""
+    print("\n" + "=" * 60)
+    print("测试 5: 并发子查询")
+    print("=" * 60)
+    
+    config = load_config()
+    config['arxiv']['categories'] = ['cs.CV', 'cs.RO']
+    config['arxiv']['keywords'] = ['autonomous driving', '"autonomous driving" AND VLA']
+    config['arxiv']['max_results'] = 3
+    
+    fetcher = ArxivFetcher(config)
+    
+    category_queries = fetcher.build_sub_queries('category')
+    keyword_queries = fetcher.build_sub_queries('keyword')
+    assert len(category_queries) == 2 and category_queries[0].startswith('cat:cs.CV AND')
+    assert len(keyword_queries) == 2 and keyword_queries[0].startswith('(cat:cs.CV OR cat:cs.RO) AND')
+    print(f"按类别拆分: {category_queries}")
+    print(f"按关键词拆分: {keyword_queries}")
+    
+    # 模拟子查询：第二个子查询失败，不应影响第一个
+    def fake_iter_query(query, days_back, incremental, completed_queries=None):
+        if query == category_queries[1]:
+            raise RuntimeError("503 Service Unavailable")
+        yield {'id': '2501.00002v1', 'published': '2025-01-02T00:00:00+00:00'}
+        yield {'id': '2501.00001v1', 'published': '2025-01-01T00:00:00+00:00'}
+    
+    fetcher._iter_query = fake_iter_query
+    failed_queries = set()
+    results = list(fetcher._iter_queries(category_queries, days_back=1, incremental=False,
+                                         failed_queries=failed_queries))
+    assert failed_queries == {category_queries[1]}
+    assert [paper['id'] for query, paper in results] == ['2501.00002v1', '2501.00001v1']
+    
+    papers = fetcher._merge_papers([
+        [paper for query, paper in results],
+        [{'id': '2501.00002v1', 'published': '2025-01-02T00:00:00+00:00'},
+         {'id': '2501.00003v1', 'published': '2025-01-03T00:00:00+00:00'},
+         {'id': '2501.00004v1', 'published': '2025-01-04T00:00:00+00:00'}],
+    ])
+    assert [p['id'] for p in papers] == ['2501.00004v1', '2501.00003v1', '2501.00002v1']
+    
+    print("✅ 并发子查询测试通过\n")
+
+
+def test_rate_limiter():
+    """测试令牌桶限速与限流退避"""
+    print("\n" + "=" * 60)
+    print("测试 6: 限速器")
+    print("=" * 60)
+    
+    import tempfile
+    import time
+    from types import SimpleNamespace
+    from src.crawler.rate_limiter import TokenBucket, SQLiteTokenBucket
+    from src.crawler.arxiv_client import ArxivClient
+    
+    # 进程内令牌桶: 突发 2 个请求后按 20 次/秒补充
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.08 <= elapsed < 0.5, elapsed
+    print(f"进程内令牌桶: 4 次请求耗时 {elapsed:.3f} 秒")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 两个实例共享同一个数据库，模拟两个进程
+        db_path = f"{tmp_dir}/rate.db"
+        first = SQLiteTokenBucket(db_path, rate=20, capacity=1)
+        second = SQLiteTokenBucket(db_path, rate=20, capacity=1)
+        start = time.monotonic()
+        first.acquire()
+        second.acquire()
+        first.acquire()
+        elapsed = time.monotonic() - start
+        assert 0.08 <= elapsed < 0.5, elapsed
+        print(f"跨进程令牌桶: 3 次请求耗时 {elapsed:.3f} 秒")
+        
+        # 一个进程退避，另一个进程也需要等待
+        first.backoff(0.2)
+        start = time.monotonic()
+        second.acquire()
+        assert time.monotonic() - start >= 0.15
+    
+    # 客户端: 503 后退避重试，最终成功
+    feed = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        '<opensearch:totalResults>0</opensearch:totalResults></feed>'
+    )
+    responses = [
+        SimpleNamespace(status_code=503, headers={}, content=b''),
+        SimpleNamespace(status_code=200, headers={}, content=feed.encode('utf-8')),
+    ]
+    client = ArxivClient(TokenBucket(rate=100, capacity=1), backoff_base=0.05, backoff_max=0.1)
+    client._session = SimpleNamespace(get=lambda url, **kwargs: responses.pop(0))
+    result = client._parse_feed("http://export.arxiv.org/api/query?search_query=cat:cs.AI")
+    assert not responses and len(result.entries) == 0
+    
+    print("✅ 限速器测试通过\n")
+
+
+def test_iter_papers():
+    """测试流式获取"""
+    print("\n" + "=" * 60)
+    print("测试 7: 流式获取")
+    print("=" * 60)
+    
+    config = load_config()
+    config['arxiv']['categories'] = ['cs.CV', 'cs.RO']
+    config['arxiv']['max_results'] = 3
+    config['arxiv']['sort_by'] = 'submittedDate'
+    config['arxiv']['sort_order'] = 'descending'
+    
+    fetcher = ArxivFetcher(config)
+    
+    def fake_iter_query(query, days_back, incremental, completed_queries=None):
+        yield {'id': '2501.00002v1', 'title': 'B', 'published': '2025-01-02T00:00:00+00:00'}
+        yield {'id': f"2501.0000{len(query) % 7 + 3}v1", 'title': 'C', 'published': '2025-01-01T00:00:00+00:00'}
+        yield {'id': '2501.00009v1', 'title': 'D', 'published': '2025-01-01T00:00:00+00:00'}
+        if completed_queries is not None:
+            completed_queries.add(query)
+    
+    fetcher._iter_query = fake_iter_query
+    
+    # 单个查询：逐篇产出，不保存
+    stream = fetcher.iter_papers(days_back=1, save=False)
+    first = next(stream)
+    assert first['id'] == '2501.00002v1'
+    assert len([first] + list(stream)) == 3
+    
+    # 并发子查询：按 arXiv ID 去重并在 max_results 篇后停止
+    papers = list(fetcher.iter_papers(days_back=1, fan_out='category', save=False))
+    ids = [paper['id'] for paper in papers]
+    assert len(ids) == len(set(ids)) == 3
+    
+    # 在 max_results 篇处截断的查询不推进水位线，完整遍历的查询才推进
+    watermarks = {}
+    list(fetcher.iter_papers(days_back=1, incremental=True, save=False, watermarks=watermarks))
+    assert watermarks == {}
+    fetcher.max_results = 5
+    fetched = []
+    streamed = list(fetcher.iter_papers(days_back=1, incremental=True, save=False, watermarks=watermarks, fetched=fetched))
+    assert watermarks[fetcher.build_query()]['ids'] == ['2501.00002']
+    # 去重后的论文交给调用方，在下游处理完成后用 finish_fetch 保存
+    assert [id(p) for p in fetched] == [id(p) for p in streamed]
+    
+    print("✅ 流式获取测试通过\n")
+
+
+def test_backfill():
+    """测试时间片回填与断点续传"""
+    print("\n" + "=" * 60)
+    print("测试 8: 时间片回填")
+    print("=" * 60)
+    
+    import tempfile
+    from datetime import datetime, timedelta, timezone
+    from src.crawler.backfill import Backfiller
+    
+    config = load_config()
+    
+    slices = Backfiller.plan_slices(datetime(2025, 1, 1), datetime(2025, 1, 10), slice_days=4)
+    assert [(s.day, e.day) for s, e in slices] == [(1, 4), (5, 8), (9, 10)]
+    assert slices[0][1].hour == 23 and slices[0][1].minute == 59
+    # submittedDate 按 UTC 计算，时间片也是 UTC 时间
+    assert slices[0][0].tzinfo == timezone.utc
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config['storage'] = {'json_path': tmp_dir}
+        fetcher = ArxivFetcher(config)
+        query = fetcher.build_date_range_query(*slices[0])
+        assert query.endswith("submittedDate:[202501010000 TO 202501042359]")
+        
+        calls = []
+        failures = [5]
+        
+        def fake_fetch_date_range(start, end):
+            calls.append(start.day)
+            if start.day in failures:
+                failures.remove(start.day)
+                raise RuntimeError("503")
+            return [{'id': f"2501.{start.day:05d}v1", 'published': start.isoformat()}]
+        
+        fetcher.fetch_date_range = fake_fetch_date_range
+        backfiller = Backfiller(config, fetcher)
+        
+        # 第一次运行：一个时间片失败
+        try:
+            backfiller.run(datetime(2025, 1, 1), datetime(2025, 1, 10), slice_days=4)
+            raise AssertionError("应当报告失败的时间片")
+        except RuntimeError:
+            pass
+        
+        # 第二次运行：只重新获取失败的时间片
+        calls.clear()
+        papers = backfiller.run(datetime(2025, 1, 1), datetime(2025, 1, 10), slice_days=4)
+        assert calls == [5]
+        assert [p['id'] for p in papers] == ['2501.00009v1', '2501.00005v1', '2501.00001v1']
+        
+        # 包含今天（UTC）的时间片还没结束：结果照常合并，但不写入检查点，下次运行重新获取
+        today = datetime.now(timezone.utc)
+        start = today - timedelta(days=5)
+        calls.clear()
+        papers = backfiller.run(start, today, slice_days=4)
+        assert len(calls) == 2 and len(papers) == 2
+        calls.clear()
+        assert len(backfiller.run(start, today, slice_days=4)) == 2
+        assert calls == [(today - timedelta(days=1)).day]
+    
+    print("✅ 时间片回填测试通过\n")
+
+
+def test_response_cache():
+    """测试响应缓存与离线回放"""
+    print("\n" + "=" * 60)
+    print("测试 9: 响应缓存")
+    print("=" * 60)
+    
+    import os
+    import tempfile
+    import time
+    from types import SimpleNamespace
+    from src.crawler.rate_limiter import TokenBucket
+    from src.crawler.arxiv_client import ArxivClient
+    from src.crawler.response_cache import ResponseCache, CacheMissError
+    
+    url = "http://export.arxiv.org/api/query?search_query=cat:cs.AI&start=0&max_results=100"
+    feed = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        '<opensearch:totalResults>0</opensearch:totalResults></feed>'
+    ).encode('utf-8')
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ResponseCache(tmp_dir, ttl_seconds=60, max_size_mb=1)
+        
+        # 参数顺序不影响缓存键
+        assert cache.make_key(url) == cache.make_key(
+            "http://export.arxiv.org/api/query?max_results=100&start=0&search_query=cat:cs.AI")
+        assert cache.make_key(url) != cache.make_key(url.replace("start=0", "start=100"))
+        
+        # 在线模式：第一次请求网络并写入缓存，第二次直接命中
+        requests_made = []
+        
+        def fake_get(request_url, **kwargs):
+            requests_made.append(request_url)
+            return SimpleNamespace(status_code=200, headers={}, content=feed)
+        
+        client = ArxivClient(TokenBucket(rate=100, capacity=1), cache=cache)
+        client._session = SimpleNamespace(get=fake_get)
+        client._parse_feed(url)
+        client._parse_feed(url)
+        assert len(requests_made) == 1
+        
+        # 过期后重新请求，但离线回放仍可使用过期缓存
+        path = cache._path(cache.make_key(url))
+        os.utime(path, (time.time(), time.time() - 120))
+        assert cache.get(url) is None
+        offline = ArxivClient(TokenBucket(rate=100, capacity=1), cache=cache, offline=True)
+        offline._session = None
+        assert len(offline._parse_feed(url).entries) == 0
+        
+        try:
+            offline._parse_feed(url.replace("cs.AI", "cs.CV"))
+            raise AssertionError("离线模式下未命中应当报错")
+        except CacheMissError:
+            pass
+        
+        # 超出容量时按最近最少使用淘汰
+        small = ResponseCache(f"{tmp_dir}/small", ttl_seconds=0, max_size_mb=3.5 / 1024)
+        for i in range(3):
+            small.put(f"{url}&page={i}", b'x' * 1024)
+            os.utime(small._path(small.make_key(f"{url}&page={i}")), (time.time() - 10 + i, time.time()))
+        small.get(f"{url}&page=0")
+        small.put(f"{url}&page=3", b'x' * 1024)
+        assert small.get(f"{url}&page=0") is not None
+        assert small.get(f"{url}&page=1") is None
+        
+        # 总大小增量累加：容量以内的写入只在第一次扫描目录，超出容量时才再次扫描
+        scans = []
+        evict = small.evict
+        small.evict = lambda: scans.append(1) or evict()
+        small._total_size = None
+        small.put(f"{url}&page=1", b'x' * 100)
+        small.put(f"{url}&page=1", b'x' * 200)
+        small.put(f"{url}&page=4", b'x' * 100)
+        assert len(scans) == 1 and small._total_size == 3 * 1024 + 300
+        small.put(f"{url}&page=5", b'x' * 1024)
+        assert len(scans) == 2 and small._total_size <= small.max_size_bytes * small.EVICT_TARGET
+    
+    print("✅ 响应缓存测试通过\n")
+
+
+def test_progressive_fetch():
+    """测试逐步放宽时间窗口"""
+    print("\n" + "=" * 60)
+    print("测试 10: 逐步放宽时间窗口")
+    print("=" * 60)
+    
+    import tempfile
+    from datetime import datetime, timedelta
+    
+    config = load_config()
+    config['arxiv']['fan_out'] = None
+    config['arxiv']['incremental'] = False
+    
+    ages = [0.5, 1.5, 3, 5]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config['storage'] = {'json_path': tmp_dir}
+        fetcher = ArxivFetcher(config)
+        consumed = []
+        
+        def fake_iter_query(query, days_back, incremental, completed_queries=None):
+            assert days_back == 7
+            for i, age in enumerate(ages):
+                consumed.append(i)
+                published = (datetime.now() - timedelta(days=age)).isoformat()
+                yield {'id': f"2501.0000{i}v1", 'title': str(i), 'published': published}
+        
+        fetcher._iter_query = fake_iter_query
+        
+        # 2 天内已有足够论文：越过 2 天截止日期后立即停止
+        papers, days = fetcher.fetch_papers_progressive(windows=(2, 7), min_papers=2)
+        assert days == 2 and [p['id'] for p in papers] == ['2501.00000v1', '2501.00001v1']
+        assert consumed == [0, 1, 2]
+        
+        # 2 天内不够：同一次遍历中使用 7 天窗口的结果
+        consumed.clear()
+        papers, days = fetcher.fetch_papers_progressive(windows=(2, 7), min_papers=3)
+        assert days == 7 and len(papers) == 4
+        assert consumed == [0, 1, 2, 3]
+    
+    print("✅ 逐步放宽时间窗口测试通过\n")
+
+
+def test_seen_index():
+    """测试已处理论文索引"""
+    print("\n" + "=" * 60)
+    print("测试 11: 已处理论文索引")
+    print("=" * 60)
+    
+    import tempfile
+    from src.crawler.seen_index import SeenIndex, BloomFilter
+    
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"2501.{i:05d}")
+    assert all(f"2501.{i:05d}" in bloom for i in range(1000))
+    false_positives = sum(f"2502.{i:05d}" in bloom for i in range(10000))
+    assert false_positives < 300, false_positives
+    
+    paper_v1 = {'id': '2501.00001v1', 'updated': '2025-01-01T00:00:00+00:00'}
+    paper_v2 = {'id': '2501.00001v2', 'updated': '2025-01-05T00:00:00+00:00'}
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = load_config()
+        config['storage'] = {'json_path': tmp_dir}
+        config['arxiv']['seen_index'] = {'enabled': True, 'path': f"{tmp_dir}/seen.db"}
+        fetcher = ArxivFetcher(config)
+        index = fetcher.seen_index
+        
+        assert index.classify(paper_v1) == SeenIndex.NEW
+        
+        # 总结失败、回退为手动格式化的论文不记录
+        fetcher.mark_processed([dict(paper_v1), {'id': '2501.00002v1', 'summary_error': 'timeout'},
+                                {'id': '2501.00009v1', 'summary': '- [Paper 9]', 'summary_fallback': True}])
+        assert len(index) == 1
+        assert index.classify(paper_v1) == SeenIndex.PROCESSED
+        assert index.classify(paper_v2) == SeenIndex.UPDATED
+        
+        # 重新打开索引（Bloom 过滤器从数据库重建）
+        reopened = SeenIndex(f"{tmp_dir}/seen.db")
+        assert reopened.classify(paper_v1) == SeenIndex.PROCESSED
+        assert reopened.classify({'id': '2501.00002v1'}) == SeenIndex.NEW
+        
+        # 过滤时按索引分类，分类结果不写入论文（不会随论文保存）
+        papers = [dict(paper_v1), dict(paper_v2), {'id': '2501.00003v1'}]
+        skipped = []
+        assert [p['id'] for p in fetcher.filter_unprocessed(iter(papers), skipped)] == ['2501.00001v2', '2501.00003v1']
+        assert skipped == [paper_v1]
+        assert papers == [paper_v1, paper_v2, {'id': '2501.00003v1'}]
+        
+        # 旧版本不会覆盖新版本
+        reopened.mark_processed([paper_v2])
+        reopened.mark_processed([paper_v1])
+        assert reopened.classify(paper_v2) == SeenIndex.PROCESSED
+    
+    print("✅ 已处理论文索引测试通过\n")
+
+
+def test_paper_record():
+    """测试紧凑论文记录"""
+    print("\n" + "=" * 60)
+    print("测试 12: 论文记录")
+    print("=" * 60)
+    
+    import json
+    import tempfile
+    import tracemalloc
+    from src.crawler.paper import Paper
+    from src.utils import save_json, load_json
+    
+    data = {
+        'id': '2501.00001v1', 'title': 'A Paper', 'authors': ['Alice', 'Bob'],
+        'abstract': 'Abstract.', 'categories': ['cs.CV', 'cs.RO'], 'primary_category': 'cs.CV',
+        'published': '2025-01-01T00:00:00+00:00', 'updated': '2025-01-01T00:00:00+00:00',
+        'pdf_url': 'http://arxiv.org/pdf/2501.00001v1', 'entry_url': 'http://arxiv.org/abs/2501.00001v1',
+        'comment': None, 'journal_ref': None, 'doi': None, 'fetched_at': '2025-01-02T00:00:00',
+    }
+    
+    paper = Paper.from_dict(data)
+    assert not hasattr(paper, '__dict__')
+    assert paper['title'] == 'A Paper' and paper.get('summary') is None
+    assert paper.authors == ('Alice', 'Bob')
+    assert paper.to_dict() == data
+    assert list(paper.to_dict()) == list(data)
+    
+    # 类别字符串驻留，所有论文共享同一个对象
+    other = Paper.from_dict(dict(data, categories=[''.join(['cs.', 'CV'])]))
+    assert other.categories[0] is paper.categories[0]
+    
+    # 附加字段（如总结结果）不影响原记录
+    summarized = paper.copy()
+    summarized['summary'] = 'summary'
+    assert 'summary' in summarized and 'summary' not in paper
+    assert summarized.authors is paper.authors
+    
+    # 与 latest.json 格式兼容
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        save_json({'papers': [summarized]}, f"{tmp_dir}/latest.json")
+        loaded = load_json(f"{tmp_dir}/latest.json")['papers'][0]
+        assert loaded == dict(data, summary='summary')
+        assert Paper.from_dict(loaded) == summarized
+    assert json.loads(json.dumps(data)) == Paper.from_dict(data).to_dict()
+    
+    # 内存占用明显低于字典
+    def measure(factory):
+        tracemalloc.start()
+        records = [factory(dict(data, id=f"2501.{i:05d}v1", authors=['Alice', 'Bob'],
+                                categories=['cs.CV', 'cs.RO'])) for i in range(2000)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del records
+        return size
+    
+    dict_size = measure(dict)
+    paper_size = measure(Paper.from_dict)
+    print(f"2000 篇论文: 字典 {dict_size / 1024:.0f} KB, Paper {paper_size / 1024:.0f} KB")
+    assert paper_size < dict_size * 0.7
+    
+    print("✅ 论文记录测试通过\n")
+
+
+def test_keyword_matcher():
+    """测试关键词表达式引擎"""
+    print("\n" + "=" * 60)
+    print("测试 13: 关键词表达式")
+    print("=" * 60)
+    
+    from src.crawler.keyword_matcher import KeywordMatcher, KeywordSyntaxError, parse_expression
+    
+    # 编译为 arXiv 查询，与原有格式一致
+    matcher = KeywordMatcher(['autonomous driving', '"autonomous driving" AND VLA'])
+    assert matcher.to_arxiv() == (
+        '((ti:"autonomous driving" OR abs:"autonomous driving") OR '
+        '((ti:"autonomous driving" OR abs:"autonomous driving") AND (ti:"VLA" OR abs:"VLA")))'
+    )
+    assert KeywordMatcher(['end-to-end AND NOT survey']).to_arxiv() == (
+        '(((ti:"end-to-end" OR abs:"end-to-end") ANDNOT (ti:"survey" OR abs:"survey")))'
+    )
+    
+    # AND 优先于 OR，括号改变优先级
+    assert repr(parse_expression('a OR b AND c')) == "Or([Term('a'), And([Term('b'), Term('c')])])"
+    assert repr(parse_expression('(a OR b) AND c')) == "And([Or([Term('a'), Term('b')]), Term('c')])"
+    
+    for bad in ['"unterminated', 'a AND', '(a OR b', 'a )']:
+        try:
+            parse_expression(bad)
+            raise AssertionError(f"应当报告语法错误: {bad}")
+        except KeywordSyntaxError:
+            pass
+    
+    # 本地求值：短语必须是相邻的完整单词，忽略大小写和标点
+    matcher = KeywordMatcher([
+        '"autonomous driving" AND (VLA OR VLM)',
+        'end-to-end AND NOT survey',
+        'driving policy',
+    ])
+    assert matcher.matches('Autonomous driving with a VLA model')
+    assert matcher.matches('autonomous, driving: VLM')
+    assert not matcher.matches('autonomous VLA driving')
+    assert not matcher.matches('autonomous driving with VLAs')
+    assert matcher.matches('An End to End planner')
+    assert not matcher.matches('An end-to-end survey')
+    # 重叠的短语都能找到
+    assert matcher.matches('autonomous driving policy')
+    # 短语不跨越标题和摘要
+    assert not matcher.match_paper({'title': 'Learning to drive: autonomous', 'abstract': 'driving with VLA'})
+    assert KeywordMatcher([]).match_paper({'title': 'anything', 'abstract': ''})
+    
+    # 本地过滤模式：查询中不包含关键词，获取结果后在本地过滤
+    config = load_config()
+    config['arxiv']['categories'] = ['cs.CV']
+    config['arxiv']['keywords'] = ['"autonomous driving" AND VLA']
+    config['arxiv']['keyword_filter'] = 'local'
+    fetcher = ArxivFetcher(config)
+    assert fetcher.build_query() == 'cat:cs.CV'
+    assert fetcher.build_sub_queries('keyword') == ['cat:cs.CV']
+    
+    papers = [
+        {'title': 'VLA for autonomous driving', 'abstract': ''},
+        {'title': 'Image segmentation', 'abstract': 'A new backbone.'},
+    ]
+    assert [p['title'] for p in fetcher.keyword_matcher.filter(papers)] == ['VLA for autonomous driving']
+    
+    print("✅ 关键词表达式测试通过\n")
+
+
+def test_percolator():
+    """测试订阅匹配"""
+    print("\n" + "=" * 60)
+    print("测试 14: 订阅匹配")
+    print("=" * 60)
+    
+    import tempfile
+    from src.crawler.percolator import Percolator, ProfileRunner
+    
+    percolator = Percolator([
+        {'name': 'driving-vla', 'categories': ['cs.CV', 'cs.RO'],
+         'keywords': ['"autonomous driving" AND (VLA OR VLM)']},
+        {'name': 'numerical-algebra', 'categories': ['math.NA'],
+         'keywords': ['"linear system" OR preconditioner']},
+        {'name': 'robotics-all', 'categories': ['cs.RO']},
+        {'name': 'no-surveys', 'keywords': ['NOT survey']},
+    ])
+    assert percolator.categories == ['cs.CV', 'cs.RO', 'math.NA']
+    
+    papers = [
+        {'id': '1', 'title': 'A VLA model for autonomous driving', 'abstract': '', 'categories': ['cs.CV']},
+        {'id': '2', 'title': 'Preconditioner design', 'abstract': 'for a linear system', 'categories': ['math.NA']},
+        {'id': '3', 'title': 'Autonomous driving VLM survey', 'abstract': '', 'categories': ['cs.RO']},
+        {'id': '4', 'title': 'A preconditioner', 'abstract': '', 'categories': ['cs.CV']},
+    ]
+    assert percolator.match(papers[0]) == ['driving-vla', 'no-surveys']
+    assert percolator.match(papers[2]) == ['driving-vla', 'robotics-all']
+    # 命中了短语但类别不符
+    assert percolator.match(papers[3]) == ['no-surveys']
+    
+    results = percolator.percolate(papers)
+    assert [p['id'] for p in results['numerical-algebra']] == ['2']
+    assert [p['id'] for p in results['driving-vla']] == ['1', '3']
+    
+    # 共享爬取：只按类别并集查询一次，不调用 LLM 时只保存论文列表
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = load_config()
+        config['storage'] = {'json_path': tmp_dir}
+        runner = ProfileRunner(config, percolator=percolator)
+        assert runner.fetcher.build_query() == '(cat:cs.CV OR cat:cs.RO OR cat:math.NA)'
+        
+        runner.fetcher.iter_papers = lambda days_back, save: iter(papers)
+        results = runner.run(days_back=1, summarize=False)
+        assert len(results['robotics-all']) == 1
+        assert Path(f"{tmp_dir}/profiles/numerical-algebra").exists()
+        
+        # 调用 LLM 时：每篇论文总结一次，只保存到订阅目录，不覆盖主流程的最新总结
+        import logging
+        import src.summarizer.paper_summarizer as paper_summarizer
+        
+        class FakeLLMClient:
+            model = 'fake-model'
+            
+            def generate(self, prompt, system_prompt=None, max_tokens=None):
+                return "- [Fake](https://arxiv.org/abs/0000.00000)"
+            
+            def get_provider_name(self):
+                return 'Fake'
+        
+        saved_summaries = []
+        original = paper_summarizer.PaperSummarizer
+        
+        def fake_summarizer(config):
+            summarizer = original.__new__(original)
+            summarizer.config = config
+            summarizer.logger = logging.getLogger('daily_arxiv.summarizer')
+            summarizer.llm_client = FakeLLMClient()
+            summarizer._save_summaries = saved_summaries.extend
+            return summarizer
+        
+        paper_summarizer.PaperSummarizer = fake_summarizer
+        try:
+            results = runner.run(days_back=1, summarize=True)
+        finally:
+            paper_summarizer.PaperSummarizer = original
+        assert results['driving-vla'][0]['summary'].startswith('- [Fake]')
+        assert saved_summaries == []
+        assert list(Path(f"{tmp_dir}/profiles/driving-vla").glob('report_*.md'))
+    
+    print("✅ 订阅匹配测试通过\n")
+
+
+def test_fulltext():
+    """测试全文提取"""
+    print("\n" + "=" * 60)
+    print("测试 15: 全文提取")
+    print("=" * 60)
+    
+    import importlib.util
+    import tempfile
+    from src.crawler.fulltext import FullTextExtractor, _find_affiliations
+    
+    first_page = (
+        "DriveVLA: A Sample Paper\n"
+        "Alice Zhang1, Bob Li2\n"
+        "1 Tsinghua University, Beijing, China\n"
+        "2 Xiaomi EV Research Center\n"
+        "{alice, bob}@example.edu\n"
+        "Abstract\n"
+        "We evaluate on data from the University of Michigan.\n"
+    )
+    # 只取摘要之前的单位行，跳过邮箱行
+    assert _find_affiliations(first_page) == ['Tsinghua University, Beijing, China', 'Xiaomi EV Research Center']
+    
+    if importlib.util.find_spec('pypdf') is None:
+        print("⚠️  未安装 pypdf，跳过 PDF 解析测试")
+        print("✅ 全文提取测试通过\n")
+        return
+    
+    fixture = project_root / 'test' / 'fixtures' / 'sample_paper.pdf'
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        extractor = FullTextExtractor(cache_dir=tmp_dir, max_connections=2, max_processes=1)
+        papers = [
+            {'id': '2506.00001v1', 'pdf_url': str(fixture)},
+            {'id': '2506.00002v1', 'pdf_url': str(project_root / 'test' / 'fixtures' / 'missing.pdf')},
+        ]
+        extractor.process(papers)
+        assert papers[0]['affiliations'] == ['Tsinghua University, Beijing, China', 'Xiaomi EV Research Center']
+        assert papers[0]['code_urls'] == ['https://github.com/example/drive-vla']
+        # 下载失败的论文照常保留，不补充全文信息
+        assert 'affiliations' not in papers[1]
+        
+        # 同一版本再次处理时命中缓存，不再下载
+        extractor._download = lambda url: (_ for _ in ()).throw(AssertionError("不应重新下载"))
+        paper = {'id': '2506.00001v1', 'pdf_url': str(fixture)}
+        assert list(extractor.iter_process([paper]))[0]['code_urls'] == ['https://github.com/example/drive-vla']
+        assert 'Abstract' in extractor.load(paper)['text']
+        
+        # 新版本需要重新下载
+        assert extractor.load({'id': '2506.00001v2'}) is None
+    
+    print("✅ 全文提取测试通过\n")
+
+
+def test_feed_archive():
+    """测试原始条目归档与重新处理"""
+    print("\n" + "=" * 60)
+    print("测试 16: 原始条目归档")
+    print("=" * 60)
+    
+    import tempfile
+    import threading
+    from datetime import datetime
+    from types import SimpleNamespace
+    from src.crawler.feed_archive import FeedArchive
+    from src.crawler.rate_limiter import TokenBucket
+    from src.crawler.arxiv_client import ArxivClient
+    
+    def entry(arxiv_id, published, title, category='cs.AI'):
+        return (
+            f'<entry><id>http://arxiv.org/abs/{arxiv_id}</id>'
+            f'<updated>{published}</updated><published>{published}</published>'
+            f'<title>{title}</title><summary>An abstract about {title}.</summary>'
+            f'<author><name>Alice Zhang</name></author>'
+            f'<link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf"/>'
+            f'<arxiv:primary_category term="{category}" scheme="http://arxiv.org/schemas/atom"/>'
+            f'<category term="{category}" scheme="http://arxiv.org/schemas/atom"/></entry>'
+        )
+    
+    def page(*entries):
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom" '
+            'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+            'xmlns:arxiv="http://arxiv.org/schemas/atom">'
+            f'<opensearch:totalResults>{len(entries)}</opensearch:totalResults>'
+            + ''.join(entries) + '</feed>'
+        ).encode('utf-8')
+    
+    first = page(
+        entry('2506.00001v1', '2025-06-02T10:00:00Z', 'LLM agents for planning'),
+        entry('2506.00002v1', '2025-06-02T09:00:00Z', 'Sparse attention kernels'),
+        entry('2506.00003v1', '2025-06-01T09:00:00Z', 'Robot grasping', category='cs.RO'),
+    )
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 网络下载的页面经由客户端归档，按发布日期分区，重复的条目不再写入
+        archive = FeedArchive(tmp_dir)
+        client = ArxivClient(TokenBucket(rate=100, capacity=1), archive=archive)
+        client._session = SimpleNamespace(get=lambda url, **kwargs: SimpleNamespace(
+            status_code=200, headers={}, content=first))
+        client._parse_feed("http://export.arxiv.org/api/query?search_query=cat:cs.AI")
+        assert archive.partitions() == ['2025-06-01', '2025-06-02']
+        assert len(archive) == 3
+        assert archive.append_page(first) == 0
+        
+        # 新版本追加到原分区，重新处理时只保留新版本
+        assert archive.append_page(page(
+            entry('2506.00001v2', '2025-06-02T10:00:00Z', 'LLM agents for planning (revised)'))) == 1
+        
+        # 重新打开归档（从索引加载），按日期范围读取
+        reopened = FeedArchive(tmp_dir)
+        results = list(reopened.iter_results(start=datetime(2025, 6, 2), end=datetime(2025, 6, 2)))
+        assert sorted(r.entry_id.split('/')[-1] for r in results) == ['2506.00001v2', '2506.00002v1']
+        assert any(r.title.endswith('(revised)') for r in results)
+        
+        # 另一个实例（相当于另一个进程）追加的条目在写入前增量加载，不会重复归档
+        late = page(entry('2506.00004v1', '2025-06-02T11:00:00Z', 'Late entry'))
+        assert len(reopened) == 4
+        assert archive.append_page(late) == 1
+        assert reopened.append_page(late) == 0
+        
+        # 两个实例同时追加同一分区：偏移量和索引在锁内写入，每个数据块都能完整读回
+        def append(writer, offset):
+            for i in range(10):
+                writer.append_page(page(entry(f"2506.{100 + offset + i:05d}v1", '2025-06-03T09:00:00Z', f"P{i}")))
+        
+        threads = [threading.Thread(target=append, args=(writer, 10 * n))
+                   for n, writer in enumerate([archive, reopened])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(list(FeedArchive(tmp_dir).iter_entries(start=datetime(2025, 6, 3)))) == 20
+        
+        # 重新处理时按当前配置的类别和关键词在本地筛选
+        config = load_config()
+        config['arxiv'] = {
+            'categories': ['cs.AI'],
+            'keywords': ['LLM'],
+            'archive': {'enabled': True, 'dir': tmp_dir},
+            'cache': {'enabled': False},
+            'rate_limit': {'backend': 'memory'},
+        }
+        fetcher = ArxivFetcher(config)
+        papers = list(fetcher.iter_archived())
+        assert [p['id'] for p in papers] == ['2506.00001v2']
+        assert papers[0]['primary_category'] == 'cs.AI'
+    
+    print("✅ 原始条目归档测试通过\n")
+
+
+def test_shared_client():
+    """测试共享客户端与自适应页大小"""
+    print("\n" + "=" * 60)
+    print("测试 17: 共享客户端")
+    print("=" * 60)
+    
+    import copy
+    import arxiv
+    from types import SimpleNamespace
+    from urllib.parse import urlsplit, parse_qs
+    from src.crawler.rate_limiter import TokenBucket
+    from src.crawler.arxiv_client import ArxivClient, get_client
+    
+    # 配置相同的爬取器（如调度器的每次运行）共用一个客户端
+    config = load_config()
+    assert ArxivFetcher(config).client is ArxivFetcher(copy.deepcopy(config)).client
+    other = copy.deepcopy(config)
+    other['arxiv']['client'] = {'page_size': 50}
+    assert get_client(other) is not get_client(config)
+    assert get_client(other).page_size == 50
+    
+    # 页大小：不超过结果数上限；观察过每日论文数后按时间窗口一次取完
+    client = ArxivClient(TokenBucket(rate=100, capacity=1), page_size=100)
+    query = 'cat:cs.AI'
+    assert client.plan_page_size(query, limit=20, days_back=2) == 20
+    assert client.plan_page_size(query, limit=None, days_back=2) == 100
+    client.record_window(query, 300, 3)
+    assert client.plan_page_size(query, limit=None, days_back=2) == 250
+    assert client.plan_page_size(query, limit=1000, days_back=2) == 250
+    assert client.plan_page_size(query, limit=20, days_back=2) == 20
+    assert client.plan_page_size(query, limit=None, days_back=365) == 2000
+    
+    # 每次搜索使用各自的页大小
+    requested = []
+    empty = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        '<opensearch:totalResults>0</opensearch:totalResults></feed>'
+    ).encode('utf-8')
+    
+    def fake_get(url, **kwargs):
+        requested.append((parse_qs(urlsplit(url).query)['max_results'][0], kwargs.get('timeout')))
+        return SimpleNamespace(status_code=200, headers={}, content=empty)
+    
+    client._session = SimpleNamespace(get=fake_get)
+    assert list(client.results(arxiv.Search(query=query, max_results=None), page_size=250)) == []
+    assert list(client.results(arxiv.Search(query=query, max_results=None))) == []
+    assert requested == [('250', 30), ('100', 30)]
+    
+    print("✅ 共享客户端测试通过\n")
+
+
+def test_sources():
+    """测试多来源采集"""
+    print("\n" + "=" * 60)
+    print("测试 18: 多来源采集")
+    print("=" * 60)
+    
+    import json
+    import tempfile
+    import time
+    from datetime import datetime, timezone
+    from src.crawler.paper import Paper
+    from src.crawler.sources import SourceIngestor, normalize_doi, title_fingerprint
+    
+    assert normalize_doi('https://doi.org/10.1109/CVPR.2025.001') == '10.1109/cvpr.2025.001'
+    assert normalize_doi('not a doi') is None
+    assert title_fingerprint('LLM Agents for Planning!') == title_fingerprint('LLM agents  for planning')
+    assert title_fingerprint('Café-Net') == 'cafe net'
+    
+    now = datetime.now(timezone.utc)
+    now_ms = int(now.timestamp() * 1000)
+    openreview = {'notes': [
+        # API v2 格式；与 arXiv 论文标题相同（大小写和标点不同）
+        {'id': 'abc', 'forum': 'abc', 'cdate': now_ms, 'mdate': now_ms, 'content': {
+            'title': {'value': 'LLM agents for planning.'},
+            'authors': {'value': ['Alice Zhang']},
+            'abstract': {'value': 'Autonomous driving with LLM agents.'},
+            'venue': {'value': 'ICLR 2025 Poster'},
+        }},
+        {'id': 'def', 'forum': 'def', 'cdate': now_ms, 'content': {
+            'title': {'value': 'VLM planners for autonomous driving'},
+            'authors': {'value': ['Bob Li']},
+            'abstract': {'value': 'A VLM for autonomous driving.'},
+        }},
+        # 不匹配关键词
+        {'id': 'ghi', 'forum': 'ghi', 'cdate': now_ms, 'content': {
+            'title': {'value': 'Protein folding'}, 'abstract': {'value': 'Biology.'},
+        }},
+    ]}
+    rss = f"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/">
+<channel><title>CVPR 2025</title>
+<item><title>End-to-end VLA for autonomous driving</title><link>https://example.org/cvpr/1</link>
+<description>&lt;p&gt;A VLA model for autonomous driving.&lt;/p&gt;</description>
+<author>Carol Wu</author><prism:doi>10.1109/CVPR.2025.001</prism:doi>
+<pubDate>{now:%a, %d %b %Y %H:%M:%S} +0000</pubDate><category>Autonomous Driving</category></item>
+<item><title>Old autonomous driving VLM paper</title><link>https://example.org/cvpr/2</link>
+<description>autonomous driving VLM</description><pubDate>Mon, 01 Jan 2024 00:00:00 +0000</pubDate></item>
+</channel></rss>"""
+    
+    arxiv_papers = [
+        Paper(id='2506.00001v1', title='LLM Agents for Planning', abstract='autonomous driving LLM',
+              categories=['cs.AI'], published=now.isoformat(), pdf_url='http://arxiv.org/pdf/2506.00001v1'),
+        Paper(id='2506.00002v1', title='A VLA model', abstract='autonomous driving VLA', categories=['cs.RO'],
+              published=now.isoformat(), doi='10.1109/cvpr.2025.001'),
+        # 只有 arXiv 来源的论文（链接补全只查询 arXiv 论文）
+        Paper(id='2506.08052v2', title='ReCogDrive', abstract='autonomous driving VLM', categories=['cs.CV'],
+              published=now.isoformat()),
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        Path(f"{tmp_dir}/openreview.json").write_text(json.dumps(openreview), encoding='utf-8')
+        Path(f"{tmp_dir}/cvpr.xml").write_text(rss, encoding='utf-8')
+        
+        config = load_config()
+        config['storage'] = {'json_path': tmp_dir}
+        config['arxiv']['seen_index'] = {'enabled': False}
+        config['sources'] = {'adapters': [
+            {'type': 'arxiv'},
+            {'type': 'openreview', 'name': 'iclr2025', 'url': f"{tmp_dir}/openreview.json"},
+            {'type': 'rss', 'name': 'cvpr2025', 'url': f"file://{tmp_dir}/cvpr.xml"},
+        ]}
+        ingestor = SourceIngestor(config)
+        
+        # 每个来源都耗时 0.3 秒，并发运行时总耗时接近最慢的来源
+        def slow(iter_papers):
+            def wrapper(days_back=1, **kwargs):
+                time.sleep(0.3)
+                yield from iter_papers(days_back=days_back, **kwargs)
+            return wrapper
+        
+        ingestor.fetcher.iter_papers = lambda days_back, save, watermarks: iter(p.copy() for p in arxiv_papers)
+        for source in ingestor.sources:
+            source.iter_papers = slow(source.iter_papers)
+        
+        # 与 arXiv 单一来源相同，保存前补充链接
+        from src.crawler.enrichment import LinkEnricher
+        ingestor.fetcher.enricher = LinkEnricher(str(project_root / 'test' / 'fixtures' / 'links.json'),
+                                                 cache_path=f"{tmp_dir}/links.db")
+        
+        start = time.time()
+        papers = ingestor.fetch_papers(days_back=3)
+        elapsed = time.time() - start
+        assert elapsed < 0.8, f"来源应当并发运行，实际耗时 {elapsed:.2f} 秒"
+        
+        by_title = {title_fingerprint(p['title']): p for p in papers}
+        assert len(papers) == 4, [p['id'] for p in papers]
+        
+        # 标题指纹相同的 arXiv / OpenReview 论文合并为一篇
+        merged = by_title['llm agents for planning']
+        assert sorted(merged['sources']) == ['arxiv', 'iclr2025']
+        # DOI 相同的 arXiv / RSS 论文合并为一篇，并补充缺失的字段
+        merged = next(p for p in papers if normalize_doi(p.get('doi')) == '10.1109/cvpr.2025.001')
+        assert sorted(merged['sources']) == ['arxiv', 'cvpr2025']
+        
+        openreview_paper = by_title['vlm planners for autonomous driving']
+        assert openreview_paper['id'] == 'openreview:def'
+        assert openreview_paper['entry_url'] == 'https://openreview.net/forum?id=def'
+        assert openreview_paper['published'].startswith(f"{now:%Y-%m-%d}")
+        
+        # 结果按原有格式保存，包含补充的链接
+        saved = json.loads(Path(f"{tmp_dir}/latest.json").read_text(encoding='utf-8'))
+        assert saved['count'] == 4
+        linked = next(p for p in saved['papers'] if p['id'] == '2506.08052v2')
+        assert linked['code_urls'] == ['https://github.com/xiaomi-research/recogdrive']
+        assert linked['datasets'][0]['name'] == 'NAVSIM'
+        assert by_title['recogdrive']['code_urls'] == linked['code_urls']
+        
+        # 已产出的论文不会被之后到达的重复记录修改
+        fetched = []
+        streamed = list(ingestor.iter_papers(days_back=3, save=False, merged=fetched))
+        assert all(len(p['sources']) == 1 for p in streamed)
+        
+        # 下游（全文提取、链接补全）在产出的副本上补充的字段，保存时合并回内部记录
+        for paper in streamed:
+            paper['code_urls'] = [f"https://github.com/example/{paper['id']}"]
+        ingestor.save_fetched(fetched)
+        saved = json.loads(Path(f"{tmp_dir}/latest.json").read_text(encoding='utf-8'))
+        assert all(p['code_urls'] == [f"https://github.com/example/{p['id']}"] for p in saved['papers'])
+        assert sorted(len(p['sources']) for p in saved['papers']) == [1, 1, 2, 2]
+    
+    print("✅ 多来源采集测试通过\n")
+
+
+def test_link_enrichment():
+    """测试代码与数据集链接补全"""
+    print("\n" + "=" * 60)
+    print("测试 19: 链接补全")
+    print("=" * 60)
+    
+    import sqlite3
+    import tempfile
+    from src.crawler.enrichment import LinkEnricher
+    
+    fixture = str(project_root / 'test' / 'fixtures' / 'links.json')
+    papers = [
+        {'id': '2506.08052v2', 'code_urls': ['https://github.com/xiaomi-research/recogdrive']},
+        {'id': '2506.00001v1'},
+        {'id': '2506.00003v1'},
+        {'id': 'openreview:abc', 'source': 'iclr2025'},
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        enricher = LinkEnricher(fixture, cache_path=f"{tmp_dir}/links.db", batch_size=2)
+        lookups = []
+        lookup = enricher._lookup
+        enricher._lookup = lambda ids: lookups.append(list(ids)) or lookup(ids)
+        
+        enricher.process(papers)
+        # 3 篇 arXiv 论文按 batch_size=2 合并为 2 次查询，非 arXiv 论文不查询
+        assert lookups == [['2506.08052', '2506.00001'], ['2506.00003']]
+        assert papers[0]['code_urls'] == ['https://github.com/xiaomi-research/recogdrive']
+        assert papers[0]['datasets'][0]['name'] == 'NAVSIM'
+        assert papers[1]['code_urls'] == ['https://github.com/example/drive-vla']
+        assert papers[1]['datasets'] == [{'name': 'nuScenes', 'url': ''}]
+        assert 'code_urls' not in papers[2]
+        
+        # 再次处理（包括新版本）全部命中缓存，没有找到链接的结果也被缓存
+        lookups.clear()
+        again = [{'id': '2506.08052v3'}, {'id': '2506.00003v1'}]
+        assert [p.get('code_urls') for p in enricher.iter_process(again)] == [
+            ['https://github.com/xiaomi-research/recogdrive'], None]
+        assert lookups == []
+        
+        # 没有找到链接的结果过期后重新查询，找到的结果仍然有效
+        with sqlite3.connect(f"{tmp_dir}/links.db") as conn:
+            conn.execute("UPDATE links SET checked_at = checked_at - 2 * 86400")
+        enricher.process([{'id': '2506.08052v1'}, {'id': '2506.00003v1'}])
+        assert lookups == [['2506.00003']]
+    
+        # 上游暂时没有新论文时立即产出已到达的论文，不等凑满 batch_size；上游的错误在产出后抛出
+        import threading
+        arrived = threading.Event()
+        
+        def slow_upstream():
+            yield {'id': '2506.08052v1'}
+            if not arrived.wait(5):
+                raise RuntimeError("第一篇论文没有及时产出")
+            yield {'id': '2506.00001v1'}
+            raise ConnectionError("上游中断")
+        
+        stream = enricher.iter_process(slow_upstream())
+        assert next(stream)['code_urls'] == ['https://github.com/xiaomi-research/recogdrive']
+        arrived.set()
+        assert next(stream)['datasets'] == [{'name': 'nuScenes', 'url': ''}]
+        try:
+            next(stream)
+            assert False, "上游错误应该抛出"
+        except ConnectionError:
+            pass
+    
+    print("✅ 链接补全测试通过\n")
+
+
+def test_author_index():
+    """测试作者与单位规范化索引"""
+    print("\n" + "=" * 60)
+    print("测试 20: 作者索引")
+    print("=" * 60)
+    
+    import tempfile
+    from src.crawler.author_index import AuthorIndex, split_name
+    
+    assert split_name("Wang, Xinggang") == (['xinggang'], 'wang')
+    assert split_name("X.-G. Wang Jr.") == (['x', 'g'], 'wang')
+    assert split_name("José Álvarez") == (['jose'], 'alvarez')
+    
+    papers = [
+        {'id': '2506.00001v1', 'authors': ['X. Wang', 'Hao Li'],
+         'affiliations': ['Huazhong University of Science and Technology']},
+        {'id': '2506.00002v1', 'authors': ['Xinggang Wang', 'Wang, Xinggang'],
+         'affiliations': ['the Huazhong University of Science & Technology']},
+        {'id': '2506.00003v1', 'authors': ['Xiaoming Wang', 'H. Li']},
+        {'id': '2506.00004v1', 'authors': ['X. Wang']},
+    ]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = AuthorIndex(f"{tmp_dir}/authors.db")
+        assert index.add_papers(papers) == 4
+        
+        # 缩写作者升级为全名；同一论文中的重复写法只计一次
+        xinggang = index.resolve("Xinggang Wang")
+        assert index.name(xinggang) == "Xinggang Wang"
+        assert papers[0]['author_ids'][0] == xinggang
+        assert papers[1]['author_ids'] == [xinggang]
+        assert index.resolve("H. Li") == index.resolve("Hao Li")
+        
+        # 出现第二个 X 开头的全名作者后，之后的缩写名单独计数
+        assert index.resolve("Xiaoming Wang") != xinggang
+        assert papers[3]['author_ids'][0] not in (xinggang, index.resolve("Xiaoming Wang"))
+        
+        counts = index.count_authors(papers)
+        assert counts[xinggang] == 2 and counts[index.resolve("Hao Li")] == 2
+        assert list(index.count_affiliations(papers).values()) == [2]
+        
+        # 重新加载后 ID 不变，已索引的论文不重复计数
+        reloaded = AuthorIndex(f"{tmp_dir}/authors.db")
+        assert reloaded.resolve("X. Wang") == index.resolve("X. Wang")
+        assert reloaded.resolve("Wang, Xinggang") == xinggang
+        assert reloaded.add_papers([{'id': '2506.00002v2', 'authors': ['Xinggang Wang']}]) == 0
+        assert reloaded.paper_count(xinggang) == 2
+        assert len(reloaded) == len(index) == 4
+    
+        # 两个进程各自加载的索引交替写入：ID 由数据库分配，不会重复，写入前先加载对方的作者
+        index.add_papers([{'id': '2506.00005v1', 'authors': ['Alice Zhang']}])
+        reloaded.add_papers([{'id': '2506.00006v1', 'authors': ['Bob Chen', 'Alice Zhang']}])
+        alice, bob = reloaded.resolve("Alice Zhang"), reloaded.resolve("Bob Chen")
+        assert alice == index.resolve("Alice Zhang") and bob != alice
+        assert reloaded.paper_count(alice) == 2
+        
+        # 统计只查询索引，不写入未索引的论文和作者
+        counts = index.count_author_names([{'id': '2506.00007v1', 'authors': ['Bob Chen', 'Carol Wu']}])
+        assert counts == {'Bob Chen': 1, 'Carol Wu': 1}
+        assert index.resolve("Carol Wu") is None and len(AuthorIndex(f"{tmp_dir}/authors.db")) == 6
+    
+    print("✅ 作者索引测试通过\n")
+
+
 def main():
     """运行所有测试"""
     print("\n" + "=" * 70)
@@ -125,6 +1300,57 @@ def main():
         # 测试 3: 数据保存和加载
         test_save_load()
         
+        # 测试 4: 增量水位线
+        test_watermark()
+        
+        # 测试 5: 并发子查询
+        test_fan_out()
+        
+        # 测试 6: 限速器
+        test_rate_limiter()
+        
+        # 测试 7: 流式获取
+        test_iter_papers()
+        
+        # 测试 8: 时间片回填
+        test_backfill()
+        
+        # 测试 9: 响应缓存
+        test_response_cache()
+        
+        # 测试 10: 逐步放宽时间窗口
+        test_progressive_fetch()
+        
+        # 测试 11: 已处理论文索引
+        test_seen_index()
+        
+        # 测试 12: 论文记录
+        test_paper_record()
+        
+        # 测试 13: 关键词表达式
+        test_keyword_matcher()
+        
+        # 测试 14: 订阅匹配
+        test_percolator()
+        
+        # 测试 15: 全文提取
+        test_fulltext()
+        
+        # 测试 16: 原始条目归档
+        test_feed_archive()
+        
+        # 测试 17: 共享客户端
+        test_shared_client()
+        
+        # 测试 18: 多来源采集
+        test_sources()
+        
+        # 测试 19: 链接补全
+        test_link_enrichment()
+        
+        # 测试 20: 作者索引
+        test_author_index()
+        
         print("\n" + "=" * 70)
         print("✅ 所有测试完成！")
         print("=" * 70)
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+测试存储层
+
+这个脚本用于测试 SQLite / JSONL 存储、JSON 编解码、数据目录维护和历史论文库是否正常工作
+"""
+import sys
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+
+def make_storage_config(tmp_dir: str, storage_type: str = 'json', **options) -> dict:
+    """生成数据都写到临时目录的存储配置
+    
+    Args:
+        tmp_dir: 临时目录
+        storage_type: 存储类型 json / jsonl / sqlite
+        **options: 其他 storage 配置项（如 retention_days、maintenance）
+    
+    Returns:
+        配置字典
+    """
+    return {'storage': {
+        'type': storage_type,
+        'json_path': str(tmp_dir),
+        'sqlite_path': f"{tmp_dir}/arxiv.db",
+        **options,
+    }}
+
+
+def test_sqlite_storage():
+    """测试 SQLite 存储"""
+    print("\n" + "=" * 60)
+    print("测试 1: SQLite 存储")
+    print("=" * 60)
+    
+    import sqlite3
+    import tempfile
+    from datetime import datetime, timedelta
+    from src.storage import StorageFactory
+    from src.crawler.paper import Paper
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = StorageFactory.create_storage(make_storage_config(tmp_dir, 'sqlite', retention_days=30))
+        assert storage.load_latest_papers() is None and storage.latest_date() is None
+        
+        with sqlite3.connect(f"{tmp_dir}/arxiv.db") as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        
+        storage.save_papers([
+            Paper(id='2506.00001v1', title='A', categories=['cs.CV', 'cs.AI'], published='2025-06-01T00:00:00'),
+            {'id': '2506.00002v1', 'title': 'B', 'categories': ['cs.RO'], 'published': '2025-06-02T00:00:00'},
+        ])
+        # 新一次保存成为最新论文，新版本覆盖旧版本
+        storage.save_papers([
+            {'id': '2506.00002v2', 'title': 'B2', 'categories': ['cs.RO', 'cs.CV'], 'published': '2025-06-02T00:00:00'},
+            {'id': '2506.00003v1', 'title': 'C', 'categories': ['cs.CV'], 'published': '2025-06-03T00:00:00'},
+        ])
+        latest = storage.load_latest_papers()
+        assert [p['id'] for p in latest['papers']] == ['2506.00002v2', '2506.00003v1']
+        assert latest['count'] == 2 and latest['date'] == storage.latest_date()
+        
+        papers, total = storage.query_papers(category='cs.CV', offset=1, limit=1)
+        assert total == 2 and [p['id'] for p in papers] == ['2506.00003v1']
+        assert storage.category_counts() == {'cs.CV': 2, 'cs.RO': 1}
+        
+        storage.save_summaries([{'id': '2506.00002v2', 'summary': '总结'}], llm_provider='DeepSeek', llm_model='deepseek-chat')
+        assert storage.get_paper('2506.00002')['summary'] == '总结'
+        assert storage.get_paper('2506.00001v1')['title'] == 'A'
+        assert storage.load_latest_summaries()['llm_model'] == 'deepseek-chat'
+        
+        storage.save_analysis({'total_papers': 2})
+        storage.record_run(datetime.now(), datetime.now(), True, stats={'papers_count': 2})
+        assert [p['id'] for p in storage.load_daily('papers', latest['date'])] == ['2506.00002v2', '2506.00003v1']
+        assert storage.load_daily('analysis', latest['date']) == {'total_papers': 2}
+        assert storage.load_daily('summaries', '2025-01-01') is None
+        assert storage.get_stats() == {
+            'papers_count': 2, 'summaries_count': 1, 'analysis_available': True, 'last_update': latest['date'],
+        }
+        
+        # 论文出现在新批次中后，之前的批次仍包含它
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        with sqlite3.connect(f"{tmp_dir}/arxiv.db") as conn:
+            first = conn.execute("SELECT MIN(saved_at) FROM paper_batches").fetchone()[0]
+            conn.execute("UPDATE paper_batches SET saved_at = ? WHERE saved_at = ?", (f"{yesterday}T12:00:00", first))
+        assert [p['id'] for p in storage.load_daily('papers', yesterday)] == ['2506.00001v1', '2506.00002v2']
+        
+        # 超过 retention_days 的数据在下一次保存时清理
+        with sqlite3.connect(f"{tmp_dir}/arxiv.db") as conn:
+            old = (datetime.now() - timedelta(days=31)).isoformat()
+            conn.execute("UPDATE papers SET saved_at = ? WHERE base_id = '2506.00001'", (old,))
+        storage.save_papers([{'id': '2506.00004v1', 'title': 'D', 'categories': ['cs.LG']}])
+        assert storage.get_paper('2506.00001') is None
+        with sqlite3.connect(f"{tmp_dir}/arxiv.db") as conn:
+            assert conn.execute("SELECT COUNT(*) FROM paper_categories WHERE base_id = '2506.00001'").fetchone()[0] == 0
+            assert conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 1
+    
+    print("✅ SQLite 存储测试通过\n")
+
+
+def test_jsonl_storage():
+    """测试追加写入的 JSONL 存储"""
+    print("\n" + "=" * 60)
+    print("测试 2: JSONL 存储")
+    print("=" * 60)
+    
+    import tempfile
+    from src.storage import StorageFactory
+    from src.crawler.paper import Paper
+    from src.utils import get_date_string
+    
+    def create_storage(tmp_dir):
+        storage = StorageFactory.create_storage(make_storage_config(tmp_dir, 'jsonl'))
+        # 总结目录固定为 data/summaries，测试中改到临时目录
+        storage.dirs['summaries'] = Path(tmp_dir)
+        return storage
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = create_storage(tmp_dir)
+        assert storage.load_latest_papers() is None and storage.get_paper('2506.00001') is None
+        
+        storage.save_papers([
+            Paper(id='2506.00001v1', title='A', categories=['cs.CV']),
+            {'id': '2506.00002v1', 'title': 'B', 'categories': ['cs.RO']},
+        ])
+        data_path = Path(tmp_dir) / f"papers-{get_date_string()}.jsonl"
+        size = data_path.stat().st_size
+        
+        # 第二批只追加新记录；另一个实例（如 Web 服务）增量读取索引
+        reader = create_storage(tmp_dir)
+        assert reader.get_paper('2506.00002')['title'] == 'B'
+        storage.save_papers([{'id': '2506.00002v2', 'title': 'B2', 'categories': ['cs.RO', 'cs.CV']}])
+        assert data_path.stat().st_size > size
+        assert reader.get_paper('2506.00002')['id'] == '2506.00002v2'
+        assert reader.get_paper('2506.00001v1')['title'] == 'A'
+        
+        latest = reader.load_latest_papers()
+        assert [p['id'] for p in latest['papers']] == ['2506.00002v2'] and latest['count'] == 1
+        assert reader.query_papers(category='cs.CV') == (latest['papers'], 1)
+        
+        storage.save_summaries([{'id': '2506.00002v2', 'summary': '总结'}], llm_provider='DeepSeek', llm_model='deepseek-chat')
+        assert reader.get_paper('2506.00002')['summary'] == '总结'
+        assert reader.load_latest_summaries()['llm_provider'] == 'DeepSeek'
+        assert [p['id'] for p in reader.load_daily('papers', get_date_string())] == ['2506.00002v2']
+        
+        # 写入中断留下的不完整索引行被忽略，指针仍指向已提交的批次
+        with open(data_path.with_name(data_path.name[:-len('.jsonl')] + '.index.jsonl'), 'a') as f:
+            f.write('{"id": "2506.00009v1", "base_id": "2506.0')
+        assert reader.get_paper('2506.00009') is None
+        assert reader.load_latest_papers()['papers'] == latest['papers']
+        storage.save_papers([{'id': '2506.00005v1', 'title': 'E'}])
+        assert reader.get_paper('2506.00005')['title'] == 'E'
+        
+        # 同一批记录被其他进程的批次隔开时逐条读取，不混入其他批次
+        pointer = storage._load_pointer('papers')
+        storage._write_batch(data_path, 'other', [{'id': '2506.00006v1'}], [b'{"id": "2506.00006v1"}\n'])
+        storage._write_batch(data_path, pointer['batch'], [{'id': '2506.00007v1'}], [b'{"id": "2506.00007v1"}\n'])
+        assert [p['id'] for p in reader.load_latest_papers()['papers']] == ['2506.00005v1', '2506.00007v1']
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 两个实例（模拟两个进程）同时追加同一分区，每一批的偏移量和索引都完整
+        import threading
+        writers = [create_storage(tmp_dir), create_storage(tmp_dir)]
+        
+        def write(storage, prefix):
+            for i in range(20):
+                storage.save_papers([{'id': f'{prefix}.{i:05d}v1', 'title': prefix * 200}])
+        
+        threads = [threading.Thread(target=write, args=(storage, prefix))
+                   for storage, prefix in zip(writers, ['2506', '2507'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        reader = create_storage(tmp_dir)
+        for prefix in ['2506', '2507']:
+            for i in range(20):
+                assert reader.get_paper(f'{prefix}.{i:05d}')['title'] == prefix * 200
+        assert len(reader.load_daily('papers', get_date_string())) == 1
+        assert not list(Path(tmp_dir).glob('*.tmp'))
+    
+    print("✅ JSONL 存储测试通过\n")
+
+
+def test_json_codec():
+    """测试 JSON 编解码层"""
+    print("\n" + "=" * 60)
+    print("测试 3: JSON 编解码")
+    print("=" * 60)
+    
+    import tempfile
+    from src.utils import save_json, load_json, dumps_json, loads_json, JSON_CODEC
+    from src.crawler.paper import Paper
+    
+    print(f"JSON 编解码器: {JSON_CODEC}")
+    paper = Paper(id='2506.08052v2', title='标题', authors=['Xinggang Wang'], categories=['cs.CV'],
+                  extra={'summary': '总结', 'author_ids': [1]})
+    data = {'date': '2025-06-10', 'count': 1, 'papers': [paper]}
+    
+    # 紧凑格式不含缩进和换行，非 ASCII 字符不转义
+    compact = dumps_json(data)
+    assert b'\n' not in compact and '标题'.encode('utf-8') in compact
+    assert loads_json(compact) == loads_json(dumps_json(data, pretty=True))
+    assert b'\n  ' in dumps_json(data, pretty=True)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        save_json(data, f"{tmp_dir}/latest.json")
+        save_json([paper], f"{tmp_dir}/papers.json", pretty=True)
+        
+        # 直接解码为论文记录（字典和列表两种文件格式）
+        loaded = load_json(f"{tmp_dir}/latest.json", record_type=Paper)
+        assert isinstance(loaded['papers'][0], Paper) and loaded['papers'][0].to_dict() == paper.to_dict()
+        assert load_json(f"{tmp_dir}/papers.json", record_type=Paper)[0]['summary'] == '总结'
+        assert load_json(f"{tmp_dir}/latest.json")['papers'][0]['id'] == '2506.08052v2'
+    
+    print("✅ JSON 编解码测试通过\n")
+
+
+def test_data_maintenance():
+    """测试数据目录的归档、图片重压缩和过期清理"""
+    print("\n" + "=" * 60)
+    print("测试 4: 数据目录维护")
+    print("=" * 60)
+    
+    import tempfile
+    from datetime import datetime
+    from PIL import Image
+    from src.storage import StorageFactory
+    from src.storage.maintenance import DataMaintenance
+    from src.utils import save_json
+    
+    now = datetime(2025, 7, 10)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config = make_storage_config(tmp_dir, retention_days=30, maintenance={
+            'compact_after_days': 7, 'image_after_days': 7, 'image_max_width': 400,
+        })
+        tmp = Path(tmp_dir)
+        for date_str in ['2025-05-20', '2025-06-09', '2025-06-20', '2025-07-01', '2025-07-08']:
+            save_json([{'id': f'{date_str}-1', 'title': date_str}], tmp / f"papers_{date_str}.json")
+            (tmp / f"report_{date_str}.md").write_text(date_str, encoding='utf-8')
+        save_json({'date': '2025-07-08', 'papers': []}, tmp / 'latest.json')
+        Image.new('RGB', (1600, 800), (30, 120, 200)).save(tmp / 'wordcloud_2025-07-01.png')
+        Image.new('RGB', (1600, 800), (30, 120, 200)).save(tmp / 'wordcloud_2025-07-08.png')
+        
+        maintenance = DataMaintenance(config)
+        maintenance.dirs = {'papers': tmp}
+        
+        # 试运行只统计不修改
+        assert maintenance.run(now=now, dry_run=True)['deleted'] == 4
+        assert (tmp / 'papers_2025-05-20.json').exists()
+        
+        stats = maintenance.run(now=now)
+        assert stats['deleted'] == 4 and stats['archived'] == 2 and stats['images'] == 1
+        assert sorted(p.name for p in tmp.glob('papers_*.json')) == ['papers_2025-07-08.json']
+        assert sorted(p.name for p in (tmp / 'archive').iterdir()) == ['papers_2025-06.json.gz', 'papers_2025-07.json.gz']
+        assert not (tmp / 'report_2025-06-09.md').exists() and (tmp / 'report_2025-06-20.md').exists()
+        assert (tmp / 'latest.json').exists()
+        
+        # 旧图片缩小并转为调色板 PNG，最近的图片不变；再次运行不重复处理
+        with Image.open(tmp / 'wordcloud_2025-07-01.png') as image:
+            assert image.mode == 'P' and image.width == 400
+        with Image.open(tmp / 'wordcloud_2025-07-08.png') as image:
+            assert image.mode == 'RGB' and image.width == 1600
+        assert maintenance.run(now=now) == {'archived': 0, 'images': 0, 'deleted': 0, 'bytes_freed': 0}
+        
+        # 历史查询：未归档的日期读取原文件，已归档的日期从按月归档中读取
+        storage = StorageFactory.create_storage(config)
+        assert storage.load_daily('papers', '2025-07-08')[0]['title'] == '2025-07-08'
+        assert storage.load_daily('papers', '2025-06-20')[0]['title'] == '2025-06-20'
+        assert storage.load_daily('papers', '2025-06-09') is None
+        
+        # 整月都超过保留天数后删除归档
+        maintenance.run(now=datetime(2025, 8, 5))
+        assert sorted(p.name for p in (tmp / 'archive').iterdir()) == ['papers_2025-07.json.gz']
+    
+    print("✅ 数据目录维护测试通过\n")
+
+
+def test_paper_corpus():
+    """测试列式历史论文库"""
+    print("\n" + "=" * 60)
+    print("测试 5: 历史论文库")
+    print("=" * 60)
+    
+    import tempfile
+    import threading
+    import numpy as np
+    from src.storage.corpus import PaperCorpus
+    from src.crawler.paper import Paper
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = PaperCorpus(tmp_dir)
+        assert len(corpus) == 0 and len(corpus.rows()) == 0 and corpus.monthly_counts() == {}
+        
+        assert corpus.add_papers([
+            Paper(id='2506.00001v1', title='Vision-Language Driving', abstract='Driving with a VLM.',
+                  categories=['cs.CV', 'cs.RO'], primary_category='cs.CV', published='2025-06-01T00:00:00'),
+            {'id': 'rss:https://example.com/papers/planning', 'title': 'Planning', 'abstract': 'Motion planning.',
+             'categories': ['cs.RO'], 'published': '2025-07-03T00:00:00'},
+        ]) == 2
+        # 同一篇论文的新版本不重复入库
+        assert corpus.add_papers([{'id': '2506.00001v2', 'title': 'Vision-Language Driving v2'}]) == 0
+        
+        # 另一个实例（如 Web 服务）直接映射列文件
+        reader = PaperCorpus(tmp_dir)
+        assert reader.paper_id(1) == 'rss:https://example.com/papers/planning'
+        assert reader.title(0) == 'Vision-Language Driving' and reader.categories_of(0) == ['cs.CV', 'cs.RO']
+        assert isinstance(reader.column('published'), np.memmap)
+        assert list(reader.column('token_counts')) == [5, 3]
+        assert list(reader.rows(category='cs.RO')) == [0, 1] and list(reader.rows(start='2025-07-01')) == [1]
+        
+        # 词频矩阵直接使用映射的数组
+        matrix = reader.term_matrix()
+        assert matrix.shape == (2, len(reader.vocab))
+        assert matrix[0, reader.term_id('driving')] == 2
+        assert np.shares_memory(matrix.indices, reader.column('term_indices'))
+        assert reader.document_frequencies(np.array([1]))[reader.term_id('planning')] == 1
+        assert reader.term_trend('driving') == {'2025-06': {'papers': 1, 'total': 1}, '2025-07': {'papers': 0, 'total': 1}}
+        
+        # 中断的追加（未提交）被读取方忽略，并在下一次写入时截断
+        with open(f"{tmp_dir}/titles.bin", 'ab') as f:
+            f.write(b'partial')
+        corpus.add_papers([{'id': '2507.00003v1', 'title': 'Driving Policy', 'categories': ['cs.LG'],
+                            'published': '2025-07-05T00:00:00'}])
+        reader.refresh()
+        assert len(reader) == 3 and reader.title(2) == 'Driving Policy'
+        assert reader.term_trend('driving', category='cs.LG') == {'2025-07': {'papers': 1, 'total': 1}}
+        
+        # 两个实例（相当于两个进程）同时追加：锁文件保证追加互不覆盖、论文不重复入库
+        writers = [PaperCorpus(tmp_dir), PaperCorpus(tmp_dir)]
+        
+        def append(writer, offset):
+            for i in range(20):
+                writer.add_papers([{'id': f"2508.{i + offset:05d}v1", 'title': f"Paper {i + offset}"},
+                                   {'id': '2508.99999v1', 'title': 'Shared'}])
+        
+        threads = [threading.Thread(target=append, args=(writer, 20 * n)) for n, writer in enumerate(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reader.refresh()
+        ids = [reader.paper_id(row) for row in range(len(reader))]
+        assert len(reader) == 44 and len(set(ids)) == 44
+    
+    print("✅ 历史论文库测试通过\n")
+
+
+def main():
+    """运行所有测试"""
+    print("\n" + "=" * 70)
+    print("🧪 存储层测试")
+    print("=" * 70)
+    
+    try:
+        # 测试 1: SQLite 存储
+        test_sqlite_storage()
+        
+        # 测试 2: JSONL 存储
+        test_jsonl_storage()
+        
+        # 测试 3: JSON 编解码
+        test_json_codec()
+        
+        # 测试 4: 数据目录维护
+        test_data_maintenance()
+        
+        # 测试 5: 历史论文库
+        test_paper_corpus()
+        
+        print("\n" + "=" * 70)
+        print("✅ 所有测试完成！")
+        print("=" * 70)
+    
+    except Exception as e:
+        print(f"\n❌ 测试失败: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -166,6 +166,360 @@ def test_different_providers():
     print(f"\n✅ {success_count}/{len(providers)} 个提供商可用")
 
 
+def test_summarize_stream():
+    """测试流式总结（不调用真实 LLM）"""
+    print("\n" + "=" * 70)
+    print("测试 5: 流式总结")
+    print("=" * 70)
+    
+    import logging
+    import time
+    
+    class FakeLLMClient:
+        model = 'fake-model'
+        
+        def generate(self, prompt, system_prompt=None, max_tokens=None):
+            return "- [Fake](https://arxiv.org/abs/0000.00000)"
+        
+        def get_provider_name(self):
+            return 'Fake'
+    
+    summarizer = PaperSummarizer.__new__(PaperSummarizer)
+    summarizer.config = load_config()
+    summarizer.logger = logging.getLogger('daily_arxiv.summarizer')
+    summarizer.llm_client = FakeLLMClient()
+    saved = []
+    summarizer._save_summaries = saved.extend
+    
+    arrivals = []
+    
+    def slow_papers():
+        for i in range(3):
+            time.sleep(0.05)
+            arrivals.append(i)
+            yield {'id': f'2501.0000{i}v1', 'title': f'Paper {i}', 'authors': ['A'],
+                   'abstract': 'Abstract', 'categories': ['cs.CV'], 'published': '2025-01-01T00:00:00'}
+    
+    summarized = summarizer.summarize_stream(slow_papers(), show_progress=False)
+    assert [p['id'] for p in summarized] == ['2501.00000v1', '2501.00001v1', '2501.00002v1']
+    assert all(not p.get('summary_error') for p in summarized)
+    assert len(saved) == 3
+    
+    # 爬取中途失败：已到达的论文仍然被总结和保存，然后抛出错误
+    def broken_papers():
+        yield {'id': '2501.00005v1', 'title': 'Paper 5', 'authors': [], 'abstract': '',
+               'categories': [], 'published': '2025-01-01T00:00:00'}
+        raise RuntimeError("503")
+    
+    saved.clear()
+    try:
+        summarizer.summarize_stream(broken_papers(), show_progress=False)
+        raise AssertionError("应当抛出爬取错误")
+    except RuntimeError as e:
+        assert str(e) == "503"
+    assert len(saved) == 1
+    
+    # 从归档重新处理历史论文时不保存为最新的总结结果
+    saved.clear()
+    assert len(summarizer.summarize_stream(slow_papers(), show_progress=False, save=False)) == 3
+    assert saved == []
+    
+    # 字段格式异常的论文只有这一篇标记失败（不交给 LLM），同一批的其他论文照常总结
+    good = {'id': '2501.00006v1', 'title': 'Paper 6', 'authors': ['A'], 'abstract': 'Abstract',
+            'categories': ['cs.CV'], 'published': '2025-01-01T00:00:00'}
+    broken = dict(good, id='2501.00007v1', authors=None, categories=None)
+    prompts = []
+    generate = summarizer.llm_client.generate
+    summarizer.llm_client.generate = lambda prompt, **kwargs: prompts.append(prompt) or generate(prompt, **kwargs)
+    done = []
+    summarized = summarizer.summarize_batch([good, broken, dict(good, id='2501.00008v1')], False, on_done=lambda: done.append(1))
+    assert [bool(p.get('summary_error')) for p in summarized] == [False, True, False]
+    assert len(prompts) == 2 and len(done) == 3
+    summarizer.llm_client.generate = generate
+    
+    print("✅ 流式总结测试通过")
+
+
+def test_concurrent_summarization():
+    """测试有界并发总结（不调用真实 LLM）"""
+    print("\n" + "=" * 70)
+    print("测试 6: 并发总结")
+    print("=" * 70)
+    
+    import logging
+    import threading
+    import time
+    
+    class SlowLLMClient:
+        model = 'fake-model'
+        max_concurrency = 4
+        
+        def __init__(self):
+            self.active = 0
+            self.peak = 0
+            self.lock = threading.Lock()
+        
+        def generate(self, prompt, system_prompt=None, max_tokens=None):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            try:
+                # 模拟网络等待；标题为 Paper 3 的论文请求失败
+                time.sleep(0.1)
+                if 'Paper 3' in prompt:
+                    raise RuntimeError("429 Too Many Requests")
+                return "- [Fake](https://arxiv.org/abs/0000.00000)"
+            finally:
+                with self.lock:
+                    self.active -= 1
+        
+        def get_provider_name(self):
+            return 'Fake'
+    
+    summarizer = PaperSummarizer.__new__(PaperSummarizer)
+    summarizer.config = load_config()
+    summarizer.logger = logging.getLogger('daily_arxiv.summarizer')
+    summarizer.llm_client = SlowLLMClient()
+    saved = []
+    summarizer._save_summaries = saved.extend
+    
+    papers = [{'id': f'2501.0000{i}v1', 'title': f'Paper {i}', 'authors': ['A'], 'abstract': 'Abstract',
+               'categories': ['cs.CV'], 'published': '2025-01-01T00:00:00'} for i in range(8)]
+    
+    start = time.time()
+    summarized = summarizer.summarize_papers(papers, show_progress=False)
+    elapsed = time.time() - start
+    
+    # 8 篇论文、并发 4：约两次请求的时间，而不是 8 次；输出顺序与输入一致
+    assert elapsed < 0.6, f"耗时 {elapsed:.2f} 秒"
+    assert summarizer.llm_client.peak == 4
+    assert [p['id'] for p in summarized] == [p['id'] for p in papers]
+    
+    # 单篇失败只影响这一篇（该篇回退为手动格式化）
+    fake_summary = "- [Fake](https://arxiv.org/abs/0000.00000)"
+    assert [i for i, p in enumerate(summarized) if p['summary'] != fake_summary] == [3]
+    assert 'Paper 3' in summarized[3]['summary'] and summarized[3]['summary_fallback']
+    assert len(saved) == 8
+    
+    print(f"✅ 并发总结测试通过（耗时 {elapsed:.2f} 秒）")
+
+
+def test_async_llm_client():
+    """测试异步 LLM 客户端接口（不调用真实 LLM）"""
+    print("\n" + "=" * 70)
+    print("测试 7: 异步 LLM 客户端")
+    print("=" * 70)
+    
+    import asyncio
+    import logging
+    import threading
+    import time
+    from src.summarizer.base_llm_client import BaseLLMClient
+    from src.summarizer.concurrency import map_bounded
+    from src.summarizer.openai_client import OpenAIClient
+    
+    class FakeAsyncClient(BaseLLMClient):
+        def __init__(self, config):
+            super().__init__(config)
+            self.logger = logging.getLogger('daily_arxiv.llm.fake')
+            self.active = 0
+            self.peak = 0
+            self.threads = set()
+            self.created = 0
+        
+        def _create_async_client(self):
+            self.created += 1
+            return object()
+        
+        async def agenerate(self, prompt, system_prompt=None, max_tokens=None):
+            assert self.async_client is not None
+            self.threads.add(threading.get_ident())
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            try:
+                # 模拟网络等待；提示词为 fail 的请求失败
+                await asyncio.sleep(0.1)
+                if prompt == 'fail':
+                    raise RuntimeError("500 Internal Server Error")
+                return prompt.upper()
+            finally:
+                self.active -= 1
+    
+    # 一个事件循环驱动 200 个同时进行的请求：约一次请求的时间，不为每个请求开线程
+    client = FakeAsyncClient({'model': 'fake-model', 'max_concurrency': 200})
+    prompts = [f'p{i}' for i in range(200)]
+    prompts[7] = 'fail'
+    
+    start = time.time()
+    results = asyncio.run(client.agenerate_batch(prompts))
+    elapsed = time.time() - start
+    
+    assert elapsed < 1.0, f"耗时 {elapsed:.2f} 秒"
+    assert client.peak == 200
+    assert len(client.threads) == 1
+    assert results[0] == 'P0' and results[199] == 'P199'
+    assert results[7].startswith('Error:') and '500' in results[7]
+    
+    # 同步接口是薄包装：多个线程同时调用时共用客户端自己的后台事件循环
+    client = FakeAsyncClient({'model': 'fake-model'})
+    assert client.generate('hello') == 'HELLO'
+    results = map_bounded(lambda i, prompt: client.generate(prompt), ['a', 'b', 'c', 'd'], max_workers=4)
+    assert results == ['A', 'B', 'C', 'D']
+    assert client.peak == 4
+    assert len(client.threads) == 1 and client.created == 1
+    assert client.generate_batch(['x', 'fail'])[1].startswith('Error:')
+    
+    # 真实提供商：每个事件循环各自创建异步 SDK 客户端（不发出请求）
+    openai_client = OpenAIClient({'api_key': 'sk-test', 'model': 'gpt-4o-mini'})
+    
+    async def current_client():
+        return openai_client.async_client, openai_client.async_client
+    
+    first, again = asyncio.run(current_client())
+    second, _ = asyncio.run(current_client())
+    assert first is again and first is not second
+    assert type(first).__name__ == 'AsyncOpenAI'
+    
+    print(f"✅ 异步 LLM 客户端测试通过（200 个请求耗时 {elapsed:.2f} 秒）")
+
+
+def test_batch_generation():
+    """测试分批总结和 OpenAI Batch API（不调用真实 LLM）"""
+    print("\n" + "=" * 70)
+    print("测试 8: 批量生成")
+    print("=" * 70)
+    
+    import asyncio
+    import json
+    import logging
+    import re
+    import httpx
+    from openai import AsyncOpenAI
+    from src.summarizer.base_llm_client import BaseLLMClient
+    from src.summarizer.openai_client import OpenAIClient
+    
+    class FakeBatchClient(BaseLLMClient):
+        def __init__(self, config):
+            super().__init__(config)
+            self.logger = logging.getLogger('daily_arxiv.llm.fake')
+            self.batches = []
+        
+        def _create_async_client(self):
+            return object()
+        
+        async def _agenerate_batch(self, prompts, system_prompt=None, on_done=None):
+            self.batches.append(len(prompts))
+            return await super()._agenerate_batch(prompts, system_prompt, on_done)
+        
+        async def agenerate(self, prompt, system_prompt=None, max_tokens=None):
+            await asyncio.sleep(0.01)
+            if 'Paper 4' in prompt:
+                raise RuntimeError("429 Too Many Requests")
+            return "- [Fake](https://arxiv.org/abs/0000.00000)"
+        
+        def get_provider_name(self):
+            return 'Fake'
+    
+    # 一天的论文只调用一次 generate_batch，每完成一篇更新一次进度；单篇失败回退为手动格式化
+    summarizer = PaperSummarizer.__new__(PaperSummarizer)
+    summarizer.config = load_config()
+    summarizer.logger = logging.getLogger('daily_arxiv.summarizer')
+    summarizer.llm_client = FakeBatchClient({'model': 'fake-model', 'batch_size': 3})
+    saved = []
+    summarizer._save_summaries = saved.extend
+    
+    papers = [{'id': f'2501.0000{i}v1', 'title': f'Paper {i}', 'authors': ['A'], 'abstract': 'Abstract',
+               'categories': ['cs.CV'], 'published': '2025-01-01T00:00:00'} for i in range(7)]
+    summarized = summarizer.summarize_papers(papers, show_progress=False)
+    
+    assert summarizer.llm_client.batches == [7]
+    assert [p['id'] for p in summarized] == [p['id'] for p in papers]
+    assert [i for i, p in enumerate(summarized) if p['summary'].startswith('- [Fake]')] == [0, 1, 2, 3, 5, 6]
+    assert 'Paper 4' in summarized[4]['summary'] and not summarized[4].get('summary_error')
+    assert [i for i, p in enumerate(summarized) if p.get('summary_fallback')] == [4]
+    assert len(saved) == 7
+    
+    done = []
+    summarizer.summarize_batch(papers[:3], on_done=lambda: done.append(1))
+    assert len(done) == 3
+    
+    # 没有设置 logger 的客户端：单条失败仍然只影响这一条
+    class BareClient(BaseLLMClient):
+        def _create_async_client(self):
+            return object()
+        
+        async def agenerate(self, prompt, system_prompt=None, max_tokens=None):
+            if prompt == 'fail':
+                raise RuntimeError("timeout")
+            return prompt
+    
+    assert BareClient({}).generate_batch(['ok', 'fail']) == ['ok', 'Error: timeout']
+    
+    # 默认的 "Error: ..." 文本和 return_exceptions
+    results = summarizer.llm_client.generate_batch(['a', 'Paper 4'])
+    assert results[1] == "Error: 429 Too Many Requests"
+    results = summarizer.llm_client.generate_batch(['a', 'Paper 4'], return_exceptions=True)
+    assert isinstance(results[1], RuntimeError)
+    
+    # OpenAI Batch API：每 batch_size 条请求一个任务，所有任务先提交再一起等待；按 custom_id 还原顺序，
+    # 单条失败保留错误，没有结果的条目改为并发请求
+    requests = []
+    uploads = {}
+    
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        path = request.url.path
+        if path == '/v1/files':
+            file_id = f'file-{len(uploads)}'
+            uploads[file_id] = re.findall(r'"custom_id": "(request-\d+)".*?"content": "(p\d)"', request.content.decode())
+            return httpx.Response(200, json={'id': file_id, 'object': 'file'})
+        if path == '/v1/batches':
+            input_file_id = json.loads(request.content)['input_file_id']
+            return httpx.Response(200, json={'id': f'batch-{input_file_id}', 'status': 'validating'})
+        if path.startswith('/v1/batches/'):
+            batch_id = path.rsplit('/', 1)[1]
+            return httpx.Response(200, json={'id': batch_id, 'status': 'completed',
+                                             'output_file_id': batch_id.replace('batch-', 'out-'), 'error_file_id': None})
+        if path.startswith('/v1/files/out-'):
+            lines = []
+            for custom_id, prompt in uploads[path.split('/')[3].replace('out-', '')]:
+                if prompt == 'p1':
+                    continue
+                if prompt == 'p3':
+                    lines.append({'custom_id': custom_id, 'response': {'status_code': 400, 'body': {
+                        'error': {'message': 'context length exceeded'}}}})
+                else:
+                    lines.append({'custom_id': custom_id, 'response': {'status_code': 200, 'body': {
+                        'choices': [{'message': {'content': f' {prompt.upper()} '}}]}}})
+            return httpx.Response(200, content='\n'.join(json.dumps(line) for line in lines).encode())
+        if path == '/v1/chat/completions':
+            return httpx.Response(200, json={'id': 'c', 'object': 'chat.completion', 'created': 0, 'model': 'm',
+                                             'choices': [{'index': 0, 'finish_reason': 'stop',
+                                                          'message': {'role': 'assistant', 'content': 'retried'}}]})
+        return httpx.Response(404, json={'error': {'message': path}})
+    
+    openai_client = OpenAIClient({'api_key': 'sk-test', 'model': 'gpt-4o-mini', 'batch_api': True,
+                                  'batch_size': 2, 'batch_poll_interval': 0})
+    openai_client._create_async_client = lambda: AsyncOpenAI(
+        api_key='sk-test', base_url='http://batch.test/v1',
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    
+    done = []
+    results = openai_client.generate_batch(['p0', 'p1', 'p2', 'p3'], system_prompt='sys',
+                                           return_exceptions=True, on_done=lambda: done.append(1))
+    assert results[0] == 'P0' and results[2] == 'P2'
+    assert results[1] == 'retried'
+    assert isinstance(results[3], RuntimeError) and 'context length exceeded' in str(results[3])
+    assert len(done) == 4
+    
+    submits = [i for i, request in enumerate(requests) if request == ('POST', '/v1/batches')]
+    polls = [i for i, request in enumerate(requests) if request[0] == 'GET' and request[1].startswith('/v1/batches/')]
+    assert len(submits) == 2 and submits[-1] < polls[0]
+    assert requests.count(('POST', '/v1/chat/completions')) == 1
+    
+    print("✅ 批量生成测试通过")
+
+
 def main():
     """运行所有测试"""
     print("\n" + "=" * 70)
@@ -184,6 +538,18 @@ def main():
                 # 测试 3: 论文总结
                 test_paper_summarization()
         
+        # 测试 5: 流式总结（离线）
+        test_summarize_stream()
+        
+        # 测试 6: 并发总结（离线）
+        test_concurrent_summarization()
+        
+        # 测试 7: 异步 LLM 客户端（离线）
+        test_async_llm_client()
+        
+        # 测试 8: 批量生成（离线）
+        test_batch_generation()
+        
         # 测试 4: 对比不同提供商（可选）
         print("\n" + "=" * 70)
         choice = input("\n是否测试所有 LLM 提供商对比？(y/n): ")